@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay.fake_openai import create_fake_openai_app
+from replay.kjcn_site import create_kjcn_app, load_article_fixtures
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+from replay.server import BackgroundServer
+
+
+def parse_levels(value: str) -> list:
+    return [int(level) for level in value.split(",") if level.strip()]
+
+
+async def bench_range(crawl_article_range, start_number: int, end_number: int, concurrency: int, verbose: bool) -> tuple:
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output:
+        results = await crawl_article_range(start_number, end_number, 0, concurrency)
+    return results, time.perf_counter() - started
+
+
+async def bench_monthly(scheduled_crawler_class, start_number: int, article_count: int, concurrency: int, verbose: bool) -> tuple:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file = os.path.join(tmp_dir, "crawler_config.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "last_crawled_number": start_number - 1,
+                "last_crawl_date": None,
+                "max_articles_per_month": article_count,
+                "delay_between_requests": 0,
+                "auto_increment_limit": article_count + 1,
+                "concurrency": concurrency,
+                "probe_delay": 0
+            }, f)
+
+        crawler = scheduled_crawler_class(config_file)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            result = await crawler.monthly_crawl()
+        return result.get("results", []), time.perf_counter() - started
+
+
+def report(label: str, concurrency: int, results: list, elapsed: float, openai_url: str):
+    stats = httpx.get(f"{openai_url}/stats").json()
+    httpx.post(f"{openai_url}/stats/reset")
+    # Re-runs find the articles already stored: those still went through the whole pipeline
+    successful = sum(1 for r in results if r["status"] in ("success", "duplicate"))
+    per_minute = successful / elapsed * 60 if elapsed else 0
+    print(f"{label:<14} {concurrency:>6} {successful:>8} {elapsed:>9.2f} {per_minute:>12.1f} "
+          f"{stats['calls']:>9} {stats['max_in_flight']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end crawler benchmark against the offline replay harness")
+    parser.add_argument("--articles", type=int, default=12, help="Articles per run")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake OpenAI latency per call (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency per call (seconds)")
+    parser.add_argument("--concurrency", type=parse_levels, default=[1, 2, 4, 8], help="Comma-separated levels")
+    parser.add_argument("--mysql-host", default=None,
+                        help="MySQL host for the batch writes (default: local MySQL stand-in, never the real DB)")
+    parser.add_argument("--llm-cache", action="store_true",
+                        help="Enable the LLM result cache (fresh temp file); later runs then hit the cache")
+    parser.add_argument("--verbose", action="store_true", help="Show crawler output")
+    args = parser.parse_args()
+
+    pages = load_article_fixtures()
+    start_number = min(pages)
+    end_number = start_number + args.articles - 1
+
+    site = BackgroundServer(create_kjcn_app(max_number=end_number)).start()
+    fake_openai = BackgroundServer(create_fake_openai_app(args.latency, args.jitter)).start()
+
+    # Must be set before the issues modules (and their OpenAI clients) are imported
+    os.environ["KJCN_BASE_URL"] = site.url
+    os.environ["OPENAI_BASE_URL"] = f"{fake_openai.url}/v1"
+    os.environ["OPENAI_API_KEY"] = "replay"
+    standin = None
+    if args.mysql_host:
+        os.environ["MYSQL_HOST"] = args.mysql_host
+    elif MYSQL_STANDIN_AVAILABLE:
+        standin = MySQLStandin().start()
+        os.environ.update(standin.env())
+    else:
+        # Nothing listens here: writes fail fast and articles are reported as errors
+        os.environ["MYSQL_HOST"] = "127.0.0.1"
+    cache_dir = tempfile.TemporaryDirectory()
+    os.environ["LLM_CACHE_ENABLED"] = "1" if args.llm_cache else "0"
+    os.environ["LLM_CACHE_PATH"] = os.path.join(cache_dir.name, "llm_cache.sqlite3")
+
+    from issues.services.batch_crawler import crawl_article_range
+    from issues.services.scheduled_crawler import ScheduledCrawler
+    from issues.utils.llm_cache import llm_cache
+
+    print(f"=== Crawler benchmark: {args.articles} articles, LLM latency {args.latency}s ===")
+    print(f"{'run':<14} {'conc.':>6} {'crawled':>8} {'seconds':>9} {'articles/min':>12} "
+          f"{'LLM calls':>9} {'max LLM':>9}")
+    print("-" * 74)
+
+    try:
+        for concurrency in args.concurrency:
+            results, elapsed = asyncio.run(
+                bench_range(crawl_article_range, start_number, end_number, concurrency, args.verbose)
+            )
+            report("crawl_range", concurrency, results, elapsed, fake_openai.url)
+
+        for concurrency in args.concurrency:
+            results, elapsed = asyncio.run(
+                bench_monthly(ScheduledCrawler, start_number, args.articles, concurrency, args.verbose)
+            )
+            report("monthly_crawl", concurrency, results, elapsed, fake_openai.url)
+        if args.llm_cache:
+            print(f"\nLLM cache: {llm_cache.stats()}")
+    finally:
+        site.stop()
+        fake_openai.stop()
+        if standin is not None:
+            from issues.services.database import close_pools
+            close_pools()
+            standin.stop()
+        cache_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
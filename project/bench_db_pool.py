@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+
+async def hammer(app, path: str, total: int, concurrency: int) -> dict:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Warm up (first connection, imports) before timing
+        await one_request()
+        latencies.clear()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def run_worker(path: str, total: int, concurrency: int):
+    """Runs in a child process whose MYSQL_* / MYSQL_POOL_SIZE env was set by the parent"""
+    from fastapi import FastAPI
+    from issues.crud_routes import router as crud_router
+    from issues.services.database import close_pools, get_pool
+    from issues.crud_routes import MYSQL_CONFIG
+
+    app = FastAPI()
+    app.include_router(crud_router, prefix="/issues")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(hammer(app, path, total, concurrency))
+    result["connections_opened"] = get_pool(MYSQL_CONFIG).stats()["connections_opened"]
+    close_pools()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GET /issues/ throughput with and without the MySQL connection pool")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=50, help="Issues seeded into the stand-in")
+    parser.add_argument("--connect-latency", type=float, default=0.02,
+                        help="Artificial handshake delay per new MySQL connection (seconds)")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--path", default="/issues/")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.path, args.requests, args.concurrency)
+        return
+
+    if not MYSQL_STANDIN_AVAILABLE:
+        print("This benchmark needs the MySQL stand-in: pip install mysql-mimic")
+        return
+
+    standin = MySQLStandin(connect_latency=args.connect_latency).start()
+    standin.seed(args.rows)
+
+    print(f"=== GET {args.path}: {args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.rows} rows, connect latency {args.connect_latency * 1000:.0f} ms ===")
+    print(f"{'mode':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'connects':>9} {'errors':>7}")
+    print("-" * 56)
+
+    try:
+        for mode, pool_size in (("direct", 0), ("pooled", args.pool_size)):
+            env = dict(os.environ, **standin.env(), MYSQL_POOL_SIZE=str(pool_size))
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", "--path", args.path,
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                env=env, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(f"{mode:<10} failed:\n{completed.stderr}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{mode:<10} {result['requests_per_second']:>8.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['p99_ms']:>8.1f} {result['connections_opened']:>9} {result['errors']:>7}")
+    finally:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageEnhance
+
+from meals.services.classifier import MEALS_CLASSIFIER_MIN_SIMILARITY, GalleryClassifier, embed_bytes
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+TABLE_COLORS = [(150, 110, 80), (200, 200, 200), (90, 70, 60), (230, 220, 200)]
+
+
+def dish_photo(dish: int, shot: int, size=(800, 600)) -> bytes:
+    """A plate of coloured components; the same dish keeps its components, each shot moves the camera"""
+    spec = np.random.default_rng(1000 + dish)
+    palette = [tuple(int(c) for c in spec.integers(0, 255, 3)) for _ in range(4)]
+    parts = [(spec.uniform(-0.25, 0.25), spec.uniform(-0.2, 0.2), spec.uniform(0.08, 0.2),
+              int(spec.integers(0, 4)), int(spec.integers(0, 3))) for _ in range(int(spec.integers(3, 7)))]
+
+    rng = np.random.default_rng(shot * 7919 + dish)
+    width, height = size
+    image = Image.new("RGB", size, TABLE_COLORS[int(rng.integers(0, len(TABLE_COLORS)))])
+    draw = ImageDraw.Draw(image)
+    cx = width / 2 + rng.uniform(-0.08, 0.08) * width
+    cy = height / 2 + rng.uniform(-0.08, 0.08) * height
+    scale = min(size) * rng.uniform(0.9, 1.1)
+    draw.ellipse([cx - 0.45 * scale, cy - 0.42 * scale, cx + 0.45 * scale, cy + 0.42 * scale], fill=(245, 245, 240))
+    for dx, dy, radius, color, shape in parts:
+        x = cx + (dx + rng.uniform(-0.02, 0.02)) * scale
+        y = cy + (dy + rng.uniform(-0.02, 0.02)) * scale
+        r = radius * scale
+        if shape == 0:
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=palette[color])
+        elif shape == 1:
+            draw.rectangle([x - r, y - r, x + r, y + r], fill=palette[color])
+        else:
+            for line in range(6):
+                draw.line([x - r, y - r + line * r / 3, x + r, y - r + line * r / 3],
+                          fill=palette[color], width=max(2, int(r / 8)))
+    image = image.rotate(rng.uniform(-10, 10), fillcolor=TABLE_COLORS[0])
+    image = ImageEnhance.Brightness(image).enhance(rng.uniform(0.85, 1.15))
+    pixels = np.asarray(image, dtype=np.float32) + rng.normal(0, 6, (height, width, 3))
+    output = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(output, "JPEG",
+                                                                  quality=int(rng.integers(70, 95)))
+    return output.getvalue()
+
+
+def synthetic_sample(photos: int, dishes: int, seed: int) -> list:
+    """(label, bytes) uploads with Zipf-like dish popularity, as a meal log has a few staples and a long tail"""
+    rng = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, dishes + 1)
+    choices = rng.choice(dishes, size=photos, p=popularity / popularity.sum())
+    return [(f"dish-{dish}", dish_photo(int(dish), shot)) for shot, dish in enumerate(choices)]
+
+
+def load_sample(sample_dir: Path, seed: int) -> list:
+    """(label, bytes) for every photo under sample_dir/<dish label>/, in a seeded random order"""
+    sample = [(path.parent.name, path.read_bytes()) for path in sorted(sample_dir.glob("*/*"))
+              if path.suffix.lower() in IMAGE_SUFFIXES]
+    order = np.random.default_rng(seed).permutation(len(sample))
+    return [sample[i] for i in order]
+
+
+def replay(embeddings: list, labels: list, min_similarity: float, gallery_path: Path) -> dict:
+    """
+    Feed the sample through the classifier in order, as the service would:
+    a passed photo goes to the vision model (its true label stands in for the
+    answer) and is learnt; an answered one is scored against its label
+    """
+    classifier = GalleryClassifier(path=gallery_path, min_similarity=min_similarity)
+    correct = 0
+    start = time.perf_counter()
+    for embedding, label in zip(embeddings, labels):
+        prediction = classifier.predict(embedding)
+        if prediction is None:
+            classifier.learn(embedding, label, {"nutrition": {"dish": label}})
+        elif prediction["label"] == label:
+            correct += 1
+    elapsed = time.perf_counter() - start
+    stats = classifier.stats()
+    return {
+        "min_similarity": min_similarity,
+        "absorbed": stats["absorbed"],
+        "precision": correct / stats["answered"] if stats["answered"] else 1.0,
+        "predict_ms": elapsed / len(labels) * 1000,
+        "gallery": stats["gallery"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the on-box meal classifier on a recorded sample")
+    parser.add_argument("--sample", type=Path, help="Directory of labeled photos, one subdirectory per dish")
+    parser.add_argument("--photos", type=int, default=400, help="Synthetic uploads when no --sample is given")
+    parser.add_argument("--dishes", type=int, default=30, help="Distinct synthetic dishes")
+    parser.add_argument("--min-similarity", type=float, nargs="+",
+                        default=sorted({0.7, 0.75, MEALS_CLASSIFIER_MIN_SIMILARITY, 0.85, 0.9}),
+                        help="Thresholds to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sample = load_sample(args.sample, args.seed) if args.sample else synthetic_sample(args.photos, args.dishes, args.seed)
+    if not sample:
+        print(f"No photos found in {args.sample}")
+        return
+    labels = [label for label, _ in sample]
+
+    start = time.perf_counter()
+    embeddings = [embed_bytes(data) for _, data in sample]
+    embed_ms = (time.perf_counter() - start) / len(sample) * 1000
+
+    print(f"=== Meal classifier benchmark: {len(sample)} photos, {len(set(labels))} dishes ===")
+    print(f"Embedding: {embed_ms:.2f} ms/photo (CPU, one thread)")
+    print(f"{'min sim':>8} {'absorbed':>9} {'precision':>10} {'predict ms':>11} {'gallery':>8}")
+    print("-" * 50)
+    for min_similarity in args.min_similarity:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = replay(embeddings, labels, min_similarity, Path(tmp_dir) / "gallery.sqlite3")
+        print(f"{result['min_similarity']:>8.2f} {result['absorbed']:>9.1%} {result['precision']:>10.1%} "
+              f"{result['predict_ms']:>11.2f} {result['gallery']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.services.parser import PARSER_BACKENDS, parse_kjcn_article
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "kjcn"
+
+
+def load_fixtures(fixtures_dir: Path) -> list:
+    return [path.read_text(encoding="utf-8") for path in sorted(fixtures_dir.glob("*.html"))]
+
+
+def measure_backend(backend: str, pages: list, rounds: int) -> dict:
+    """Run in a fresh process so peak RSS belongs to this backend only"""
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    for html in pages:
+        parse_kjcn_article(html, backend)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            parse_kjcn_article(html, backend)
+    elapsed = time.perf_counter() - start
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "backend": backend,
+        "ms_per_page": elapsed / (rounds * len(pages)) * 1000,
+        "python_peak_kb": python_peak / 1024,
+        "rss_growth_kb": rss_after - rss_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KJCN article parsing backends")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over the fixture set per backend")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="Directory of saved article HTML")
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f"No fixtures found in {args.fixtures}")
+        return
+
+    print(f"=== Parser benchmark: {len(pages)} pages x {args.rounds} rounds ===")
+    print(f"{'backend':<12} {'ms/page':>10} {'py peak KB':>12} {'RSS growth KB':>14}")
+    print("-" * 52)
+
+    context = multiprocessing.get_context("spawn")
+    for backend in PARSER_BACKENDS:
+        with context.Pool(1) as pool:
+            result = pool.apply(measure_backend, (backend, pages, args.rounds))
+        print(f"{result['backend']:<12} {result['ms_per_page']:>10.2f} "
+              f"{result['python_peak_kb']:>12.0f} {result['rss_growth_kb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,122 +1,288 @@
+"""
+Issues table maintenance
+
+    python delete_db_rows.py                                  # interactive menu
+    python delete_db_rows.py --ids-file ids.txt [--dry-run]   # one id per line
+    python delete_db_rows.py --references-file urls.txt       # one reference URL per line
+    python delete_db_rows.py --all --dry-run
+
+Rows are deleted chunk_size at a time (one short transaction per chunk) on a
+single shared connection, with an optional pause between chunks. --dry-run
+only counts what would be deleted.
+
+The API's issue read cache is cleared after a delete only when it is shared
+through ISSUES_CACHE_REDIS_URL; with the default in-process cache the API keeps
+serving cached pages and counts until ISSUES_CACHE_TTL expires.
+"""
+import argparse
 import sys
 import os
+import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from issues.services.database import get_connection
+from issues.services.database import db_connection
+from issues.services.issue_cache import issue_read_cache
 
-def delete_all_rows():
-    """Delete all rows from the issues table"""
-    try:
-        connection = get_connection()
+# Values per DELETE ... IN (...) statement
+DEFAULT_CHUNK_SIZE = 500
+
+def read_values(path: str, as_ids: bool = False) -> list:
+    """
+    One value per line; blank lines and lines starting with # are skipped,
+    repeats are dropped (first occurrence kept)
+    """
+    values = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            value = line.strip()
+            if not value or value.startswith("#"):
+                continue
+            if as_ids:
+                if not value.isdigit():
+                    raise ValueError(f"{path}:{line_number}: not an id: {value!r}")
+                value = int(value)
+            if value not in seen:
+                seen.add(value)
+                values.append(value)
+    return values
+
+def render_progress(done: int, total: int, width: int = 30) -> str:
+    fraction = done / total if total else 1.0
+    filled = int(width * fraction)
+    return f"[{'#' * filled}{'.' * (width - filled)}] {done}/{total} ({fraction:.0%})"
+
+def _show_progress(done: int, total: int, suffix: str = ""):
+    # Redrawn in place on stderr so piped stdout stays clean
+    end = "\n" if done >= total else ""
+    print(f"\r{render_progress(done, total)} {suffix}", end=end, file=sys.stderr, flush=True)
+
+def _unmatched_references(cursor, chunk: list) -> list:
+    """
+    References in chunk that match no issue, compared by MySQL under the
+    column's collation (case-insensitive by default), not as Python strings
+    """
+    requested = " UNION ALL ".join(["SELECT %s AS reference"] * len(chunk))
+    cursor.execute(
+        f"SELECT requested.reference FROM ({requested}) AS requested "
+        f"WHERE NOT EXISTS (SELECT 1 FROM issues WHERE issues.reference = requested.reference)",
+        chunk
+    )
+    unmatched = {row[0] for row in cursor.fetchall()}
+    return [value for value in chunk if value in unmatched]
+
+def delete_rows_in_chunks(column: str, values: list, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          throttle: float = 0.0, dry_run: bool = False, progress: bool = True) -> dict:
+    """
+    Delete issues whose column (id or reference) is in values, chunk_size values per statement
+
+    Returns counts: requested values, matched rows, deleted rows, chunks and
+    the values that matched nothing (dry runs report matches only).
+    """
+    if column not in ("id", "reference"):
+        raise ValueError(f"Unsupported column: {column}")
+    chunk_size = max(1, chunk_size)
+    stats = {"requested": len(values), "matched": 0, "deleted": 0, "chunks": 0, "missing": [], "dry_run": dry_run}
+    started = time.monotonic()
+
+    with db_connection() as connection:
         cursor = connection.cursor()
-        
-        # Count rows before deletion
-        cursor.execute("SELECT COUNT(*) FROM issues")
-        count_before = cursor.fetchone()[0]
-        print(f"Rows before deletion: {count_before}")
-        
-        if count_before == 0:
-            print("No rows to delete.")
-            return
-        
-        # Delete all rows
-        cursor.execute("DELETE FROM issues")
-        connection.commit()
-        
-        # Count rows after deletion
-        cursor.execute("SELECT COUNT(*) FROM issues")
-        count_after = cursor.fetchone()[0]
-        
-        print(f"Deleted {count_before - count_after} rows successfully.")
-        print(f"Rows remaining: {count_after}")
-        
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+
+            # Which values exist (and how many rows they cover)
+            cursor.execute(f"SELECT {column} FROM issues WHERE {column} IN ({placeholders})", chunk)
+            found = [row[0] for row in cursor.fetchall()]
+            stats["matched"] += len(found)
+            if column == "reference":
+                stats["missing"].extend(_unmatched_references(cursor, chunk))
+            else:
+                found_values = set(found)
+                stats["missing"].extend(value for value in chunk if value not in found_values)
+
+            if found and not dry_run:
+                cursor.execute(f"DELETE FROM issues WHERE {column} IN ({placeholders})", chunk)
+                connection.commit()
+                stats["deleted"] += cursor.rowcount
+            else:
+                connection.rollback()
+            stats["chunks"] += 1
+
+            done = min(start + chunk_size, len(values))
+            if progress:
+                _show_progress(done, len(values), f"{'matched' if dry_run else 'deleted'} "
+                                                  f"{stats['matched'] if dry_run else stats['deleted']}")
+            if throttle and done < len(values):
+                time.sleep(throttle)
         cursor.close()
-        connection.close()
-        
-    except Exception as e:
-        print(f"Error deleting rows: {e}")
+
+    if stats["deleted"]:
+        issue_read_cache.invalidate()
+    stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return stats
+
+def delete_all_rows(chunk_size: int = DEFAULT_CHUNK_SIZE, throttle: float = 0.0, dry_run: bool = False,
+                    progress: bool = True) -> dict:
+    """
+    Delete all rows from the issues table, oldest id first, chunk_size rows per statement
+
+    Database errors are raised (rows deleted by earlier chunks stay deleted).
+    """
+    stats = {"matched": 0, "deleted": 0, "chunks": 0, "dry_run": dry_run}
+    started = time.monotonic()
+    try:
+        with db_connection() as connection:
+            cursor = connection.cursor()
+            
+            # Count rows before deletion
+            cursor.execute("SELECT COUNT(*) FROM issues")
+            count_before = cursor.fetchone()[0]
+            stats["matched"] = count_before
+            print(f"Rows before deletion: {count_before}")
+            
+            if count_before == 0 or dry_run:
+                if count_before == 0:
+                    print("No rows to delete.")
+                cursor.close()
+                return stats
+            
+            # Bounded deletes instead of one DELETE holding locks on the whole table
+            while True:
+                cursor.execute("DELETE FROM issues ORDER BY id LIMIT %s", (chunk_size,))
+                connection.commit()
+                deleted = cursor.rowcount
+                stats["deleted"] += deleted
+                stats["chunks"] += 1
+                if progress:
+                    _show_progress(min(stats["deleted"], count_before), count_before)
+                if deleted < chunk_size:
+                    break
+                if throttle:
+                    time.sleep(throttle)
+            
+            # Count rows after deletion (rows inserted meanwhile are left alone)
+            cursor.execute("SELECT COUNT(*) FROM issues")
+            count_after = cursor.fetchone()[0]
+            
+            print(f"Deleted {stats['deleted']} rows successfully.")
+            print(f"Rows remaining: {count_after}")
+            
+            cursor.close()
+    finally:
+        # Also after a failure part-way through: earlier chunks are committed
+        if stats["deleted"]:
+            issue_read_cache.invalidate()
+    stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return stats
 
 def delete_by_reference(reference):
     """Delete specific row by reference URL"""
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        # Check if row exists
-        cursor.execute("SELECT COUNT(*) FROM issues WHERE reference = %s", (reference,))
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
+        stats = delete_rows_in_chunks("reference", [reference], progress=False)
+        if stats["deleted"]:
+            print(f"Deleted {stats['deleted']} row(s) with reference: {reference}")
+        else:
             print(f"No row found with reference: {reference}")
-            return
-        
-        # Delete the row
-        cursor.execute("DELETE FROM issues WHERE reference = %s", (reference,))
-        connection.commit()
-        
-        print(f"Deleted 1 row with reference: {reference}")
-        
-        cursor.close()
-        connection.close()
-        
     except Exception as e:
         print(f"Error deleting row: {e}")
 
 def delete_by_id(article_id):
     """Delete specific row by ID"""
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        # Check if row exists
-        cursor.execute("SELECT COUNT(*) FROM issues WHERE id = %s", (article_id,))
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
+        stats = delete_rows_in_chunks("id", [article_id], progress=False)
+        if stats["deleted"]:
+            print(f"Deleted {stats['deleted']} row(s) with ID: {article_id}")
+        else:
             print(f"No row found with ID: {article_id}")
-            return
-        
-        # Delete the row
-        cursor.execute("DELETE FROM issues WHERE id = %s", (article_id,))
-        connection.commit()
-        
-        print(f"Deleted 1 row with ID: {article_id}")
-        
-        cursor.close()
-        connection.close()
-        
     except Exception as e:
         print(f"Error deleting row: {e}")
 
 def show_all_rows():
     """Show all existing rows"""
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute("SELECT id, title, LEFT(content, 50) as content_preview, reference, created_at FROM issues ORDER BY id")
-        rows = cursor.fetchall()
-        
-        if not rows:
-            print("No rows found in the issues table.")
-            return
-        
-        print(f"Found {len(rows)} rows:")
-        print("-" * 100)
-        for row in rows:
-            print(f"ID: {row[0]}")
-            print(f"Title: {row[1]}")
-            print(f"Content: {row[2]}...")
-            print(f"Reference: {row[3]}")
-            print(f"Created: {row[4]}")
+        with db_connection() as connection:
+            cursor = connection.cursor()
+            
+            cursor.execute("SELECT id, title, LEFT(content, 50) as content_preview, reference, created_at FROM issues ORDER BY id")
+            rows = cursor.fetchall()
+            
+            if not rows:
+                print("No rows found in the issues table.")
+                return
+            
+            print(f"Found {len(rows)} rows:")
             print("-" * 100)
-        
-        cursor.close()
-        connection.close()
+            for row in rows:
+                print(f"ID: {row[0]}")
+                print(f"Title: {row[1]}")
+                print(f"Content: {row[2]}...")
+                print(f"Reference: {row[3]}")
+                print(f"Created: {row[4]}")
+                print("-" * 100)
+            
+            cursor.close()
         
     except Exception as e:
         print(f"Error showing rows: {e}")
 
+def print_summary(stats: dict):
+    label = "Would delete" if stats["dry_run"] else "Deleted"
+    count = stats["matched"] if stats["dry_run"] else stats["deleted"]
+    print(f"{label} {count} row(s) in {stats['chunks']} chunk(s) ({stats.get('elapsed_seconds', 0)}s)")
+    if "requested" in stats:
+        print(f"Requested values: {stats['requested']}, not found: {len(stats['missing'])}")
+        for value in stats["missing"][:20]:
+            print(f"  - {value}")
+        if len(stats["missing"]) > 20:
+            print(f"  ... and {len(stats['missing']) - 20} more")
+
+def run_batch(argv: list) -> int:
+    parser = argparse.ArgumentParser(
+        description="Delete issues in chunked batches",
+        epilog="The running API's read cache is only cleared when ISSUES_CACHE_REDIS_URL is set; "
+               "otherwise its cached pages expire after ISSUES_CACHE_TTL seconds."
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ids-file", help="File with one issue id per line")
+    target.add_argument("--references-file", help="File with one reference URL per line")
+    target.add_argument("--all", action="store_true", help="Delete every issue")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per DELETE statement")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Seconds to pause between chunks")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be deleted")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    args = parser.parse_args(argv)
+
+    if args.all:
+        if not args.dry_run and not args.yes:
+            confirm = input("Are you sure you want to delete ALL rows? (yes/no): ").strip().lower()
+            if confirm != "yes":
+                print("Deletion cancelled.")
+                return 1
+        try:
+            stats = delete_all_rows(args.chunk_size, args.throttle, args.dry_run)
+        except Exception as e:
+            print(f"Error deleting rows: {e}")
+            return 1
+        print_summary(stats)
+        return 0
+
+    column = "id" if args.ids_file else "reference"
+    try:
+        values = read_values(args.ids_file or args.references_file, as_ids=column == "id")
+    except (OSError, ValueError) as e:
+        print(f"Error reading values: {e}")
+        return 1
+    print(f"{len(values)} {column} value(s) loaded")
+
+    try:
+        stats = delete_rows_in_chunks(column, values, args.chunk_size, args.throttle, args.dry_run)
+    except Exception as e:
+        print(f"Error deleting rows: {e}")
+        return 1
+    print_summary(stats)
+    return 0
+
 def main():
     print("=== Database Row Management ===")
     print("1. Show all rows")
@@ -133,7 +299,10 @@ def main():
         elif choice == "2":
             confirm = input("Are you sure you want to delete ALL rows? (yes/no): ").strip().lower()
             if confirm == "yes":
-                delete_all_rows()
+                try:
+                    delete_all_rows()
+                except Exception as e:
+                    print(f"Error deleting rows: {e}")
             else:
                 print("Deletion cancelled.")
         elif choice == "3":
@@ -155,4 +324,6 @@ def main():
             print("Invalid choice. Please enter 1-5.")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
     main() 
\ No newline at end of file
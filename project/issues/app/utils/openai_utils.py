@@ -3,11 +3,18 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from ...utils.llm_cache import llm_cache
+
 # 프로젝트 루트의 .env 파일 로드
 project_root = Path(__file__).parent.parent.parent.parent
 env_path = project_root / ".env"
 load_dotenv(env_path)
 
+SUMMARY_MODEL = "gpt-3.5-turbo"
+
+# 프롬프트를 바꾸면 버전을 올려서 이전 캐시 결과가 재사용되지 않도록 함
+SUMMARY_TEMPLATE_VERSION = "app.summarize_text:v1"
+
 def summarize_text(text: str, max_tokens: int = 500) -> str:
     """
     OpenAI API를 사용하여 텍스트를 요약하는 함수
@@ -19,11 +26,15 @@ def summarize_text(text: str, max_tokens: int = 500) -> str:
     Returns:
         str: 요약된 텍스트
     """
+    cached = llm_cache.get(SUMMARY_MODEL, SUMMARY_TEMPLATE_VERSION, (text, max_tokens))
+    if cached is not None:
+        return cached
+    
     try:
         client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=SUMMARY_MODEL,
             messages=[
                 {
                     "role": "system", 
@@ -38,7 +49,9 @@ def summarize_text(text: str, max_tokens: int = 500) -> str:
             temperature=0.3
         )
         
-        return response.choices[0].message.content.strip()
+        summary = response.choices[0].message.content.strip()
+        llm_cache.set(SUMMARY_MODEL, SUMMARY_TEMPLATE_VERSION, (text, max_tokens), summary)
+        return summary
         
     except Exception as e:
         print(f"OpenAI API 오류: {e}")
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from datetime import datetime
-import mysql.connector
+import json
+import zlib
 from mysql.connector import Error
+from .services import issue_repository
+from .services.auth_cache import admin_auth_cache
+from .services.database import iterate_in_db_executor
+from .services.issue_cache import etag_matches, issue_read_cache, render_entry
 
 router = APIRouter()
 
@@ -29,28 +35,23 @@ class IssueResponse(IssueBase):
     class Config:
         from_attributes = True
 
-# Database configuration for issues table (in harukcal2 database)
-MYSQL_CONFIG = {
-    'host': '141.164.52.125',
-    'database': 'harukcal2',  # Your actual database name
-    'user': 'anra1',  # Correct username from DBeaver
-    'password': '12341234'  # Correct password from DBeaver
-}
-
-# Database configuration for users table (member table in harukcal2 database)
-USERS_DB_CONFIG = {
-    'host': '141.164.52.125',
-    'database': 'harukcal2',  # Same database as issues table
-    'user': 'anra1',  # Correct username from DBeaver
-    'password': '12341234'  # Correct password from DBeaver
-}
+class IssueListItem(BaseModel):
+    """List entry; only the fields requested with ?fields= are present"""
+    id: int
+    title: Optional[str] = None
+    content: Optional[str] = None
+    writer: Optional[str] = None
+    reference: Optional[str] = None
+    date: Optional[str] = None
 
-def get_connection():
-    return mysql.connector.connect(**MYSQL_CONFIG)
+# Page size limits for GET /issues/ (a request without limit and after_id gets every issue)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
-# Since both tables are in the same database, we can use the same connection
-def get_users_connection():
-    return mysql.connector.connect(**MYSQL_CONFIG)
+# Connection settings and SQL live in the repository; every query runs on the
+# bounded database executor so a slow query never blocks the event loop
+MYSQL_CONFIG = issue_repository.MYSQL_CONFIG
+get_connection = issue_repository.get_connection
 
 # Admin role verification function
 async def verify_admin_role(authorization: str = Header(None)):
@@ -61,33 +62,26 @@ async def verify_admin_role(authorization: str = Header(None)):
     print(f"[DEBUG] verify_admin_role - authorization header: {authorization}")
     
     try:
-        # Connect to users database to verify user role
-        conn = get_users_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Query to get user role by authorization token/email
-        # Using the member table in harukcal2 database
-        query = """
-        SELECT role FROM member 
-        WHERE email = %s OR id = %s
-        """
-        cursor.execute(query, (authorization, authorization))
-        user = cursor.fetchone()
-        
-        print(f"[DEBUG] verify_admin_role - database query result: {user}")
-        
-        cursor.close()
-        conn.close()
-        
-        if not user:
+        # Recent decisions (including "no such user") are served from memory
+        cached, role = admin_auth_cache.get(authorization)
+        if cached:
+            print(f"[DEBUG] verify_admin_role - cached role: {role}")
+        else:
+            # Users live in the member table of the same database
+            user = await issue_repository.find_member_role(authorization)
+            print(f"[DEBUG] verify_admin_role - database query result: {user}")
+            role = user['role'] if user else None
+            admin_auth_cache.set(authorization, role)
+        
+        if role is None:
             print(f"[DEBUG] verify_admin_role - user not found for email/id: {authorization}")
             raise HTTPException(status_code=401, detail="User not found")
         
-        print(f"[DEBUG] verify_admin_role - user role from database: {user['role']}")
+        print(f"[DEBUG] verify_admin_role - user role: {role}")
         
         # Check if user has ADMIN role using the enum value
-        if user['role'] != 'ADMIN':
-            print(f"[DEBUG] verify_admin_role - role mismatch. Expected: ADMIN, Got: {user['role']}")
+        if role != 'ADMIN':
+            print(f"[DEBUG] verify_admin_role - role mismatch. Expected: ADMIN, Got: {role}")
             raise HTTPException(status_code=403, detail="Admin role required")
         
         print(f"[DEBUG] verify_admin_role - admin role verified successfully")
@@ -102,48 +96,83 @@ async def verify_admin_role(authorization: str = Header(None)):
         print(f"[Auth] Error: {e}")
         raise HTTPException(status_code=500, detail="Authentication error")
 
-@router.get("/", response_model=List[IssueResponse])
-async def get_all_issues():
-    """Get all issues from the database"""
-    print("[DEBUG] Starting get_all_issues function")
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """?fields=id,title,... -> list of response fields (all fields when empty)"""
+    if not fields:
+        return list(issue_repository.LIST_COLUMNS)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in issue_repository.LIST_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def cached_json_response(entry: dict, if_none_match: Optional[str]) -> Response:
+    """Rendered entry (see render_entry) as a response, or 304 when the client already has it"""
+    headers = dict(entry["headers"], ETag=entry["etag"])
+    # Clients may keep the body but must revalidate it with If-None-Match
+    headers["Cache-Control"] = "no-cache"
+    if etag_matches(if_none_match, entry["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+def format_list_item(issue: dict, requested: List[str]) -> dict:
+    item = {"id": issue["id"]}
+    for name in requested:
+        if name == "writer":
+            item["writer"] = issue["writer_nickname"] or "관리자"
+        elif name == "date":
+            item["date"] = issue["date"] or datetime.now().strftime("%Y.%m.%d")
+        elif name != "id":
+            item[name] = issue[name]
+    return item
+
+@router.get("/", response_model=List[IssueListItem])
+async def get_all_issues(
+    after_id: Optional[int] = Query(None, ge=0, description="Return issues older than this id (cursor from X-Next-After-Id)"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"Page size (default {DEFAULT_PAGE_SIZE} when paging)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,title,date (omit content for list views)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get issues newest first, one keyset page at a time
+
+    Without limit and after_id every issue is returned in one response, as
+    before paging existed; pass limit (or an after_id cursor, which defaults
+    to DEFAULT_PAGE_SIZE rows) to page. Headers: X-Total-Count (cached row count), X-Next-After-Id (cursor for
+    the next page, absent on the last page) and ETag (send it back as
+    If-None-Match to get 304 while the page is unchanged).
+    """
+    print(f"[DEBUG] Starting get_all_issues function (after_id={after_id}, limit={limit}, fields={fields})")
+    requested = parse_fields(fields)
+    if limit is None and after_id is not None:
+        limit = DEFAULT_PAGE_SIZE
+
+    version = await issue_read_cache.version_async()
+    key = issue_read_cache.page_key(after_id, limit, requested, version)
+    cached, entry = await issue_read_cache.get_async(key)
+    if cached:
+        return cached_json_response(entry, if_none_match)
+
     try:
-        print("[DEBUG] Attempting database connection...")
-        conn = get_connection()
-        print("[DEBUG] Database connection successful")
-        cursor = conn.cursor(dictionary=True)
-        print("[DEBUG] Cursor created successfully")
-        
-        # Query to get all issues with user nickname information
-        query = """
-        SELECT i.id, i.title, i.content, i.reference, 
-               DATE_FORMAT(i.created_at, '%Y.%m.%d') as date,
-               m.nickname as writer_nickname
-        FROM issues i
-        LEFT JOIN member m ON i.admin_id = m.id
-        ORDER BY i.id DESC
-        """
-        print(f"[DEBUG] Executing query: {query}")
-        cursor.execute(query)
-        print("[DEBUG] Query executed successfully")
-        issues = cursor.fetchall()
+        # One extra row tells whether another page exists
+        issues = await issue_repository.fetch_issue_page(after_id, limit + 1 if limit else None, requested)
+        total_count = await issue_repository.count_issues()
         print(f"[DEBUG] Fetched {len(issues)} issues from database")
         
-        cursor.close()
-        conn.close()
+        has_more = limit is not None and len(issues) > limit
+        issues = issues[:limit]
         
         # Transform the data to match our response model
-        formatted_issues = []
-        for issue in issues:
-            formatted_issues.append({
-                "id": issue["id"],
-                "title": issue["title"],
-                "content": issue["content"],
-                "writer": issue["writer_nickname"] or "관리자",
-                "reference": issue["reference"],
-                "date": issue["date"] or datetime.now().strftime("%Y.%m.%d")
-            })
+        formatted_issues = [format_list_item(issue, requested) for issue in issues]
+        
+        headers = {"X-Total-Count": str(total_count)}
+        if has_more:
+            headers["X-Next-After-Id"] = str(issues[-1]["id"])
         
-        return formatted_issues
+        # Rows are already response-shaped: skip a second validation pass over the page
+        entry = render_entry(formatted_issues, headers)
+        await issue_read_cache.set_async(key, entry, version)
+        return cached_json_response(entry, if_none_match)
         
     except Error as e:
         print(f"[DB] Error fetching issues: {e}")
@@ -155,15 +184,7 @@ async def test_database():
     """Test database connection"""
     try:
         print("[DEBUG] Testing database connection...")
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Simple test query
-        cursor.execute("SELECT 1 as test")
-        result = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        result = await issue_repository.ping()
         
         print("[DEBUG] Database connection test successful")
         return {"status": "Database connection successful", "test_result": result}
@@ -175,38 +196,92 @@ async def test_database():
         print(f"[DEBUG] Unexpected error in database test: {e}")
         return {"status": "Unexpected error", "error": str(e)}
 
+def export_chunks(requested: List[str], output_format: str, compress: bool) -> Iterator[bytes]:
+    """
+    Blocking generator of encoded export chunks, one per database batch
+    Runs on the database executor (see iterate_in_db_executor).
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31: gzip container
+    first = True
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if output_format == "json":
+        yield emit("[")
+    for batch in issue_repository.iter_issue_batches(requested):
+        lines = [json.dumps(format_list_item(issue, requested), ensure_ascii=False) for issue in batch]
+        if output_format == "json":
+            text = ("" if first else ",\n") + ",\n".join(lines)
+        else:
+            text = "\n".join(lines) + "\n"
+        first = False
+        chunk = emit(text)
+        if chunk:
+            yield chunk
+    if output_format == "json":
+        yield emit("]")
+    if compressor:
+        yield compressor.flush()
+
+@router.post("/auth-cache/invalidate")
+async def invalidate_auth_cache(authorization_value: Optional[str] = None, admin_verified: bool = Depends(verify_admin_role)):
+    """Forget cached role lookups (one Authorization value, or all) after a member's role changes"""
+    admin_auth_cache.invalidate(authorization_value)
+    return {"status": "invalidated", "authorization": authorization_value or "all", "cache": admin_auth_cache.stats()}
+
+@router.get("/export")
+async def export_issues(
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|json)$",
+                               description="ndjson (one issue per line) or json (array)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, as for GET /issues/"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    """
+    Stream every issue (newest first) straight from a server-side cursor
+
+    Memory stays flat regardless of table size: rows are fetched, encoded and
+    sent one batch at a time.
+    """
+    requested = parse_fields(fields)
+    print(f"[DEBUG] Exporting issues as {output_format} (fields={requested}, gzip={gzip})")
+
+    media_type = "application/x-ndjson" if output_format == "ndjson" else "application/json"
+    headers = {"Content-Disposition": f'attachment; filename="issues.{output_format}{".gz" if gzip else ""}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        iterate_in_db_executor(export_chunks(requested, output_format, gzip)),
+        media_type=media_type,
+        headers=headers,
+    )
+
 @router.get("/{issue_id}", response_model=IssueResponse)
-async def get_issue_by_id(issue_id: int):
-    """Get a specific issue by ID"""
+async def get_issue_by_id(issue_id: int, if_none_match: Optional[str] = Header(None)):
+    """Get a specific issue by ID (ETag / If-None-Match aware)"""
+    key = issue_read_cache.issue_key(issue_id)
+    cached, entry = await issue_read_cache.get_async(key)
+    if cached:
+        return cached_json_response(entry, if_none_match)
+
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-        SELECT i.id, i.title, i.content, i.reference, 
-               DATE_FORMAT(i.created_at, '%Y.%m.%d') as date,
-               m.nickname as writer_nickname
-        FROM issues i
-        LEFT JOIN member m ON i.admin_id = m.id
-        WHERE i.id = %s
-        """
-        cursor.execute(query, (issue_id,))
-        issue = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        version = await issue_read_cache.version_async()
+        issue = await issue_repository.fetch_issue(issue_id)
         
         if not issue:
             raise HTTPException(status_code=404, detail="Issue not found")
         
-        return {
+        entry = render_entry({
             "id": issue["id"],
             "title": issue["title"],
             "content": issue["content"],
             "writer": issue["writer_nickname"] or "관리자",
             "reference": issue["reference"],
             "date": issue["date"] or datetime.now().strftime("%Y.%m.%d")
-        }
+        })
+        await issue_read_cache.set_async(key, entry, version)
+        return cached_json_response(entry, if_none_match)
         
     except Error as e:
         print(f"[DB] Error fetching issue: {e}")
@@ -216,27 +291,14 @@ async def get_issue_by_id(issue_id: int):
 async def create_issue(issue: IssueCreate, admin_verified: bool = Depends(verify_admin_role)):
     """Create a new issue"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Insert new issue
-        query = """
-        INSERT INTO issues (title, content, reference, created_at, admin_id) 
-        VALUES (%s, %s, %s, NOW(), 1)
-        """
-        cursor.execute(query, (issue.title, issue.content, issue.writer))
-        conn.commit()
-        
-        # Get the inserted issue
-        issue_id = cursor.lastrowid
-        cursor.close()
-        conn.close()
+        issue_id = await issue_repository.insert_issue(issue.title, issue.content, issue.writer)
         
         return {
             "id": issue_id,
             "title": issue.title,
             "content": issue.content,
             "writer": issue.writer,
+            "reference": issue.writer,  # stored in the reference column
             "date": datetime.now().strftime("%Y.%m.%d")
         }
         
@@ -248,58 +310,24 @@ async def create_issue(issue: IssueCreate, admin_verified: bool = Depends(verify
 async def update_issue(issue_id: int, issue_update: IssueUpdate, admin_verified: bool = Depends(verify_admin_role)):
     """Update an existing issue"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        # Only fields present in the request are updated
+        fields = {
+            name: value
+            for name, value in (
+                ("title", issue_update.title),
+                ("content", issue_update.content),
+                ("writer", issue_update.writer),
+            )
+            if value is not None
+        }
         
-        # First check if issue exists
-        check_query = "SELECT id FROM issues WHERE id = %s"
-        cursor.execute(check_query, (issue_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            conn.close()
+        updated_issue = await issue_repository.update_issue(issue_id, fields)
+        if updated_issue is None:
             raise HTTPException(status_code=404, detail="Issue not found")
         
-        # Build update query dynamically
-        update_fields = []
-        update_values = []
-        
-        if issue_update.title is not None:
-            update_fields.append("title = %s")
-            update_values.append(issue_update.title)
-        
-        if issue_update.content is not None:
-            update_fields.append("content = %s")
-            update_values.append(issue_update.content)
-        
-        if issue_update.writer is not None:
-            update_fields.append("reference = %s")
-            update_values.append(issue_update.writer)
-        
-        if not update_fields:
-            cursor.close()
-            conn.close()
+        if not fields:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        update_values.append(issue_id)
-        query = f"UPDATE issues SET {', '.join(update_fields)} WHERE id = %s"
-        cursor.execute(query, update_values)
-        conn.commit()
-        
-        # Get updated issue
-        select_query = """
-        SELECT i.id, i.title, i.content, i.reference, 
-               DATE_FORMAT(i.created_at, '%Y.%m.%d') as date,
-               m.nickname as writer_nickname
-        FROM issues i
-        LEFT JOIN member m ON i.admin_id = m.id
-        WHERE i.id = %s
-        """
-        cursor.execute(select_query, (issue_id,))
-        updated_issue = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
-        
         return {
             "id": updated_issue["id"],
             "title": updated_issue["title"],
@@ -317,25 +345,9 @@ async def update_issue(issue_id: int, issue_update: IssueUpdate, admin_verified:
 async def delete_issue(issue_id: int, admin_verified: bool = Depends(verify_admin_role)):
     """Delete an issue"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Check if issue exists
-        check_query = "SELECT id FROM issues WHERE id = %s"
-        cursor.execute(check_query, (issue_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            conn.close()
+        if not await issue_repository.delete_issue(issue_id):
             raise HTTPException(status_code=404, detail="Issue not found")
         
-        # Delete the issue
-        delete_query = "DELETE FROM issues WHERE id = %s"
-        cursor.execute(delete_query, (issue_id,))
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
-        
         return {"message": f"Issue {issue_id} deleted successfully"}
         
     except Error as e:
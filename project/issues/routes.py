@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Optional
 from .services.crawler import crawl_kjcn_article
 from .services.batch_crawler import crawl_article_range, crawl_next_articles, crawl_previous_articles
 from .services.scheduled_crawler import scheduled_crawler
+from .services.retention import RETENTION_BATCH_SIZE, current_retention_job, start_retention_job
 from .crud_routes import router as crud_router, verify_admin_role
 
 router = APIRouter()
@@ -62,36 +64,36 @@ async def crawl(url: str, admin_verified: bool = Depends(verify_admin_role)):
     return result
 
 @router.get("/crawl-range")
-async def crawl_range(start_number: int, end_number: int, delay: float = 1.0, admin_verified: bool = Depends(verify_admin_role)):
+async def crawl_range(start_number: int, end_number: int, delay: float = 1.0, concurrency: int = 1, admin_verified: bool = Depends(verify_admin_role)):
     """
     Crawl a range of articles with incrementing numbers
     Example: /issues/crawl-range?start_number=1669&end_number=1675
     """
-    results = await crawl_article_range(start_number, end_number, delay)
+    results = await crawl_article_range(start_number, end_number, delay, concurrency)
     return {
         "message": f"Batch crawl completed for articles {start_number} to {end_number}",
         "results": results
     }
 
 @router.get("/crawl-next")
-async def crawl_next(current_number: int, count: int = 5, delay: float = 1.0, admin_verified: bool = Depends(verify_admin_role)):
+async def crawl_next(current_number: int, count: int = 5, delay: float = 1.0, concurrency: int = 1, admin_verified: bool = Depends(verify_admin_role)):
     """
     Crawl the next N articles starting from current number
     Example: /issues/crawl-next?current_number=1669&count=3
     """
-    results = await crawl_next_articles(current_number, count, delay)
+    results = await crawl_next_articles(current_number, count, delay, concurrency)
     return {
         "message": f"Crawled next {count} articles starting from {current_number}",
         "results": results
     }
 
 @router.get("/crawl-previous")
-async def crawl_previous(current_number: int, count: int = 5, delay: float = 1.0, admin_verified: bool = Depends(verify_admin_role)):
+async def crawl_previous(current_number: int, count: int = 5, delay: float = 1.0, concurrency: int = 1, admin_verified: bool = Depends(verify_admin_role)):
     """
     Crawl the previous N articles starting from current number
     Example: /issues/crawl-previous?current_number=1669&count=3
     """
-    results = await crawl_previous_articles(current_number, count, delay)
+    results = await crawl_previous_articles(current_number, count, delay, concurrency)
     return {
         "message": f"Crawled previous {count} articles ending at {current_number}",
         "results": results
@@ -199,6 +201,30 @@ async def cleanup_oldest(count: int = 10, admin_verified: bool = Depends(verify_
     result = await scheduled_crawler.cleanup_oldest_articles(count)
     return result
 
+@router.post("/retention")
+async def run_retention(max_rows: Optional[int] = None, max_age_days: Optional[float] = None,
+                        batch_size: int = RETENTION_BATCH_SIZE, admin_verified: bool = Depends(verify_admin_role)):
+    """
+    Start pruning old issues in the background (keep the newest max_rows and/or
+    nothing older than max_age_days); poll GET /issues/retention for progress
+    Example: POST /issues/retention?max_rows=5000
+    """
+    if max_rows is None and max_age_days is None:
+        raise HTTPException(status_code=400, detail="max_rows or max_age_days is required")
+    running = current_retention_job()
+    if running is not None and running.running:
+        raise HTTPException(status_code=409, detail="A retention job is already running")
+    job = start_retention_job(max_rows=max_rows, max_age_days=max_age_days, batch_size=batch_size)
+    return job.progress
+
+@router.get("/retention")
+async def retention_status(admin_verified: bool = Depends(verify_admin_role)):
+    """Progress of the running (or last) retention job"""
+    job = current_retention_job()
+    if job is None:
+        return {"status": "idle"}
+    return job.progress
+
 # Include CRUD routes
 router.include_router(crud_router, tags=["issues-crud"])
 
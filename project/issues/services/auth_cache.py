@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Seconds a looked-up role is trusted (a role change takes effect within this window)
+ADMIN_AUTH_CACHE_TTL = float(os.getenv('ADMIN_AUTH_CACHE_TTL', 60))
+# Seconds an unknown authorization value is remembered as "no such user"
+ADMIN_AUTH_NEGATIVE_TTL = float(os.getenv('ADMIN_AUTH_NEGATIVE_TTL', 10))
+ADMIN_AUTH_CACHE_MAX_ENTRIES = int(os.getenv('ADMIN_AUTH_CACHE_MAX_ENTRIES', 1024))
+
+class AuthDecisionCache:
+    """
+    In-process cache of member roles keyed by the Authorization header value
+
+    A role (found user) is kept for ttl seconds; None (unknown user) for
+    negative_ttl seconds, so repeated bad tokens do not hit MySQL either.
+    Least recently used entries are dropped past max_entries. Database
+    errors must not be cached.
+    """
+
+    def __init__(self, ttl: float = ADMIN_AUTH_CACHE_TTL, negative_ttl: float = ADMIN_AUTH_NEGATIVE_TTL,
+                 max_entries: int = ADMIN_AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # authorization -> (role or None, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, authorization: str) -> Tuple[bool, Optional[str]]:
+        """(True, role) on a hit, role None meaning unknown user; (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(authorization)
+            if entry is not None:
+                role, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(authorization)
+                    self.hits += 1
+                    return True, role
+                del self._entries[authorization]
+            self.misses += 1
+            return False, None
+
+    def set(self, authorization: str, role: Optional[str]) -> None:
+        ttl = self.ttl if role is not None else self.negative_ttl
+        with self._lock:
+            self._entries[authorization] = (role, time.monotonic() + ttl)
+            self._entries.move_to_end(authorization)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, authorization: str = None) -> None:
+        """Forget one authorization value, or everything when called without one"""
+        with self._lock:
+            if authorization is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(authorization, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# Shared by verify_admin_role
+admin_auth_cache = AuthDecisionCache()
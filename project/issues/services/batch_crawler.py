@@ -1,8 +1,10 @@
 import asyncio
 from typing import List, Dict
-from .crawler import crawl_kjcn_article
+from .bulk_writer import BULK_INSERT_BATCH_SIZE, IssueBatchWriter
+from .crawler import crawl_kjcn_article, article_url
 
-async def crawl_article_range(start_number: int, end_number: int, delay: float = 1.0) -> List[Dict]:
+async def crawl_article_range(start_number: int, end_number: int, delay: float = 1.0, concurrency: int = 1,
+                              batch_size: int = BULK_INSERT_BATCH_SIZE) -> List[Dict]:
     """
     Crawl a range of articles with incrementing numbers
     
@@ -10,56 +12,83 @@ async def crawl_article_range(start_number: int, end_number: int, delay: float =
         start_number: Starting article number (e.g., 1669)
         end_number: Ending article number (e.g., 1675)
         delay: Delay between requests in seconds (default: 1.0)
+        concurrency: Number of articles crawled at the same time (default: 1)
+        batch_size: Crawled articles stored per multi-row insert
     
     Returns:
-        List of results for each article
+        List of results for each article ("success", "duplicate", "error" or "exception")
     """
-    results = []
-    
-    print(f"Starting batch crawl from article {start_number} to {end_number}")
+    print(f"Starting batch crawl from article {start_number} to {end_number} (concurrency: {concurrency})")
     print("=" * 60)
     
-    for article_number in range(start_number, end_number + 1):
-        url = f"https://kjcn.or.kr/journal/view.php?number={article_number}"
-        
-        print(f"\nCrawling article {article_number}: {url}")
-        print("-" * 50)
-        
-        try:
-            result = await crawl_kjcn_article(url)
+    # Each slot waits `delay` seconds after its request, so concurrency=1
+    # keeps the original one-request-at-a-time pacing
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # Article number -> outcome future of its buffered insert
+    pending_saves = {}
+    
+    async def crawl_one(article_number: int) -> Dict:
+        async with semaphore:
+            url = article_url(article_number)
             
-            if "error" in result:
-                print(f"❌ Article {article_number}: {result['error']}")
-                results.append({
-                    "article_number": article_number,
-                    "url": url,
-                    "status": "error",
-                    "error": result["error"]
-                })
-            else:
-                print(f"✅ Article {article_number}: {result['title']}")
-                results.append({
+            print(f"\nCrawling article {article_number}: {url}")
+            print("-" * 50)
+            
+            try:
+                result = await crawl_kjcn_article(url, writer)
+                
+                if "error" in result:
+                    print(f"❌ Article {article_number}: {result['error']}")
+                    outcome = {
+                        "article_number": article_number,
+                        "url": url,
+                        "status": "error",
+                        "error": result["error"]
+                    }
+                else:
+                    print(f"✅ Article {article_number}: {result['title']}")
+                    pending_saves[article_number] = result["pending_save"]
+                    outcome = {
+                        "article_number": article_number,
+                        "url": url,
+                        "status": "success",
+                        "title": result["title"],
+                        "content_length": len(result["content"]),
+                        "reference": result["reference"]
+                    }
+                    
+            except Exception as e:
+                print(f"❌ Article {article_number}: Exception - {e}")
+                outcome = {
                     "article_number": article_number,
                     "url": url,
-                    "status": "success",
-                    "title": result["title"],
-                    "content_length": len(result["content"]),
-                    "reference": result["reference"]
-                })
-                
-        except Exception as e:
-            print(f"❌ Article {article_number}: Exception - {e}")
-            results.append({
-                "article_number": article_number,
-                "url": url,
-                "status": "exception",
-                "error": str(e)
-            })
-        
-        # Add delay between requests to be respectful to the server
-        if article_number < end_number:
-            print(f"Waiting {delay} seconds before next request...")
-            await asyncio.sleep(delay)
+                    "status": "exception",
+                    "error": str(e)
+                }
+            
+            # Add delay between requests to be respectful to the server
+            if delay > 0 and article_number < end_number:
+                print(f"Waiting {delay} seconds before next request...")
+                await asyncio.sleep(delay)
+            
+            return outcome
+    
+    async with IssueBatchWriter(batch_size=batch_size) as writer:
+        results = list(await asyncio.gather(
+            *(crawl_one(article_number) for article_number in range(start_number, end_number + 1))
+        ))
+    
+    # Every batch is flushed now: report what the database did with each article
+    for outcome in results:
+        saved = pending_saves.get(outcome["article_number"])
+        if saved is None:
+            continue
+        if saved.result() == "duplicate":
+            print(f"↩️ Article {outcome['article_number']}: already stored")
+            outcome["status"] = "duplicate"
+        elif saved.result() == "error":
+            outcome["status"] = "error"
+            outcome["error"] = "Database write failed"
     
     # Print summary
     print("\n" + "=" * 60)
@@ -67,17 +96,19 @@ async def crawl_article_range(start_number: int, end_number: int, delay: float =
     print("=" * 60)
     
     successful = sum(1 for r in results if r["status"] == "success")
+    duplicates = sum(1 for r in results if r["status"] == "duplicate")
     errors = sum(1 for r in results if r["status"] == "error")
     exceptions = sum(1 for r in results if r["status"] == "exception")
     
     print(f"Total articles: {len(results)}")
     print(f"Successful: {successful}")
+    print(f"Duplicates: {duplicates}")
     print(f"Errors: {errors}")
     print(f"Exceptions: {exceptions}")
     
     return results
 
-async def crawl_next_articles(current_number: int, count: int = 5, delay: float = 1.0) -> List[Dict]:
+async def crawl_next_articles(current_number: int, count: int = 5, delay: float = 1.0, concurrency: int = 1) -> List[Dict]:
     """
     Crawl the next N articles starting from current number
     
@@ -85,6 +116,7 @@ async def crawl_next_articles(current_number: int, count: int = 5, delay: float
         current_number: Current article number (e.g., 1669)
         count: Number of articles to crawl (default: 5)
         delay: Delay between requests in seconds (default: 1.0)
+        concurrency: Number of articles crawled at the same time (default: 1)
     
     Returns:
         List of results for each article
@@ -92,9 +124,9 @@ async def crawl_next_articles(current_number: int, count: int = 5, delay: float
     start_number = current_number + 1
     end_number = current_number + count
     
-    return await crawl_article_range(start_number, end_number, delay)
+    return await crawl_article_range(start_number, end_number, delay, concurrency)
 
-async def crawl_previous_articles(current_number: int, count: int = 5, delay: float = 1.0) -> List[Dict]:
+async def crawl_previous_articles(current_number: int, count: int = 5, delay: float = 1.0, concurrency: int = 1) -> List[Dict]:
     """
     Crawl the previous N articles starting from current number
     
@@ -102,6 +134,7 @@ async def crawl_previous_articles(current_number: int, count: int = 5, delay: fl
         current_number: Current article number (e.g., 1669)
         count: Number of articles to crawl (default: 5)
         delay: Delay between requests in seconds (default: 1.0)
+        concurrency: Number of articles crawled at the same time (default: 1)
     
     Returns:
         List of results for each article
@@ -109,4 +142,4 @@ async def crawl_previous_articles(current_number: int, count: int = 5, delay: fl
     start_number = current_number - count
     end_number = current_number - 1
     
-    return await crawl_article_range(start_number, end_number, delay) 
\ No newline at end of file
+    return await crawl_article_range(start_number, end_number, delay, concurrency) 
\ No newline at end of file
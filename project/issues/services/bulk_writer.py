@@ -0,0 +1,72 @@
+import asyncio
+import os
+from typing import List, Tuple
+
+from .database import run_db, write_issue_batch
+
+# Rows buffered before a multi-row INSERT is sent
+BULK_INSERT_BATCH_SIZE = int(os.getenv('BULK_INSERT_BATCH_SIZE', 20))
+
+class IssueBatchWriter:
+    """
+    Buffers crawled articles and stores them batch_size at a time
+
+    add() returns a future resolving to "inserted", "duplicate" or "error"
+    once the row's batch is written, so callers never wait on a single row.
+    Full batches are written in the background, one at a time per writer, so
+    a writer's own inserts never contend for the same index locks.
+    Use as an async context manager (or call close()) to flush the remainder:
+
+        async with IssueBatchWriter() as writer:
+            saved = writer.add(title, content, url)
+        outcome = saved.result()
+    """
+
+    def __init__(self, batch_size: int = BULK_INSERT_BATCH_SIZE, role: str = 'ADMIN', config: dict = None):
+        self.batch_size = max(1, batch_size)
+        self.role = role
+        self.config = config
+        self._buffer: List[Tuple[tuple, asyncio.Future]] = []
+        self._flushes = set()
+        self._write_lock = asyncio.Lock()
+        self.batches_written = 0
+
+    def add(self, title: str, content: str, reference: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append(((title, content, reference, self.role), future))
+        if len(self._buffer) >= self.batch_size:
+            # Taken now so no batch exceeds batch_size; written in the background
+            pending, self._buffer = self._buffer, []
+            task = asyncio.ensure_future(self._write(pending))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        return future
+
+    async def flush(self) -> None:
+        pending, self._buffer = self._buffer, []
+        await self._write(pending)
+
+    async def _write(self, pending: List[Tuple[tuple, asyncio.Future]]) -> None:
+        if not pending:
+            return
+        async with self._write_lock:
+            try:
+                outcomes = await run_db(write_issue_batch, [row for row, _ in pending], self.config)
+            except Exception as e:
+                print(f"[DB] Batch writer error: {e}")
+                outcomes = ["error"] * len(pending)
+            self.batches_written += 1
+        for (_, future), outcome in zip(pending, outcomes):
+            if not future.done():
+                future.set_result(outcome)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
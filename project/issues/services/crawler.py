@@ -1,45 +1,46 @@
 import httpx
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import os
 from pathlib import Path
 
-from .database import save_content_to_db
+from .bulk_writer import IssueBatchWriter
+from .database import run_db, save_content_to_db
+from .parser import parse_kjcn_article, format_sections
 from .summarizer import summarize_article_content
-from ..utils.translation_utils import get_short_korean_title
+from ..utils.translation_utils import get_short_korean_title_async
 
 # Load environment variables
 project_root = Path(__file__).parent.parent.parent
 env_path = project_root / ".env"
 load_dotenv(env_path)
 
-async def crawl_kjcn_article(url: str) -> dict:
+# Overridable so the crawler can run against a local replay of the site
+KJCN_BASE_URL = os.getenv("KJCN_BASE_URL", "https://kjcn.or.kr").rstrip("/")
+
+def article_url(article_number: int) -> str:
+    return f"{KJCN_BASE_URL}/journal/view.php?number={article_number}"
+
+async def crawl_kjcn_article(url: str, writer: "IssueBatchWriter" = None) -> dict:
+    """
+    Crawl, title and summarize one article and store it
+
+    With a writer the row is buffered into the writer's next multi-row insert
+    and the result carries the outcome future under "pending_save";
+    otherwise it is saved immediately.
+    """
     print("STEP 2: Inside crawl_kjcn_article")
     
     async with httpx.AsyncClient(timeout=10.0) as client:
         response = await client.get(url)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract title specifically for KJCN journal articles
-        title = "제목 없음"
-        
-        # KJCN-specific title selectors (based on the site structure)
-        kjcn_title_selectors = [
-            ".tit_ko",  # Korean title (highest priority)
-            ".tit",     # English title
-        ]
-        
-        for selector in kjcn_title_selectors:
-            title_tag = soup.select_one(selector)
-            if title_tag:
-                potential_title = title_tag.get_text(strip=True)
-                if len(potential_title) > 5:  # Ensure it's not empty
-                    title = potential_title
-                    print(f"Found KJCN title using selector '{selector}': {title}")
-                    break
-        
+        # Extract title and body sections in one pass
+        # (KJCN-specific selectors: .tit_ko Korean title, .tit English title)
+        parsed = parse_kjcn_article(response.text)
+        title = parsed["title"] or "제목 없음"
+        if parsed["title"]:
+            print(f"Found KJCN title: {title}")
+
         # If no title found, this might not be a valid KJCN article
         if title == "제목 없음":
             print("WARNING: No valid title found. This might not be a KJCN journal article.")
@@ -47,35 +48,31 @@ async def crawl_kjcn_article(url: str) -> dict:
             return {"error": "유효한 KJCN 저널 기사를 찾을 수 없습니다.", "reference": url}
 
         # Ensure we have a short Korean title (translate and summarize if needed)
-        short_korean_title = get_short_korean_title(title, max_words=5)
+        short_korean_title = await get_short_korean_title_async(title, max_words=5)
         print(f"Final short Korean title: {short_korean_title}")
 
         # Extract body sections
-        article_container = soup.select_one("div.contents div.articleCon")
-        if not article_container:
+        if parsed["sections"] is None:
             return {"error": "본문을 찾을 수 없습니다.", "reference": url}
 
-        sections = []
-        for header in article_container.select("h4.link-target"):
-            section_title = header.get_text(strip=True)
-            next_dd = header.find_next_sibling("dd")
-            if next_dd:
-                section_text = next_dd.get_text(strip=True)
-                sections.append(f"[{section_title}]\n{section_text}")
-
-        full_text = "\n\n".join(sections)
+        full_text = format_sections(parsed["sections"])
 
         if not full_text:
             return {"error": "본문 내용이 비어 있습니다.", "reference": url}
 
         # Summarize the content
-        full_summary = summarize_article_content(full_text)
-
-        # Save to database - url becomes reference in DB
-        save_content_to_db(short_korean_title, full_summary, url, "ADMIN")
+        full_summary = await summarize_article_content(full_text)
 
-        return {
+        result = {
             "title": short_korean_title,
             "content": full_summary,
             "reference": url
         }
+
+        # Save to database - url becomes reference in DB (off the event loop)
+        if writer is not None:
+            result["pending_save"] = writer.add(short_korean_title, full_summary, url)
+        else:
+            await run_db(save_content_to_db, short_korean_title, full_summary, url, "ADMIN")
+
+        return result
@@ -1,49 +1,350 @@
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Tuple
+
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
 from config.database import MYSQL_CONFIG
+from .issue_cache import issue_read_cache
+
+# Connections kept per database config; 0 disables pooling (connect per checkout)
+MYSQL_POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', 5))
+# Seconds to wait for a free connection before giving up
+MYSQL_POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', 10))
+# Idle connections older than this are pinged (and reconnected) before reuse
+MYSQL_POOL_PING_INTERVAL = float(os.getenv('MYSQL_POOL_PING_INTERVAL', 30))
+# Threads that run blocking queries for async handlers; matches the pool so workers never queue on a slot
+MYSQL_EXECUTOR_WORKERS = int(os.getenv('MYSQL_EXECUTOR_WORKERS', MYSQL_POOL_SIZE or 5))
+
+class ConnectionPool:
+    """
+    Bounded pool of mysql.connector connections for one database config
+
+    Connections are opened lazily up to pool_size. Checkout waits up to
+    timeout seconds for a free slot, pings connections that sat idle longer
+    than ping_interval (reconnecting dead ones), and check-in rolls back any
+    open transaction so the next user never sees a stale snapshot.
+    """
+
+    def __init__(self, config: dict, pool_size: int = MYSQL_POOL_SIZE,
+                 timeout: float = MYSQL_POOL_TIMEOUT, ping_interval: float = MYSQL_POOL_PING_INTERVAL):
+        self.config = dict(config)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._idle = queue.LifoQueue()  # (connection, last_used)
+        self._slots = threading.BoundedSemaphore(pool_size) if pool_size > 0 else None
+        self.connections_opened = 0
+        self.checkouts = 0
+
+    def _open(self):
+        self.connections_opened += 1
+        return mysql.connector.connect(**self.config)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _checkout(self):
+        if self._slots is None:
+            return self._open()
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"No MySQL connection available within {self.timeout} seconds (pool size {self.pool_size})")
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+
+                if time.monotonic() - last_used < self.ping_interval:
+                    return conn
+                try:
+                    conn.ping(reconnect=True, attempts=1, delay=0)
+                    return conn
+                except Error as e:
+                    print(f"[DB] Dropping dead pooled connection: {e}")
+                    self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, conn, broken: bool):
+        if self._slots is None or broken:
+            self._discard(conn)
+            if self._slots is not None:
+                self._slots.release()
+            return
+
+        try:
+            if conn.unread_result:
+                # Abandoned streaming read (e.g. client disconnected mid-export):
+                # draining the rest could take longer than reconnecting
+                self._discard(conn)
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put((conn, time.monotonic()))
+        except Error:
+            # Connection died while in use: do not reuse it
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self._checkout()
+        self.checkouts += 1
+        broken = False
+        try:
+            yield conn
+        except (OperationalError, InterfaceError):
+            # Lost connection, server gone away, ...
+            broken = True
+            raise
+        finally:
+            self._checkin(conn, broken)
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "idle": self._idle.qsize(),
+            "connections_opened": self.connections_opened,
+            "checkouts": self.checkouts,
+        }
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(config: dict = None) -> ConnectionPool:
+    """
+    Shared pool for a database config (one pool per distinct config)
+    """
+    config = config or MYSQL_CONFIG
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(config)
+            _pools[key] = pool
+        return pool
+
+@contextmanager
+def db_connection(config: dict = None):
+    """
+    Borrow a pooled connection:
+
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            ...
+            conn.commit()
+    """
+    with get_pool(config).connection() as conn:
+        yield conn
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated, bounded thread pool for blocking mysql.connector calls
+
+    Kept separate from the default executor so slow queries cannot starve
+    other run_in_executor / to_thread users (LLM fallbacks, file I/O).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MYSQL_EXECUTOR_WORKERS, thread_name_prefix="mysql")
+        return _executor
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run a blocking database function off the event loop:
+
+        issues = await run_db(fetch_issues)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
+
+_exhausted = object()
+
+async def iterate_in_db_executor(generator):
+    """
+    Drive a blocking generator (e.g. one reading a server-side cursor) one
+    item at a time on the database executor, for use with StreamingResponse
+    """
+    future = None
+    try:
+        while True:
+            future = get_db_executor().submit(next, generator, _exhausted)
+            item = await asyncio.wrap_future(future)
+            if item is _exhausted:
+                break
+            yield item
+    finally:
+        # Releases the generator's pooled connection if the client went away early;
+        # a step still running on a worker thread closes it once it returns
+        if future is not None and not future.done():
+            future.add_done_callback(lambda _: generator.close())
+        else:
+            generator.close()
+
+def shutdown_db_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
 
 def get_connection():
+    """
+    Open a dedicated (unpooled) connection; prefer db_connection() in app code
+    """
     return mysql.connector.connect(**MYSQL_CONFIG)
 
+def _find_by_reference(cursor, reference: str):
+    cursor.execute("SELECT id FROM issues WHERE reference = %s", (reference,))
+    return cursor.fetchone()
+
 def is_duplicate(reference: str) -> bool:
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        query = "SELECT id FROM issues WHERE reference = %s"
-        cursor.execute(query, (reference,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            result = _find_by_reference(cursor, reference)
+            cursor.close()
         return result is not None
     except Error as e:
         print(f"[DB] Error checking duplication: {e}")
         return False
 
-def save_content_to_db(title: str, content: str, reference: str, role: str = 'ADMIN') -> bool:
-    try:
-        if is_duplicate(reference):
-            print("[DB] Duplicate URL found. Skipping insert.")
-            return False
-        
-        # Set admin_id only for ADMIN role
-        admin_id = 8 if role == 'ADMIN' else None
-        
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        if role == 'ADMIN':
-            query = "INSERT INTO issues (title, content, reference, created_at, updated_at, role, admin_id) VALUES (%s, %s, %s, NOW(), NOW(), %s, %s)"  
-            cursor.execute(query, (title, content, reference, role, admin_id))
+def _admin_id_for(role: str):
+    # Set admin_id only for ADMIN role
+    return 8 if role == 'ADMIN' else None
+
+ISSUE_INSERT = (
+    "INSERT INTO issues (title, content, reference, created_at, updated_at, role, admin_id) VALUES {values} "
+    # A reference stored concurrently (unique key, migration 2) is left as is and counts 0 affected rows
+    "ON DUPLICATE KEY UPDATE id = id"
+)
+ISSUE_VALUES = "(%s, %s, %s, NOW(), NOW(), %s, %s)"
+# Errors after which the connection or transaction is gone, so no row can be retried on it
+CONNECTION_LOST_ERRNOS = {2006, 2013}  # server has gone away, lost connection
+TRANSACTION_ABORTED_ERRNOS = CONNECTION_LOST_ERRNOS | {1213}  # deadlock: InnoDB rolled back the transaction
+
+def _insert_rows_one_by_one(cursor, new_rows: list) -> List[str]:
+    # Slow path: one statement per row, so each row's affected count and warnings are its own
+    outcomes = []
+    for row in new_rows:
+        try:
+            cursor.execute(ISSUE_INSERT.format(values=ISSUE_VALUES), row)
+        except Error as e:
+            if e.errno in TRANSACTION_ABORTED_ERRNOS:
+                raise
+            print(f"[DB] Insert failed for {row[2]}: {e}")
+            outcomes.append("error")
+            continue
+        if cursor.rowcount == 0:
+            outcomes.append("duplicate")
+        elif cursor.warning_count:
+            # e.g. truncated on a server without strict mode: not stored as crawled
+            print(f"[DB] Insert of {row[2]} raised {cursor.warning_count} warning(s); dropping the row")
+            cursor.execute("DELETE FROM issues WHERE id = %s", (cursor.lastrowid,))
+            outcomes.append("error")
         else:
-            # For USER role, don't include admin_id
-            query = "INSERT INTO issues (title, content, reference, created_at, updated_at, role) VALUES (%s, %s, %s, NOW(), NOW(), %s)"  
-            cursor.execute(query, (title, content, reference, role))
-            
-        conn.commit()
-        cursor.close()
-        conn.close()
+            outcomes.append("inserted")
+    return outcomes
+
+def write_issue_batch(rows: List[Tuple[str, str, str, str]], config: dict = None) -> List[str]:
+    """
+    Insert (title, content, reference, role) rows with one multi-row INSERT and one commit
+
+    Returns one outcome per row, in order: "inserted", "duplicate" (reference
+    already stored, or repeated earlier in the batch) or "error".
+    Existing references are found with a plain (non-locking) read; a row
+    another writer stored in between hits the unique reference key and is
+    left alone by ON DUPLICATE KEY UPDATE. When the multi-row insert fails,
+    warns or affects fewer rows than sent, it is rolled back and the rows
+    are inserted one by one so each gets its own outcome.
+    """
+    if not rows:
+        return []
+
+    references = [row[2] for row in rows]
+    try:
+        with db_connection(config) as conn:
+            cursor = conn.cursor()
+
+            placeholders = ", ".join(["%s"] * len(references))
+            cursor.execute(f"SELECT reference FROM issues WHERE reference IN ({placeholders})", references)
+            existing = {row[0] for row in cursor.fetchall()}
+
+            outcomes = []
+            new_rows = []
+            for title, content, reference, role in rows:
+                if reference in existing:
+                    outcomes.append("duplicate")
+                    continue
+                existing.add(reference)
+                outcomes.append("inserted")
+                new_rows.append((title, content, reference, role, _admin_id_for(role)))
+
+            if new_rows:
+                try:
+                    cursor.execute(ISSUE_INSERT.format(values=", ".join([ISSUE_VALUES] * len(new_rows))),
+                                   [value for row in new_rows for value in row])
+                    batch_ok = cursor.rowcount == len(new_rows) and not cursor.warning_count
+                except Error as e:
+                    if e.errno in CONNECTION_LOST_ERRNOS:
+                        raise
+                    print(f"[DB] Multi-row insert failed ({e}); inserting rows one by one")
+                    batch_ok = False
+                if not batch_ok:
+                    conn.rollback()
+                    row_outcomes = iter(_insert_rows_one_by_one(cursor, new_rows))
+                    outcomes = [next(row_outcomes) if outcome == "inserted" else outcome for outcome in outcomes]
+            conn.commit()
+            cursor.close()
+        if "inserted" in outcomes:
+            issue_read_cache.invalidate_lists()
+        print(f"[DB] Batch insert: {outcomes.count('inserted')} inserted, {outcomes.count('duplicate')} duplicate, "
+              f"{outcomes.count('error')} error")
+        return outcomes
+    except Error as e:
+        print(f"[DB] Error saving batch of {len(rows)} rows: {e}")
+        return ["error"] * len(rows)
+
+def save_content_to_db(title: str, content: str, reference: str, role: str = 'ADMIN') -> bool:
+    # Duplicate check and insert share one pooled connection (a batch of one)
+    outcome = write_issue_batch([(title, content, reference, role)])[0]
+    if outcome == "duplicate":
+        print("[DB] Duplicate URL found. Skipping insert.")
+        return False
+    if outcome == "inserted":
         print("[DB] Insert successful")
         return True
-    except Error as e:
-        print(f"[DB] Error saving content: {e}")
-        return False
\ No newline at end of file
+    return False
@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # Optional: the in-process backend needs nothing extra
+    redis = None
+
+# Seconds a cached issue or list page is served; 0 disables caching (ETags still work)
+ISSUES_CACHE_TTL = float(os.getenv('ISSUES_CACHE_TTL', 300))
+ISSUES_CACHE_MAX_ENTRIES = int(os.getenv('ISSUES_CACHE_MAX_ENTRIES', 2048))
+# e.g. redis://localhost:6379/0 to share the cache (and its invalidations) between workers
+ISSUES_CACHE_REDIS_URL = os.getenv('ISSUES_CACHE_REDIS_URL')
+
+def render_entry(content, headers: dict = None) -> dict:
+    """
+    Serialize a response once: body bytes (as JSONResponse renders them),
+    extra headers and a strong ETag over both
+    """
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+    headers = dict(headers or {})
+    digest = hashlib.sha1(body)
+    for name in sorted(headers):
+        digest.update(f"\n{name}:{headers[name]}".encode("utf-8"))
+    return {"body": body, "headers": headers, "etag": f'"{digest.hexdigest()}"'}
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in candidates or etag in [value[2:] if value.startswith("W/") else value for value in candidates]
+
+class MemoryBackend:
+    """Thread-safe LRU dict with per-entry expiry"""
+
+    # Calls never wait on I/O, so async callers make them inline
+    blocking = False
+
+    def __init__(self, max_entries: int = ISSUES_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisBackend:
+    """Same interface on a Redis server, so every worker process sees one cache"""
+
+    # Every call is a network round trip: async callers run it in a thread
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "issues:cache:"):
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str):
+        raw = self._client.get(self._prefix + key)
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        value["body"] = value["body"].encode("utf-8")
+        return value
+
+    def set(self, key: str, value: dict, ttl: float):
+        raw = json.dumps(dict(value, body=value["body"].decode("utf-8")), ensure_ascii=False)
+        self._client.set(self._prefix + key, raw, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self._client.delete(self._prefix + key)
+
+    def counter(self, name: str) -> int:
+        return int(self._client.get(self._prefix + name) or 0)
+
+    def incr(self, name: str) -> int:
+        return self._client.incr(self._prefix + name)
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self._prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+    def __len__(self):
+        return sum(1 for _ in self._client.scan_iter(match=self._prefix + "*"))
+
+class IssueReadCache:
+    """
+    Read-through cache of rendered GET /issues/{id} and GET /issues/ responses
+
+    Every write that changes issues calls invalidate_issue(s)() or
+    invalidate_lists(). Both bump a version: list page keys include it, so all
+    pages go stale at once, and a response loaded before a write is never
+    stored after it (pass the version() read before the query to set()).
+    Async code uses the *_async methods, which keep a blocking backend's
+    (Redis) round trips off the event loop.
+    """
+
+    def __init__(self, backend=None, ttl: float = ISSUES_CACHE_TTL):
+        self._backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.enabled = ttl > 0
+        self._listeners: List[Callable[[], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call callback on every invalidation (e.g. to drop a cached row count)"""
+        self._listeners.append(callback)
+
+    def version(self) -> int:
+        return self._backend.counter("version")
+
+    @staticmethod
+    def issue_key(issue_id: int) -> str:
+        return f"issue:{issue_id}"
+
+    @staticmethod
+    def page_key(after_id: Optional[int], limit: int, fields: List[str], version: int) -> str:
+        return f"page:{version}:{after_id}:{limit}:{','.join(fields)}"
+
+    def get(self, key: str) -> Tuple[bool, Optional[dict]]:
+        if not self.enabled:
+            return False, None
+        entry = self._backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry
+
+    def set(self, key: str, entry: dict, version: int):
+        """Store entry unless an invalidation happened since version was read"""
+        if self.enabled and self.version() == version:
+            self._backend.set(key, entry, self.ttl)
+
+    async def _call_async(self, function, *args):
+        if self._backend.blocking:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+    async def version_async(self) -> int:
+        return await self._call_async(self.version)
+
+    async def get_async(self, key: str) -> Tuple[bool, Optional[dict]]:
+        if not self.enabled:
+            return False, None
+        return await self._call_async(self.get, key)
+
+    async def set_async(self, key: str, entry: dict, version: int):
+        if self.enabled:
+            await self._call_async(self.set, key, entry, version)
+
+    async def invalidate_issue_async(self, issue_id: int):
+        await self._call_async(self.invalidate_issue, issue_id)
+
+    async def invalidate_lists_async(self):
+        await self._call_async(self.invalidate_lists)
+
+    async def invalidate_async(self):
+        await self._call_async(self.invalidate)
+
+    def invalidate_issue(self, issue_id: int):
+        self.invalidate_issues([issue_id])
+
+    def invalidate_issues(self, issue_ids):
+        for issue_id in issue_ids:
+            self._backend.delete(self.issue_key(issue_id))
+        self.invalidate_lists()
+
+    def invalidate_lists(self):
+        self._backend.incr("version")
+        for callback in self._listeners:
+            callback()
+
+    def invalidate(self):
+        """Forget everything"""
+        self._backend.clear()
+        self.invalidate_lists()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self._backend).__name__,
+            "entries": len(self._backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def _default_backend():
+    if ISSUES_CACHE_REDIS_URL:
+        if redis is None:
+            print("[Cache] ISSUES_CACHE_REDIS_URL is set but redis is not installed; using the in-process cache")
+        else:
+            return RedisBackend(ISSUES_CACHE_REDIS_URL)
+    return MemoryBackend()
+
+# Shared by the CRUD routes and every code path that writes issues
+issue_read_cache = IssueReadCache(_default_backend())
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+# The issues and member (users) tables live in the harukcal2 database; every issues
+# module uses this one config dict, so they all share one connection pool
+from config.database import MYSQL_CONFIG
+
+from .database import db_connection, run_db
+from .issue_cache import issue_read_cache
+
+ISSUE_SELECT = """
+SELECT i.id, i.title, i.content, i.reference,
+       DATE_FORMAT(i.created_at, '%Y.%m.%d') as date,
+       m.nickname as writer_nickname
+FROM issues i
+LEFT JOIN member m ON i.admin_id = m.id
+"""
+
+# Role lookup by email or member id. Two index lookups (idx_member_email, PRIMARY)
+# joined with UNION ALL instead of "email = %s OR id = %s", which forces a full scan
+MEMBER_ROLE_QUERY = """
+SELECT role FROM member WHERE email = %s
+UNION ALL
+SELECT role FROM member WHERE id = %s
+LIMIT 1
+"""
+
+def member_role_params(identifier: str) -> tuple:
+    # Only numeric values can match an id; NULL keeps the id branch empty otherwise
+    return identifier, int(identifier) if identifier.isdigit() else None
+
+# Columns the update endpoint may change (request field -> column)
+UPDATABLE_COLUMNS = {"title": "title", "content": "content", "writer": "reference"}
+
+# Response field -> select expression for the paginated list (writer needs the member join)
+LIST_COLUMNS = {
+    "id": "i.id",
+    "title": "i.title",
+    "content": "i.content",
+    "reference": "i.reference",
+    "date": "DATE_FORMAT(i.created_at, '%Y.%m.%d') as date",
+    "writer": "m.nickname as writer_nickname",
+}
+
+# Rows fetched per round trip when streaming the full table
+EXPORT_BATCH_SIZE = int(os.getenv('ISSUES_EXPORT_BATCH_SIZE', 1000))
+
+# Seconds the cached COUNT(*) behind X-Total-Count is trusted; CRUD writes refresh it sooner
+ISSUES_COUNT_TTL = float(os.getenv('ISSUES_COUNT_TTL', 60))
+
+class CachedCounter:
+    """
+    COUNT(*) of the issues table, recomputed at most once per ttl seconds
+
+    Every write that goes through issue_read_cache (CRUD endpoints, crawler
+    inserts, retention) calls invalidate(); rows changed behind the API's back
+    are picked up when the TTL expires.
+    """
+
+    def __init__(self, ttl: float = ISSUES_COUNT_TTL):
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def cached(self) -> Optional[int]:
+        """Current value if still fresh, else None"""
+        if self._value is not None and time.monotonic() < self._expires_at:
+            return self._value
+        return None
+
+    def get(self, load) -> int:
+        value = self.cached()
+        if value is not None:
+            return value
+        # One thread recounts; concurrent callers wait and reuse its result
+        with self._lock:
+            if self._value is None or time.monotonic() >= self._expires_at:
+                self._value = load()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._value
+
+    def invalidate(self):
+        self._value = None
+
+issue_counter = CachedCounter()
+issue_read_cache.add_listener(issue_counter.invalidate)
+
+def get_connection():
+    """Borrow a pooled connection (use as a context manager)"""
+    return db_connection(MYSQL_CONFIG)
+
+# Blocking implementations: run on the database executor, never on the event loop
+
+def _find_member_role(identifier: str) -> Optional[dict]:
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        # Query to get user role by authorization token/email
+        cursor.execute(MEMBER_ROLE_QUERY, member_role_params(identifier))
+        user = cursor.fetchone()
+        cursor.close()
+    return user
+
+def build_list_query(fields: List[str]) -> str:
+    query = f"SELECT {', '.join(LIST_COLUMNS[name] for name in fields)} FROM issues i"
+    if "writer" in fields:
+        query += " LEFT JOIN member m ON i.admin_id = m.id"
+    return query
+
+def _fetch_issue_page(after_id: Optional[int], limit: Optional[int], fields: Iterable[str]) -> List[dict]:
+    """
+    Keyset page in id DESC order: up to limit rows (all with limit None) with id < after_id
+    Only the requested fields (plus id) are selected, so list views can skip content.
+    """
+    fields = ["id"] + [name for name in fields if name != "id"]
+    query = build_list_query(fields)
+    params = []
+    if after_id is not None:
+        query += " WHERE i.id < %s"
+        params.append(after_id)
+    query += " ORDER BY i.id DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        issues = cursor.fetchall()
+        cursor.close()
+    return issues
+
+def iter_issue_batches(fields: Iterable[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[dict]]:
+    """
+    Blocking generator over every issue (id DESC) in lists of up to batch_size rows
+
+    Uses an unbuffered (server-side) cursor, so only one batch is in memory at a time.
+    The pooled connection is held until the generator is exhausted or closed.
+    """
+    fields = ["id"] + [name for name in fields if name != "id"]
+    with get_connection() as conn:
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(build_list_query(fields) + " ORDER BY i.id DESC")
+        columns = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+        cursor.close()
+
+def _count_issues() -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM issues")
+        total = cursor.fetchone()[0]
+        cursor.close()
+    return total
+
+def _fetch_issue(issue_id: int) -> Optional[dict]:
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(ISSUE_SELECT + "WHERE i.id = %s", (issue_id,))
+        issue = cursor.fetchone()
+        cursor.close()
+    return issue
+
+def _insert_issue(title: str, content: str, reference: str) -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        query = """
+        INSERT INTO issues (title, content, reference, created_at, admin_id)
+        VALUES (%s, %s, %s, NOW(), 1)
+        """
+        cursor.execute(query, (title, content, reference))
+        conn.commit()
+        issue_id = cursor.lastrowid
+        cursor.close()
+    return issue_id
+
+def _update_issue(issue_id: int, fields: dict) -> Optional[dict]:
+    """
+    Apply fields (request names, see UPDATABLE_COLUMNS) and return the updated row,
+    or None if the issue does not exist. Empty fields only checks existence.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute("SELECT id FROM issues WHERE id = %s", (issue_id,))
+        if not cursor.fetchone():
+            cursor.close()
+            return None
+
+        if fields:
+            assignments = [f"{UPDATABLE_COLUMNS[name]} = %s" for name in fields]
+            cursor.execute(
+                f"UPDATE issues SET {', '.join(assignments)} WHERE id = %s",
+                list(fields.values()) + [issue_id]
+            )
+            conn.commit()
+
+        cursor.execute(ISSUE_SELECT + "WHERE i.id = %s", (issue_id,))
+        updated_issue = cursor.fetchone()
+        cursor.close()
+    return updated_issue
+
+def _delete_issue(issue_id: int) -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT id FROM issues WHERE id = %s", (issue_id,))
+        if not cursor.fetchone():
+            cursor.close()
+            return False
+
+        cursor.execute("DELETE FROM issues WHERE id = %s", (issue_id,))
+        conn.commit()
+        cursor.close()
+    return True
+
+def _ping():
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 as test")
+        result = cursor.fetchone()
+        cursor.close()
+    return result
+
+# Async API used by the FastAPI handlers
+
+async def find_member_role(identifier: str) -> Optional[dict]:
+    return await run_db(_find_member_role, identifier)
+
+async def fetch_issue_page(after_id: Optional[int], limit: Optional[int], fields: Iterable[str]) -> List[dict]:
+    return await run_db(_fetch_issue_page, after_id, limit, list(fields))
+
+async def count_issues() -> int:
+    total = issue_counter.cached()
+    if total is not None:
+        return total
+    return await run_db(issue_counter.get, _count_issues)
+
+async def fetch_issue(issue_id: int) -> Optional[dict]:
+    return await run_db(_fetch_issue, issue_id)
+
+async def insert_issue(title: str, content: str, reference: str) -> int:
+    issue_id = await run_db(_insert_issue, title, content, reference)
+    await issue_read_cache.invalidate_issue_async(issue_id)
+    return issue_id
+
+async def update_issue(issue_id: int, fields: dict) -> Optional[dict]:
+    updated = await run_db(_update_issue, issue_id, fields)
+    if updated is not None and fields:
+        await issue_read_cache.invalidate_issue_async(issue_id)
+    return updated
+
+async def delete_issue(issue_id: int) -> bool:
+    deleted = await run_db(_delete_issue, issue_id)
+    if deleted:
+        await issue_read_cache.invalidate_issue_async(issue_id)
+    return deleted
+
+async def ping():
+    return await run_db(_ping)
@@ -0,0 +1,226 @@
+"""
+Versioned schema migrations for the issues database
+
+    python -m issues.services.migrations            # apply pending migrations
+    python -m issues.services.migrations --status   # list applied / pending
+    python -m issues.services.migrations --check    # EXPLAIN the hot queries, fail on full scans
+
+Run from the project directory (MYSQL_* environment variables select the database).
+"""
+import argparse
+import sys
+from typing import Dict, List
+
+from mysql.connector import Error
+
+from .database import db_connection
+from .issue_repository import LIST_COLUMNS, MEMBER_ROLE_QUERY, MYSQL_CONFIG, build_list_query, member_role_params
+from .retention import DELETE_OLDER_THAN, DELETE_OLDEST
+
+SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL
+)
+"""
+
+# MySQL errors meaning the object a statement creates is already there
+# (1060 duplicate column, 1061 duplicate key name), so re-running a migration
+# that failed half way through is safe
+ALREADY_EXISTS_ERRNOS = (1060, 1061)
+
+# Append only: never edit or renumber a migration that has been applied somewhere
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "index issues.reference",
+        # is_duplicate, write_issue_batch, delete_by_reference
+        "statements": ["CREATE INDEX idx_issues_reference ON issues (reference)"],
+    },
+    {
+        "version": 2,
+        "name": "unique crawled article reference",
+        # Hand-written issues store the writer name in reference, so only URLs
+        # (crawled articles) must be unique: NULLs in crawl_reference never collide
+        "precheck": (
+            "SELECT reference, COUNT(*) FROM issues WHERE reference LIKE 'http%' "
+            "GROUP BY reference HAVING COUNT(*) > 1 LIMIT 10"
+        ),
+        "precheck_message": "Crawled URLs are stored more than once; delete the extra rows first (delete_db_rows.py)",
+        "statements": [
+            "ALTER TABLE issues ADD COLUMN crawl_reference VARCHAR(255) "
+            "AS (CASE WHEN reference LIKE 'http%' THEN reference END) STORED",
+            "CREATE UNIQUE INDEX uq_issues_crawl_reference ON issues (crawl_reference)",
+        ],
+    },
+    {
+        "version": 3,
+        "name": "index issues.created_at",
+        # retention batches (ORDER BY created_at LIMIT n)
+        "statements": ["CREATE INDEX idx_issues_created_at ON issues (created_at)"],
+    },
+    {
+        "version": 4,
+        "name": "index member.email",
+        # verify_admin_role (member.id is already the primary key)
+        "statements": ["CREATE INDEX idx_member_email ON member (email)"],
+    },
+]
+
+def _applied_versions(cursor) -> set:
+    cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def migration_status(config: dict = None, migrations: List[Dict] = MIGRATIONS) -> dict:
+    with db_connection(config or MYSQL_CONFIG) as conn:
+        cursor = conn.cursor()
+        applied = _applied_versions(cursor)
+        cursor.close()
+    return {
+        "applied": [m["version"] for m in migrations if m["version"] in applied],
+        "pending": [m["version"] for m in migrations if m["version"] not in applied],
+    }
+
+def migrate(config: dict = None, migrations: List[Dict] = MIGRATIONS) -> dict:
+    """
+    Apply pending migrations in version order, recording each in schema_migrations
+    Stops at the first failing migration; later ones are left pending.
+    """
+    applied_now = []
+    with db_connection(config or MYSQL_CONFIG) as conn:
+        cursor = conn.cursor()
+        applied = _applied_versions(cursor)
+        conn.commit()
+
+        for migration in sorted(migrations, key=lambda m: m["version"]):
+            if migration["version"] in applied:
+                continue
+            label = f"{migration['version']:03d} {migration['name']}"
+
+            if migration.get("precheck"):
+                cursor.execute(migration["precheck"])
+                blocking_rows = cursor.fetchall()
+                if blocking_rows:
+                    print(f"[DB] Migration {label} blocked: {migration['precheck_message']}")
+                    for row in blocking_rows:
+                        print(f"  - {row}")
+                    cursor.close()
+                    return {
+                        "status": "blocked",
+                        "message": f"Migration {label}: {migration['precheck_message']}",
+                        "applied": applied_now,
+                    }
+
+            try:
+                for statement in migration["statements"]:
+                    try:
+                        cursor.execute(statement)
+                    except Error as e:
+                        if getattr(e, "errno", None) not in ALREADY_EXISTS_ERRNOS:
+                            raise
+                        print(f"[DB] {label}: already present, skipping ({e.msg})")
+                # DDL commits implicitly in MySQL; the bookkeeping row is committed here
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, NOW())",
+                    (migration["version"], migration["name"])
+                )
+                conn.commit()
+            except Error as e:
+                print(f"[DB] Migration {label} failed: {e}")
+                cursor.close()
+                return {"status": "error", "message": f"Migration {label} failed: {e}", "applied": applied_now}
+
+            print(f"[DB] Applied migration {label}")
+            applied_now.append(migration["version"])
+        cursor.close()
+
+    return {
+        "status": "completed",
+        "message": f"Applied {len(applied_now)} migration(s)" if applied_now else "Schema is up to date",
+        "applied": applied_now,
+    }
+
+# Queries on request / crawl paths that must be answered from an index.
+# Sample parameters only shape the plan; nothing is modified (EXPLAIN DELETE does not delete).
+SAMPLE_REFERENCE = "https://kjcn.or.kr/journal/view.php?number=1669"
+HOT_QUERIES = {
+    "is_duplicate": ("SELECT id FROM issues WHERE reference = %s", (SAMPLE_REFERENCE,)),
+    "write_issue_batch": (
+        "SELECT reference FROM issues WHERE reference IN (%s, %s)",
+        (SAMPLE_REFERENCE, SAMPLE_REFERENCE + "0"),
+    ),
+    "delete_by_reference": ("DELETE FROM issues WHERE reference = %s", (SAMPLE_REFERENCE,)),
+    "retention (oldest)": (DELETE_OLDEST, (500,)),
+    "retention (age)": (DELETE_OLDER_THAN, ("2024-01-01 00:00:00", 500)),
+    "verify_admin_role (email)": (MEMBER_ROLE_QUERY, member_role_params("admin@example.com")),
+    "verify_admin_role (id)": (MEMBER_ROLE_QUERY, member_role_params("8")),
+    "get_issue_by_id": ("SELECT id FROM issues WHERE id = %s", (1,)),
+    "get_all_issues (next page)": (
+        build_list_query(list(LIST_COLUMNS)) + " WHERE i.id < %s ORDER BY i.id DESC LIMIT %s",
+        (1000, 51),
+    ),
+}
+
+def find_full_scans(plan: List[Dict]) -> List[Dict]:
+    """
+    Rows of a MySQL EXPLAIN result that read a whole table (type ALL)
+
+    Derived and UNION result rows (table like "<union1,2>") are temporary
+    tables, not scans of stored data, and are ignored.
+    """
+    return [
+        row for row in plan
+        if (row.get("type") or "").upper() == "ALL" and not str(row.get("table") or "").startswith("<")
+    ]
+
+def check_query_plans(config: dict = None, queries: Dict = HOT_QUERIES) -> List[str]:
+    """
+    EXPLAIN every hot query; returns one problem line per full table scan
+
+    Run it against a database with representative data: on a near-empty
+    table MySQL may prefer a scan even when a usable index exists.
+    """
+    problems = []
+    with db_connection(config or MYSQL_CONFIG) as conn:
+        cursor = conn.cursor(dictionary=True)
+        for name, (query, params) in queries.items():
+            cursor.execute("EXPLAIN " + query.strip(), params)
+            plan = cursor.fetchall()
+            for row in find_full_scans(plan):
+                problems.append(
+                    f"{name}: full scan of {row.get('table')} "
+                    f"(possible_keys={row.get('possible_keys')}, rows={row.get('rows')})"
+                )
+        cursor.close()
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Issues database migrations")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations")
+    parser.add_argument("--check", action="store_true", help="EXPLAIN hot queries and fail on full table scans")
+    args = parser.parse_args()
+
+    if args.status:
+        status = migration_status()
+        print(f"Applied: {status['applied'] or '-'}")
+        print(f"Pending: {status['pending'] or '-'}")
+        return 0
+
+    if args.check:
+        problems = check_query_plans()
+        if problems:
+            print("❌ Hot queries doing full table scans:")
+            for problem in problems:
+                print(f"  - {problem}")
+            return 1
+        print(f"✅ All {len(HOT_QUERIES)} hot queries use an index")
+        return 0
+
+    result = migrate()
+    print(result["message"])
+    return 0 if result["status"] == "completed" else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
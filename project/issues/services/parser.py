@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, SoupStrainer
+
+# KJCN-specific title selectors (based on the site structure), in priority order
+KJCN_TITLE_CLASSES = ["tit_ko", "tit"]
+
+DEFAULT_BACKEND = "lxml"
+
+
+def _has_class(element, class_name: str) -> bool:
+    return class_name in (element.get("class") or "").split()
+
+
+def _stripped_text(element) -> str:
+    """Same result as BeautifulSoup's get_text(strip=True)"""
+    return "".join(part.strip() for part in element.itertext())
+
+
+def _parse_with_lxml(html: str) -> Dict:
+    try:
+        root = lxml.html.fromstring(html)
+    except etree.ParserError:
+        # Empty document
+        return {"title": None, "sections": None}
+    etree.strip_elements(root, "script", "style", with_tail=False)
+
+    # Single pass over the tree: pick up the first element of each title class
+    # and the article container instead of running one selector per target
+    title_tags: Dict[str, object] = {}
+    article_container = None
+
+    for element in root.iter(etree.Element):
+        for class_name in KJCN_TITLE_CLASSES:
+            if class_name not in title_tags and _has_class(element, class_name):
+                title_tags[class_name] = element
+        if (
+            article_container is None
+            and element.tag == "div"
+            and _has_class(element, "articleCon")
+            and any(_has_class(ancestor, "contents") for ancestor in element.iterancestors("div"))
+        ):
+            article_container = element
+
+    title = None
+    for class_name in KJCN_TITLE_CLASSES:
+        title_tag = title_tags.get(class_name)
+        if title_tag is not None:
+            potential_title = _stripped_text(title_tag)
+            if len(potential_title) > 5:
+                title = potential_title
+                break
+
+    if article_container is None:
+        return {"title": title, "sections": None}
+
+    sections = []
+    for header in article_container.iter("h4"):
+        if not _has_class(header, "link-target"):
+            continue
+        next_dd = header.getnext()
+        while next_dd is not None and next_dd.tag != "dd":
+            next_dd = next_dd.getnext()
+        if next_dd is not None:
+            sections.append((_stripped_text(header), _stripped_text(next_dd)))
+
+    return {"title": title, "sections": sections}
+
+
+def _parse_with_soup(soup: BeautifulSoup) -> Dict:
+    title = None
+    for class_name in KJCN_TITLE_CLASSES:
+        title_tag = soup.select_one(f".{class_name}")
+        if title_tag:
+            potential_title = title_tag.get_text(strip=True)
+            if len(potential_title) > 5:
+                title = potential_title
+                break
+
+    article_container = soup.select_one("div.contents div.articleCon")
+    if not article_container:
+        return {"title": title, "sections": None}
+
+    sections = []
+    for header in article_container.select("h4.link-target"):
+        next_dd = header.find_next_sibling("dd")
+        if next_dd:
+            sections.append((header.get_text(strip=True), next_dd.get_text(strip=True)))
+
+    return {"title": title, "sections": sections}
+
+
+# Only keep the title tags and the contents subtree; everything else on the
+# page (navigation, references list markup, scripts) is never turned into soup objects
+KJCN_STRAINER = SoupStrainer(class_=KJCN_TITLE_CLASSES + ["contents"])
+
+
+def _parse_with_strainer(html: str) -> Dict:
+    soup = BeautifulSoup(html, "lxml", parse_only=KJCN_STRAINER)
+    return _parse_with_soup(soup)
+
+
+def _parse_with_html_parser(html: str) -> Dict:
+    return _parse_with_soup(BeautifulSoup(html, "html.parser"))
+
+
+PARSER_BACKENDS = {
+    "lxml": _parse_with_lxml,
+    "strainer": _parse_with_strainer,
+    "html.parser": _parse_with_html_parser,
+}
+
+
+def parse_kjcn_article(html: str, backend: str = DEFAULT_BACKEND) -> Dict[str, Optional[object]]:
+    """
+    Extract the title and body sections of a KJCN article page
+
+    Args:
+        html: Raw page HTML
+        backend: One of PARSER_BACKENDS ("lxml", "strainer" or "html.parser")
+
+    Returns:
+        {"title": str or None, "sections": list of (section_title, section_text)
+        or None when the article container is missing}
+    """
+    try:
+        parse = PARSER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return parse(html)
+
+
+def format_sections(sections: List[tuple]) -> str:
+    """Join parsed sections into the text we summarize"""
+    return "\n\n".join(f"[{section_title}]\n{section_text}" for section_title, section_text in sections)
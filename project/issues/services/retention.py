@@ -0,0 +1,179 @@
+"""
+Retention for the issues table: keep at most N rows and/or nothing older than D days
+
+Rows are removed oldest first with a set-based
+
+    DELETE FROM issues [WHERE created_at < cutoff] ORDER BY created_at, id LIMIT k
+
+repeated until the policy holds. Each batch is its own short transaction on
+idx_issues_created_at (migration 3), so row locks are held for one batch at
+a time and other writers interleave between batches.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .database import db_connection, run_db
+from .issue_cache import issue_read_cache
+
+# Rows removed per DELETE statement (and per transaction)
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', 500))
+# Seconds to pause between batches so replication and other writers keep up
+RETENTION_BATCH_PAUSE = float(os.getenv('RETENTION_BATCH_PAUSE', 0.05))
+
+DELETE_OLDEST = "DELETE FROM issues ORDER BY created_at, id LIMIT %s"
+DELETE_OLDER_THAN = "DELETE FROM issues WHERE created_at < %s ORDER BY created_at, id LIMIT %s"
+
+def _count(query: str, params: tuple = (), config: dict = None) -> int:
+    with db_connection(config) as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        count = cursor.fetchone()[0]
+        cursor.close()
+    return count
+
+def count_issue_rows(config: dict = None) -> int:
+    return _count("SELECT COUNT(*) FROM issues", (), config)
+
+def _delete_batch(query: str, params: tuple, config: dict = None) -> int:
+    """Run one bounded DELETE in its own transaction; returns the rows removed"""
+    with db_connection(config) as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        conn.commit()
+        deleted = cursor.rowcount
+        cursor.close()
+    return max(deleted, 0)
+
+class RetentionJob:
+    """
+    One pass of the retention policy, run in bounded batches
+
+    max_rows keeps the newest max_rows issues, max_age_days removes issues
+    created before now - max_age_days, delete_oldest removes exactly that many
+    of the oldest issues. Any combination may be given. progress is updated
+    after every batch and can be read while run() is in progress;
+    cancel() stops the job between batches.
+    """
+
+    def __init__(self, max_rows: Optional[int] = None, max_age_days: Optional[float] = None,
+                 delete_oldest: Optional[int] = None, batch_size: int = RETENTION_BATCH_SIZE,
+                 pause: float = RETENTION_BATCH_PAUSE, config: dict = None):
+        if max_rows is None and max_age_days is None and delete_oldest is None:
+            raise ValueError("Retention needs max_rows, max_age_days or delete_oldest")
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self.delete_oldest = delete_oldest
+        self.batch_size = max(1, batch_size)
+        self.pause = pause
+        self.config = config
+        self._cancelled = False
+        self._started = 0.0
+        self.progress = {
+            "status": "pending",
+            "policy": {"max_rows": max_rows, "max_age_days": max_age_days, "delete_oldest": delete_oldest},
+            "planned": 0,
+            "deleted": 0,
+            "batches": 0,
+            "max_batch_ms": 0.0,
+            "rows_per_second": 0.0,
+            "elapsed_seconds": 0.0,
+            "started_at": None,
+            "finished_at": None,
+            "message": "",
+        }
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def running(self) -> bool:
+        return self.progress["status"] in ("pending", "running")
+
+    async def _delete_in_batches(self, query: str, leading_params: tuple, limit: Optional[int]) -> None:
+        """Repeat query until a batch comes back short (or limit rows are gone)"""
+        remaining = limit
+        while not self._cancelled:
+            batch_size = self.batch_size if remaining is None else min(self.batch_size, remaining)
+            if batch_size <= 0:
+                break
+
+            batch_started = time.perf_counter()
+            deleted = await run_db(_delete_batch, query, leading_params + (batch_size,), self.config)
+            batch_ms = (time.perf_counter() - batch_started) * 1000
+
+            self.progress["batches"] += 1
+            self.progress["deleted"] += deleted
+            self.progress["max_batch_ms"] = max(self.progress["max_batch_ms"], round(batch_ms, 1))
+            elapsed = time.monotonic() - self._started
+            self.progress["elapsed_seconds"] = round(elapsed, 3)
+            self.progress["rows_per_second"] = round(self.progress["deleted"] / elapsed, 1) if elapsed else 0.0
+            if deleted:
+                # Pages go stale with every batch (a version bump); cached single
+                # issues are dropped once, when the job ends (see run)
+                await issue_read_cache.invalidate_lists_async()
+            print(f"[Retention] Batch {self.progress['batches']}: deleted {deleted} "
+                  f"({self.progress['deleted']}/{self.progress['planned']}) in {batch_ms:.0f} ms")
+
+            if remaining is not None:
+                remaining -= deleted
+            if deleted < batch_size:
+                break
+            if self.pause:
+                await asyncio.sleep(self.pause)
+
+    async def run(self) -> dict:
+        self._started = time.monotonic()
+        self.progress["status"] = "running"
+        self.progress["started_at"] = datetime.now().isoformat()
+        try:
+            if self.max_age_days is not None:
+                cutoff = (datetime.now() - timedelta(days=self.max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+                expired = await run_db(_count, "SELECT COUNT(*) FROM issues WHERE created_at < %s", (cutoff,), self.config)
+                self.progress["planned"] += expired
+                if expired:
+                    await self._delete_in_batches(DELETE_OLDER_THAN, (cutoff,), None)
+
+            excess = self.delete_oldest or 0
+            if self.max_rows is not None:
+                total = await run_db(count_issue_rows, self.config)
+                excess = max(excess, total - self.max_rows)
+            if excess > 0 and not self._cancelled:
+                self.progress["planned"] += excess
+                await self._delete_in_batches(DELETE_OLDEST, (), excess)
+
+            self.progress["status"] = "cancelled" if self._cancelled else "completed"
+            self.progress["message"] = f"Deleted {self.progress['deleted']} of {self.progress['planned']} planned rows"
+        except Exception as e:
+            print(f"[Retention] Error: {e}")
+            self.progress["status"] = "error"
+            self.progress["message"] = f"Retention failed after {self.progress['deleted']} rows: {e}"
+        finally:
+            if self.progress["deleted"]:
+                # Deleted ids are not known: forget every cached issue once
+                await issue_read_cache.invalidate_async()
+            self.progress["elapsed_seconds"] = round(time.monotonic() - self._started, 3)
+            self.progress["finished_at"] = datetime.now().isoformat()
+        print(f"[Retention] {self.progress['status']}: {self.progress['message']}")
+        return dict(self.progress)
+
+# The background job started from the API (at most one at a time)
+_current_job: Optional[RetentionJob] = None
+_current_task: Optional[asyncio.Task] = None
+
+def start_retention_job(**policy) -> RetentionJob:
+    """
+    Run a RetentionJob as a background task and return it (policy: RetentionJob arguments)
+    Returns the running job instead if one is already in progress.
+    """
+    global _current_job, _current_task
+    if _current_job is not None and _current_job.running:
+        return _current_job
+    _current_job = RetentionJob(**policy)
+    _current_task = asyncio.create_task(_current_job.run())
+    return _current_job
+
+def current_retention_job() -> Optional[RetentionJob]:
+    return _current_job
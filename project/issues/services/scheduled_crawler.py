@@ -5,7 +5,9 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List
 from .batch_crawler import crawl_article_range
-from .database import get_connection
+from .crawler import article_url
+from .database import run_db
+from .retention import RetentionJob, count_issue_rows
 
 class ScheduledCrawler:
     def __init__(self, config_file: str = "crawler_config.json"):
@@ -27,7 +29,9 @@ class ScheduledCrawler:
             "last_crawl_date": None,
             "max_articles_per_month": 20,  # Safety limit
             "delay_between_requests": 1.0,
-            "auto_increment_limit": 50  # How far to look for new articles
+            "auto_increment_limit": 50,  # How far to look for new articles
+            "concurrency": 1,  # Articles crawled at the same time
+            "probe_delay": 0.5  # Delay between existence checks in find_new_articles
         }
         
         self.save_config(default_config)
@@ -60,7 +64,7 @@ class ScheduledCrawler:
         
         for i in range(max_look_ahead):
             article_number = start_number + i + 1
-            url = f"https://kjcn.or.kr/journal/view.php?number={article_number}"
+            url = article_url(article_number)
             
             try:
                 import httpx
@@ -83,7 +87,7 @@ class ScheduledCrawler:
                 break
             
             # Small delay to be respectful
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(self.config.get("probe_delay", 0.5))
         
         return new_articles
     
@@ -129,13 +133,16 @@ class ScheduledCrawler:
         results = await crawl_article_range(
             start_number, 
             end_number, 
-            self.config["delay_between_requests"]
+            self.config["delay_between_requests"],
+            self.config.get("concurrency", 1)
         )
         
         # Update configuration
         successful_crawls = [r for r in results if r["status"] == "success"]
-        if successful_crawls:
-            self.config["last_crawled_number"] = max([r["article_number"] for r in successful_crawls])
+        # Already-stored articles were processed too: do not revisit them next time
+        processed = [r for r in results if r["status"] in ("success", "duplicate")]
+        if processed:
+            self.config["last_crawled_number"] = max([r["article_number"] for r in processed])
         
         # Clean up oldest articles if new ones were added
         cleanup_result = None
@@ -157,14 +164,9 @@ class ScheduledCrawler:
         }
     
     async def cleanup_oldest_articles(self, count: int) -> Dict:
-        """Delete the oldest articles from the database"""
+        """Delete the oldest articles from the database (bounded batches, see retention.py)"""
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-            
-            # Get total count first
-            cursor.execute("SELECT COUNT(*) FROM issues")
-            total_count = cursor.fetchone()[0]
+            total_count = await run_db(count_issue_rows)
             
             if total_count <= count:
                 print(f"Not enough articles to delete. Total: {total_count}, Requested: {count}")
@@ -174,43 +176,19 @@ class ScheduledCrawler:
                     "articles_deleted": 0
                 }
             
-            # Get the oldest articles (by created_at)
-            cursor.execute("""
-                SELECT id, title, created_at 
-                FROM issues 
-                ORDER BY created_at ASC 
-                LIMIT %s
-            """, (count,))
-            
-            oldest_articles = cursor.fetchall()
-            
-            # Delete the oldest articles
-            article_ids = [article[0] for article in oldest_articles]
-            placeholders = ','.join(['%s'] * len(article_ids))
+            progress = await RetentionJob(delete_oldest=count).run()
+            if progress["status"] == "error":
+                raise RuntimeError(progress["message"])
             
-            cursor.execute(f"DELETE FROM issues WHERE id IN ({placeholders})", article_ids)
-            connection.commit()
-            
-            deleted_count = cursor.rowcount
-            
-            print(f"Deleted {deleted_count} oldest articles:")
-            for article in oldest_articles:
-                print(f"  - ID {article[0]}: {article[1]} (created: {article[2]})")
-            
-            cursor.close()
-            connection.close()
+            deleted_count = progress["deleted"]
+            print(f"Deleted {deleted_count} oldest articles in {progress['batches']} batch(es)")
             
             return {
                 "status": "completed",
                 "message": f"Deleted {deleted_count} oldest articles",
                 "articles_deleted": deleted_count,
-                "deleted_articles": [
-                    {
-                        "id": article[0],
-                        "title": article[1],
-                        "created_at": str(article[2])
-                    } for article in oldest_articles
-                ]
+                "batches": progress["batches"],
+                "max_batch_ms": progress["max_batch_ms"]
             }
             
         except Exception as e:
@@ -229,13 +207,16 @@ class ScheduledCrawler:
         results = await crawl_article_range(
             start_number, 
             end_number, 
-            self.config["delay_between_requests"]
+            self.config["delay_between_requests"],
+            self.config.get("concurrency", 1)
         )
         
         # Update last crawled number
         successful_crawls = [r for r in results if r["status"] == "success"]
-        if successful_crawls:
-            self.config["last_crawled_number"] = max([r["article_number"] for r in successful_crawls])
+        # Already-stored articles were processed too: do not revisit them next time
+        processed = [r for r in results if r["status"] in ("success", "duplicate")]
+        if processed:
+            self.config["last_crawled_number"] = max([r["article_number"] for r in processed])
             self.save_config()
         
         return {
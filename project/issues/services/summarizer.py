@@ -1,16 +1,61 @@
-from ..utils.chunk_utils import chunk_text
-from ..utils.openai_utils import summarize_text
+import asyncio
 
-def summarize_article_content(full_text: str) -> str:
+from ..utils.chunk_utils import chunk_text, estimate_tokens
+from ..utils.openai_utils import summarize_text_async, reduce_summaries_async
+
+# Articles up to this many (estimated) tokens are summarized in one call
+SINGLE_PASS_TOKEN_BUDGET = 3000
+
+# Maximum chunk summaries in flight at the same time for one article
+MAX_PARALLEL_CHUNKS = 4
+
+# Partial summaries are merged again if they still do not fit the budget
+MAX_REDUCE_ROUNDS = 3
+
+async def summarize_chunks(chunks: list[str], max_parallel: int = MAX_PARALLEL_CHUNKS) -> list[str]:
+    """
+    Map step: summarize chunks concurrently with bounded parallelism, keeping their order
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    
+    async def summarize_chunk(chunk: str) -> str:
+        async with semaphore:
+            return await summarize_text_async(chunk)
+    
+    return list(await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks)))
+
+async def summarize_article_content(full_text: str, token_budget: int = SINGLE_PASS_TOKEN_BUDGET,
+                                    max_parallel: int = MAX_PARALLEL_CHUNKS) -> str:
     """
-    Summarize article content by chunking and processing each chunk
+    Summarize article content with map-reduce
+    
+    Short articles (within token_budget) get a single summary call. Longer
+    ones are chunked, the chunks summarized concurrently, and one reduce
+    call merges the partial summaries, so latency stays around two LLM
+    round trips instead of one per chunk.
     """
     print("STEP 3: Starting summarization")
     
+    if estimate_tokens(full_text) <= token_budget:
+        full_summary = await summarize_text_async(full_text)
+        print("STEP 4: Finished summarization (single pass)")
+        return full_summary
+    
     chunks = chunk_text(full_text)
-    summaries = [summarize_text(chunk) for chunk in chunks]
-    full_summary = "\n".join(summaries)
+    partial_summaries = await summarize_chunks(chunks, max_parallel)
+    print(f"STEP 3.5: Summarized {len(chunks)} chunks, reducing")
+    
+    # Very long articles: merge partial summaries until they fit one reduce call
+    rounds = 0
+    while estimate_tokens("\n\n".join(partial_summaries)) > token_budget and rounds < MAX_REDUCE_ROUNDS:
+        partial_summaries = await summarize_chunks(chunk_text("\n\n".join(partial_summaries)), max_parallel)
+        rounds += 1
+    
+    if len(partial_summaries) == 1:
+        # Nothing to merge; a reduce call would only rewrite the one summary
+        full_summary = partial_summaries[0]
+    else:
+        full_summary = await reduce_summaries_async(partial_summaries)
     
     print("STEP 4: Finished summarization")
     return full_summary
-
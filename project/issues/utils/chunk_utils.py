@@ -27,4 +27,12 @@ def chunk_text(text: str, chunk_size: int = 4000, overlap: int = 200) -> list[st
         if start >= len(text):
             break
     
-    return chunks 
\ No newline at end of file
+    return chunks 
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budgeting LLM calls without a tokenizer:
+    Hangul/CJK characters are about one token each, everything else about 4 characters per token
+    """
+    wide_chars = sum(1 for char in text if '\u1100' <= char <= '\ud7a3' or '\u4e00' <= char <= '\u9fff')
+    return wide_chars + (len(text) - wide_chars) // 4 + 1
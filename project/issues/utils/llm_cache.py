@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".llm_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+# Eviction runs every N writes instead of counting rows on every insert
+EVICTION_CHECK_INTERVAL = 100
+# Hits are recorded in memory and their last_access written in batches of up to N
+ACCESS_FLUSH_INTERVAL = 100
+
+
+def make_cache_key(model: str, template_version: str, *inputs) -> str:
+    """Hash of (model, prompt template version, inputs)"""
+    digest = hashlib.sha256()
+    for part in (model, template_version) + tuple(str(value) for value in inputs):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent memo cache for LLM results, stored in SQLite
+
+    Entries older than ttl_seconds are ignored (and removed on read); once
+    more than max_entries are stored the least recently used ones are
+    evicted. Only successful model outputs should be stored, never the
+    fallback text returned on API errors.
+
+    A hit only reads: its last_access is kept in memory and written with the
+    next set(), eviction or every ACCESS_FLUSH_INTERVAL hits. Async code
+    should use get_async()/set_async(), which run the SQLite work in a
+    thread instead of on the event loop.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = True):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._accessed = {}  # key -> last hit time not yet written
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        return cls(
+            path=Path(os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH))),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            enabled=os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False"),
+        )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Opened lazily so importing the helpers never touches the disk
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    template_version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            self._connection.commit()
+        return self._connection
+
+    def get(self, model: str, template_version: str, inputs: tuple) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        key = make_cache_key(model, template_version, *inputs)
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                row = connection.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    connection.commit()
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._accessed[key] = now
+                if len(self._accessed) >= ACCESS_FLUSH_INTERVAL:
+                    self._flush_access(connection)
+                    connection.commit()
+                self.hits += 1
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"[LLM cache] Read error: {e}")
+            return None
+
+    def set(self, model: str, template_version: str, inputs: tuple, value: str) -> None:
+        if not self.enabled:
+            return
+
+        key = make_cache_key(model, template_version, *inputs)
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                connection.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, template_version, value, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, template_version, value, now, now)
+                )
+                self._accessed.pop(key, None)
+                self._flush_access(connection)
+                self._writes += 1
+                if self._writes % EVICTION_CHECK_INTERVAL == 0:
+                    self._evict(connection)
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"[LLM cache] Write error: {e}")
+
+    async def get_async(self, model: str, template_version: str, inputs: tuple) -> Optional[str]:
+        """get() in a worker thread, keeping the SQLite read off the event loop"""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.get, model, template_version, inputs)
+
+    async def set_async(self, model: str, template_version: str, inputs: tuple, value: str) -> None:
+        """set() in a worker thread, keeping the SQLite write off the event loop"""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.set, model, template_version, inputs, value)
+
+    def _flush_access(self, connection: sqlite3.Connection) -> None:
+        if self._accessed:
+            connection.executemany("UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        self._flush_access(connection)
+        connection.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        count = connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            return excess
+        return 0
+
+    def evict(self) -> int:
+        """Drop expired entries and trim to max_entries; returns the number trimmed for size"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            connection = self._get_connection()
+            trimmed = self._evict(connection)
+            connection.commit()
+            return trimmed
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute("DELETE FROM llm_cache")
+            connection.commit()
+            self._accessed.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                entries = self._get_connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared cache used by all OpenAI helpers
+llm_cache = LLMCache.from_env()
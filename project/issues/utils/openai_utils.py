@@ -1,19 +1,51 @@
+import asyncio
+import weakref
 import openai
 import os
 
+from .llm_cache import llm_cache
+
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that summarizes text. Provide clear, concise summaries in Korean."
+SUMMARY_MODEL = "gpt-3.5-turbo"
+
+# Bump a template version whenever its prompt changes so cached results are not reused
+SUMMARY_TEMPLATE_VERSION = "summarize_text:v1"
+REDUCE_TEMPLATE_VERSION = "reduce_summaries:v1"
+
+REDUCE_SYSTEM_PROMPT = "You are a helpful assistant that merges partial summaries of one article into a single coherent summary. Remove repetition, keep the key findings, and write in Korean."
+
+# One AsyncOpenAI client per event loop so its connection pool is reused
+# across calls (httpx connections cannot move between loops)
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_client() -> openai.AsyncOpenAI:
+    """
+    Shared async OpenAI client for the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        _async_clients[loop] = client
+    return client
+
 def summarize_text(text: str) -> str:
     """
     Summarize text using OpenAI API
     """
+    cached = llm_cache.get(SUMMARY_MODEL, SUMMARY_TEMPLATE_VERSION, (text,))
+    if cached is not None:
+        return cached
+    
     try:
         client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=SUMMARY_MODEL,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a helpful assistant that summarizes text. Provide clear, concise summaries in Korean."
+                    "content": SUMMARY_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -24,8 +56,78 @@ def summarize_text(text: str) -> str:
             temperature=0.3
         )
         
-        return response.choices[0].message.content.strip()
+        summary = response.choices[0].message.content.strip()
+        llm_cache.set(SUMMARY_MODEL, SUMMARY_TEMPLATE_VERSION, (text,), summary)
+        return summary
         
     except Exception as e:
         print(f"Error summarizing text: {e}")
-        return text[:200] + "..." if len(text) > 200 else text 
\ No newline at end of file
+        return text[:200] + "..." if len(text) > 200 else text
+
+async def summarize_text_async(text: str) -> str:
+    """
+    Summarize text using the async OpenAI client (same prompt, cache entries and fallback as summarize_text)
+    """
+    cached = await llm_cache.get_async(SUMMARY_MODEL, SUMMARY_TEMPLATE_VERSION, (text,))
+    if cached is not None:
+        return cached
+    
+    try:
+        response = await get_async_client().chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SUMMARY_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": f"Please summarize the following text:\n\n{text}"
+                }
+            ],
+            max_tokens=500,
+            temperature=0.3
+        )
+        
+        summary = response.choices[0].message.content.strip()
+        await llm_cache.set_async(SUMMARY_MODEL, SUMMARY_TEMPLATE_VERSION, (text,), summary)
+        return summary
+        
+    except Exception as e:
+        print(f"Error summarizing text: {e}")
+        return text[:200] + "..." if len(text) > 200 else text
+
+async def reduce_summaries_async(partial_summaries: list[str]) -> str:
+    """
+    Merge partial (per-chunk) summaries into one coherent summary
+    """
+    joined = "\n\n".join(f"[Part {i + 1}]\n{summary}" for i, summary in enumerate(partial_summaries))
+    cached = await llm_cache.get_async(SUMMARY_MODEL, REDUCE_TEMPLATE_VERSION, (joined,))
+    if cached is not None:
+        return cached
+    
+    try:
+        response = await get_async_client().chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": REDUCE_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": f"Combine these partial summaries into one summary:\n\n{joined}"
+                }
+            ],
+            max_tokens=700,
+            temperature=0.3
+        )
+        
+        summary = response.choices[0].message.content.strip()
+        await llm_cache.set_async(SUMMARY_MODEL, REDUCE_TEMPLATE_VERSION, (joined,), summary)
+        return summary
+        
+    except Exception as e:
+        print(f"Error reducing summaries: {e}")
+        # Fall back to the old behaviour of joining the chunk summaries
+        return "\n".join(partial_summaries)
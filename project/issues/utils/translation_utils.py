@@ -1,20 +1,40 @@
+import asyncio
+import json
 import openai
 import os
 from dotenv import load_dotenv
 
+from .llm_cache import llm_cache
+from .openai_utils import get_async_client
+
 # Load environment variables
 load_dotenv()
 
 # Set up OpenAI client
 client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
+# "combined": one structured call translates and shortens the title
+# "two_step": translate_to_korean then summarize_title (two round trips)
+TITLE_PROCESSING_MODE = os.getenv('TITLE_PROCESSING_MODE', 'combined')
+
+TITLE_MODEL = "gpt-3.5-turbo"
+
+# Bump a template version whenever its prompt changes so cached results are not reused
+TRANSLATE_TEMPLATE_VERSION = "translate_to_korean:v1"
+SUMMARIZE_TITLE_TEMPLATE_VERSION = "summarize_title:v1"
+SHORT_TITLE_TEMPLATE_VERSION = "short_korean_title:v1"
+
 def translate_to_korean(text: str) -> str:
     """
     Translate English text to Korean using OpenAI API
     """
+    cached = llm_cache.get(TITLE_MODEL, TRANSLATE_TEMPLATE_VERSION, (text,))
+    if cached is not None:
+        return cached
+    
     try:
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=TITLE_MODEL,
             messages=[
                 {
                     "role": "system",
@@ -31,6 +51,7 @@ def translate_to_korean(text: str) -> str:
         
         korean_translation = response.choices[0].message.content.strip()
         print(f"Translation: '{text}' -> '{korean_translation}'")
+        llm_cache.set(TITLE_MODEL, TRANSLATE_TEMPLATE_VERSION, (text,), korean_translation)
         return korean_translation
         
     except Exception as e:
@@ -70,6 +91,10 @@ def summarize_title(title: str, max_words: int = 5) -> str:
     """
     Create a short, concise title (max 5 words) using OpenAI
     """
+    cached = llm_cache.get(TITLE_MODEL, SUMMARIZE_TITLE_TEMPLATE_VERSION, (title, max_words))
+    if cached is not None:
+        return cached
+    
     try:
         # Check if title is Korean or English for better prompting
         is_english = is_english_text(title)
@@ -80,7 +105,7 @@ def summarize_title(title: str, max_words: int = 5) -> str:
             system_prompt = f"You are a Korean title summarizer. Create a very short, concise Korean title with maximum {max_words} words that captures the main topic of the given Korean title. Focus on the key subject and main concept. Return only the summarized Korean title without quotes or additional text."
         
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=TITLE_MODEL,
             messages=[
                 {
                     "role": "system",
@@ -97,6 +122,7 @@ def summarize_title(title: str, max_words: int = 5) -> str:
         
         summarized_title = response.choices[0].message.content.strip()
         print(f"Title summarization: '{title}' -> '{summarized_title}'")
+        llm_cache.set(TITLE_MODEL, SUMMARIZE_TITLE_TEMPLATE_VERSION, (title, max_words), summarized_title)
         return summarized_title
         
     except Exception as e:
@@ -135,4 +161,68 @@ def get_short_korean_title(title: str, max_words: int = 5) -> str:
         short_title = summarize_title(title, max_words)
         print(f"Summarized Korean title: {short_title}")
     
-    return short_title 
\ No newline at end of file
+    return short_title
+
+def parse_short_title_response(content: str) -> str:
+    """
+    Read the short title from the combined call's JSON reply ({"short_title": ...}),
+    tolerating a bare one-line title. Returns "" when nothing usable came back.
+    """
+    content = content.strip()
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict):
+            return str(data.get("short_title") or "").strip()
+    except json.JSONDecodeError:
+        pass
+    
+    if content and "\n" not in content and not content.startswith("{"):
+        return content.strip('"\'')
+    return ""
+
+async def get_short_korean_title_async(title: str, max_words: int = 5, mode: str = None) -> str:
+    """
+    Get a short Korean title in a single structured LLM call on the async client.
+    Falls back to the two-step path (translate, then summarize) if the combined
+    call fails or mode is "two_step".
+    """
+    if not title or title == "제목 없음":
+        return title
+    
+    mode = mode or TITLE_PROCESSING_MODE
+    
+    if mode == "combined":
+        cached = await llm_cache.get_async(TITLE_MODEL, SHORT_TITLE_TEMPLATE_VERSION, (title, max_words))
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await get_async_client().chat.completions.create(
+                model=TITLE_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": f"You are a professional translator and title summarizer for academic journal articles. If the given title is English, translate it to Korean. Then create a very short, concise Korean title with maximum {max_words} words that captures the main topic. Respond only with JSON in the form {{\"short_title\": \"...\"}}."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Title: {title}"
+                    }
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=100,
+                temperature=0.3
+            )
+            
+            short_title = parse_short_title_response(response.choices[0].message.content)
+            if short_title:
+                print(f"Combined title processing: '{title}' -> '{short_title}'")
+                await llm_cache.set_async(TITLE_MODEL, SHORT_TITLE_TEMPLATE_VERSION, (title, max_words), short_title)
+                return short_title
+            print("Combined title processing returned no title, using two-step fallback")
+            
+        except Exception as e:
+            print(f"Combined title processing error: {e}")
+    
+    # Two-step path uses the sync client, so keep it off the event loop
+    return await asyncio.to_thread(get_short_korean_title, title, max_words)
@@ -18,7 +18,9 @@ from typing import List, Optional
 
 # Import routers
 from issues.routes import router as issues_router
-from meals.routes import router as meals_router
+from meals.routes import legacy_router as meals_legacy_router, router as meals_router
+from meals.services.analysis import meal_analyzer
+from meals.services.meal_log import get_meal_log
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -32,11 +34,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers of GET /issues/ must be readable from the browser
+    expose_headers=["X-Total-Count", "X-Next-After-Id", "ETag"],
 )
 
 # Include routers
 app.include_router(issues_router, prefix="/issues", tags=["issues"])
 app.include_router(meals_router, prefix="/meals", tags=["meals"])
+# /api/food/analyze, formerly served by the separate meals/imagetest.py process
+app.include_router(meals_legacy_router, tags=["meals"])
 
 class Question(BaseModel):
     question: str
@@ -53,6 +59,10 @@ def startup_event():
     knowledge_base = init_knowledge_base(files)
     print("✅ 지식베이스 초기화 완료!")
 
+@app.on_event("startup")
+async def warm_up_meals():
+    await meal_analyzer.warm_up()
+
 def process_large_food_csv(file_path: Path, chunk_size: int = 1000) -> List[str]:
     """대용량 음식 CSV 파일을 청크 단위로 처리"""
     chunks = []
@@ -231,12 +241,14 @@ async def get_user_profile(user_id: str = None) -> dict:
         "height": 170,
         "age": 25,
         "activity_level": "moderate",
-        "goal": "maintain"
+        "goal": "maintain",
+        "daily_kcal_target": 2000
     }
     
     if user_id:
         # TODO: 실제 사용자 데이터 조회 로직
-        pass
+        # 오늘/이번 주 식사 합계 (/meals/analyze 기록 시 누적, 보통 메모리에서 바로 조회)
+        base_profile["meals"] = await run_in_threadpool(get_meal_log().summary, user_id)
     
     return base_profile
 
@@ -254,6 +266,14 @@ def extract_user_info(question: str, base_profile: dict) -> dict:
     
     return user_info
 
+def exercise_target_calories(user_info: dict, default: int = 300) -> int:
+    """운동으로 소모할 칼로리: 오늘 기록된 식사가 목표를 넘은 만큼 (기록이 없거나 넘지 않으면 기본값)"""
+    meals = user_info.get("meals")
+    if not meals or not meals["today"]["meals"]:
+        return default
+    surplus = meals["today"]["kcal"] - user_info["daily_kcal_target"]
+    return int(surplus) if surplus > 0 else default
+
 def calculate_exercise_time(target_calories: int, weight_kg: int = 60) -> str:
     """운동 시간 계산"""
     # 기본 칼로리 소모량 (MET 기준)
@@ -314,8 +334,13 @@ async def ask_question(request: Question):
                 # 운동 시간 계산 (칼로리 관련 질문인 경우)
                 if "칼로리" in question.lower() or "운동" in question.lower():
                     # 간단한 칼로리 추출 (실제로는 더 정교한 NLP 필요)
-                    exercise_info = calculate_exercise_time(300, user_info["weight"])
-                    result += f"\n\n💪 운동 추천: {exercise_info}"
+                    target_calories = exercise_target_calories(user_info)
+                    exercise_info = calculate_exercise_time(target_calories, user_info["weight"])
+                    meals = user_info.get("meals")
+                    if meals and meals["today"]["meals"]:
+                        result += (f"\n\n🍽 오늘 섭취: {meals['today']['kcal']:g} kcal ({meals['today']['meals']}끼), "
+                                   f"이번 주 하루 평균: {meals['week']['kcal'] / max(meals['week']['days'], 1):.0f} kcal")
+                    result += f"\n\n💪 운동 추천 ({target_calories} kcal): {exercise_info}"
                 
                 return {
                     "type": "food_question",
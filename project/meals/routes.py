@@ -1,79 +1,106 @@
-from fastapi import APIRouter, UploadFile, File
-import base64, os, openai
-from PIL import Image
-import io
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+import datetime
 from dotenv import load_dotenv
+from .services.analysis import meal_analyzer
+from .services.batch import MEALS_BATCH_MAX_FILES
+from .services.meal_log import get_meal_log
+from .services.uploads import (UploadLimitRoute, UploadTooLarge, limit_uploads, read_upload, upload_memory,
+                               upload_size, upload_stats)
 
-router = APIRouter()
+# Request bodies are capped before they are parsed (see limit_uploads)
+router = APIRouter(route_class=UploadLimitRoute)
+# The path the standalone imagetest app served; same pipeline as /meals/analyze
+legacy_router = APIRouter(route_class=UploadLimitRoute)
 
-# Load environment variables
+# Load environment variables (OPENAI_API_KEY, optionally OPENAI_BASE_URL)
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = openai.OpenAI(api_key=api_key)
 
-def encode_image(file: UploadFile):
-    content = file.file.read()
-    return base64.b64encode(content).decode("utf-8")
+def _log_day(day: Optional[str]) -> Optional[datetime.date]:
+    try:
+        return datetime.date.fromisoformat(day) if day else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"day must be YYYY-MM-DD, got {day!r}")
 
-@router.post("/analyze")
-async def analyze_food(file: UploadFile = File(...)):
-    encoded = encode_image(file)
+def _add_meals(user_id: str, results: list, day: Optional[datetime.date]) -> Optional[dict]:
+    summary = None
+    for result in results:
+        if "nutrition" in result:
+            summary = get_meal_log().add(user_id, result["nutrition"], day=day, source=result.get("source"))
+    return summary
+
+async def _log_meals(user_id: str, results: list, day: Optional[datetime.date]) -> Optional[dict]:
+    """Add each analysed photo to the user's meal log; the user's totals after the last one"""
+    # SQLite commits, one per meal: all of them in one worker thread, never on the event loop
+    return await run_in_threadpool(_add_meals, user_id, results, day)
 
-    messages = [
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": """
-You are a food image analysis expert with deep knowledge in culinary arts. 
-If there are more than two food photos, please add the two values together. 
-Please analyze the food image provided below carefully, considering its appearance, ingredients, and regional characteristics.  
-Provide the following information:
+@router.post("/analyze")
+@limit_uploads(files=1)
+async def analyze_food(file: UploadFile = File(...), user_id: Optional[str] = Form(None),
+                       day: Optional[str] = Form(None)):
+    """
+    Analyze one meal photo
 
-- Dish name
-- exact calories (in kcal)
-- carbohydrates in the food(grams)
-- protein in the food(grams)
-- fat in the food(grams)
-- Sodium in this food(grams)
-- Dietary fiber in that food(grams)
-- Number of foods and total amount (grams)
+    With user_id the meal is also logged for that user (on day, default
+    today) and the user's running day and week totals are returned as "meal_log".
+    """
+    log_day = _log_day(day)
+    # The parser spooled the upload; it is read into memory only within the worker's budget
+    async with upload_memory(upload_size(file)):
+        try:
+            data = await read_upload(file)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        try:
+            result = await meal_analyzer.analyze(data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if user_id:
+        result["meal_log"] = await _log_meals(user_id, [result], log_day)
+    return result
 
-⚠ IMPORTANT: Your response must be written in Korean at the end
+legacy_router.add_api_route("/api/food/analyze", analyze_food, methods=["POST"])
 
-Format your response exactly like this:
+@router.post("/analyze-batch")
+@limit_uploads(files=MEALS_BATCH_MAX_FILES)
+async def analyze_food_batch(files: List[UploadFile] = File(...), user_id: Optional[str] = Form(None),
+                             day: Optional[str] = Form(None)):
+    """
+    Analyze a day's meal photos at once
 
-- 요리명: (dish name in Korean)
-- 칼로리: (exact calories in kcal)
-- 탄수화물: (carbohydrates in the food(grams))
-- 단백질: (protein in the food(grams))
-- 지방: (fat in the food(grams))
-- 나트륨: (Sodium in this food(grams))
-- 식이섬유: (Dietary fiber in that food(grams))
-- 총량: (Number of foods and total amount (grams))
-"""
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{encoded}"
-                    }
-                }
-            ]
-        }
-    ]
+    Photos are fingerprinted and preprocessed in parallel; cached ones and
+    those the local classifier recognises skip the model, and the rest are
+    packed into as few vision requests as the token budget allows (sent
+    concurrently). Returns each photo's answer and parsed nutrients, plus the
+    nutrient totals over all of them. With user_id every analysed photo is
+    logged as a meal, as in /analyze.
+    """
+    log_day = _log_day(day)
+    if len(files) > MEALS_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MEALS_BATCH_MAX_FILES} photos per batch")
+    async with upload_memory(sum(upload_size(file) for file in files)):
+        try:
+            uploads = [await read_upload(file) for file in files]
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        response = await meal_analyzer.analyze_batch(uploads)
+    for file, result in zip(files, response["images"]):
+        result["filename"] = file.filename
+    if user_id:
+        response["meal_log"] = await _log_meals(user_id, response["images"], log_day)
+    return response
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo",
-            messages=messages,
-            max_tokens=300
-        )
-        return {"result": response.choices[0].message.content}
-    except Exception as e:
-        return {"error": str(e)}
+@router.get("/log/{user_id}")
+def meal_log_summary(user_id: str, day: Optional[str] = None):
+    """The user's logged meal totals for the day (default today) and its week"""
+    return get_meal_log().summary(user_id, _log_day(day))
 
 @router.get("/")
 def meals_root():
-    return {"status": "Meals API is running"} 
\ No newline at end of file
+    return {"status": "Meals API is running"}
+
+@router.get("/stats")
+def meals_stats():
+    """Upload limits, image preprocessing totals, cache hit rate, vision-call concurrency and local classifier share"""
+    return {**meal_analyzer.stats(), "uploads": upload_stats()}
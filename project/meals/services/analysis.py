@@ -0,0 +1,301 @@
+import asyncio
+from typing import List
+
+from .batch import (ANSWER_TOKENS_PER_IMAGE, PORTION_ANSWER_TOKENS_PER_IMAGE, STRUCTURED_ANSWER_TOKENS_PER_IMAGE,
+                    build_batch_messages, pack_images, split_sections)
+from .classifier import classify_upload, get_food_classifier
+from .food_index import FoodIndex, local_food_index
+from .image_cache import ImageResultCache, image_fingerprint, image_result_cache
+from .image_preprocess import get_preprocess_executor, preprocess_stats, preprocess_upload
+from .nutrition import (NutritionRecord, combine_estimates, parse_analysis, parse_batch_analysis,
+                        parse_batch_portions, parse_nutrition_text, parse_portions, portion_response_format,
+                        render_nutrition_text, response_format, sum_nutrition)
+from .vision import (MEALS_STRUCTURED_OUTPUT, MEALS_VISION_MODEL, create_completion, encode_data_url,
+                     get_vision_client, vision_stats)
+
+ANALYZE_PROMPT = """
+You are a food image analysis expert with deep knowledge in culinary arts. 
+If there are more than two food photos, please add the two values together. 
+Please analyze the food image provided below carefully, considering its appearance, ingredients, and regional characteristics.  
+Provide the following information:
+
+- Dish name
+- exact calories (in kcal)
+- carbohydrates in the food(grams)
+- protein in the food(grams)
+- fat in the food(grams)
+- Sodium in this food(grams)
+- Dietary fiber in that food(grams)
+- Number of foods and total amount (grams)
+
+⚠ IMPORTANT: Your response must be written in Korean at the end
+
+Format your response exactly like this:
+
+- 요리명: (dish name in Korean)
+- 칼로리: (exact calories in kcal)
+- 탄수화물: (carbohydrates in the food(grams))
+- 단백질: (protein in the food(grams))
+- 지방: (fat in the food(grams))
+- 나트륨: (Sodium in this food(grams))
+- 식이섬유: (Dietary fiber in that food(grams))
+- 총량: (Number of foods and total amount (grams))
+"""
+
+ANALYZE_JSON_PROMPT = """
+You are a food image analysis expert with deep knowledge in culinary arts.
+If there are more than two food photos, please add the two values together.
+Please analyze the food image provided below carefully, considering its appearance, ingredients, and regional characteristics.
+Write the dish name in Korean. Give calories in kcal and carbohydrates, protein, fat, sodium,
+dietary fiber and the total amount of food in grams. Use null only if a value cannot be estimated.
+"""
+
+PORTIONS_PROMPT = """
+You are a food image analysis expert with deep knowledge in culinary arts.
+List every food in the photo below with the dish name in Korean, as commonly written in
+Korean food composition tables, and the estimated amount in grams.
+"""
+
+def _answer_options(images: int, batch: bool = False, portions: bool = False) -> dict:
+    """Model, answer budget and (in structured mode) the JSON schema for a request with this many photos"""
+    if portions:
+        return {"model": MEALS_VISION_MODEL, "max_tokens": PORTION_ANSWER_TOKENS_PER_IMAGE * images,
+                "response_format": portion_response_format(batch=batch)}
+    if MEALS_STRUCTURED_OUTPUT:
+        return {"model": MEALS_VISION_MODEL, "max_tokens": STRUCTURED_ANSWER_TOKENS_PER_IMAGE * images,
+                "response_format": response_format(batch=batch)}
+    return {"model": MEALS_VISION_MODEL, "max_tokens": ANSWER_TOKENS_PER_IMAGE * images}
+
+def _analysis_entry(record: NutritionRecord, answer: str = None) -> dict:
+    """Response (and cache) fields for one photo: the bullet text clients read plus the parsed record"""
+    text = answer if answer is not None and not MEALS_STRUCTURED_OUTPUT else render_nutrition_text(record)
+    return {"result": text, "nutrition": record.model_dump(), "source": "model"}
+
+def _local_entry(food_index: FoodIndex, items: list) -> dict:
+    """Response (and cache) fields for one photo whose nutrients come from the food table"""
+    estimates = food_index.estimate(items)
+    record = combine_estimates(estimates)
+    return {"result": render_nutrition_text(record), "nutrition": record.model_dump(),
+            "items": estimates, "source": "local"}
+
+def _classified_entry(prediction: dict) -> dict:
+    """Response (and cache) fields for one photo the local classifier recognised: its gallery answer"""
+    info = {key: prediction[key] for key in ("label", "confidence", "similarity")}
+    return {**prediction["entry"], "source": "classifier", "classifier": info}
+
+def _cached_response(cached: dict) -> dict:
+    entry = {key: value for key, value in cached.items() if key != "distance"}
+    return {**entry, "cache": {"hit": True, "distance": cached["distance"]}}
+
+def _preprocess_summary(image: dict) -> dict:
+    return {
+        "original_bytes": image["original_bytes"],
+        "bytes": image["bytes"],
+        "bytes_saved": image["bytes_saved"],
+        "size": list(image["size"]),
+    }
+
+class MealAnalyzer:
+    """
+    The meal photo pipeline behind every meals entry point
+
+    Photo -> perceptual-hash cache -> on-box classifier -> preprocessing ->
+    vision model (or food table in local-nutrition mode) -> parsed record.
+    All instances share the worker's vision client and limiter, image
+    executor, food index and classifier; the result cache is the shared one
+    unless another is given. Bad images raise ValueError; a failed model call
+    is returned as {"error": ...} and never cached.
+    """
+
+    def __init__(self, cache: ImageResultCache = None):
+        self.cache = cache if cache is not None else image_result_cache
+
+    async def warm_up(self) -> None:
+        """Create the client and executor and load the result cache, food table and gallery before the first photo"""
+        get_vision_client()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_preprocess_executor(), self.cache.load)
+        await loop.run_in_executor(get_preprocess_executor(), local_food_index)
+        classifier = get_food_classifier()
+        if classifier is not None:
+            await loop.run_in_executor(get_preprocess_executor(), len, classifier)
+
+    async def _classify(self, fingerprint: tuple, data: bytes):
+        """(response or None, embedding) from the local classifier; a recognised photo is cached"""
+        classifier = get_food_classifier()
+        if classifier is None:
+            return None, None
+        loop = asyncio.get_running_loop()
+        prediction, embedding = await loop.run_in_executor(get_preprocess_executor(), classify_upload,
+                                                           classifier, data)
+        if prediction is None:
+            return None, embedding
+        print(f"[Meals] Classified locally as {prediction['label']} (similarity {prediction['similarity']})")
+        entry = _classified_entry(prediction)
+        await loop.run_in_executor(get_preprocess_executor(), self.cache.set, *fingerprint, entry)
+        return {**entry, "cache": {"hit": False}}, embedding
+
+    def _lookup(self, data: bytes) -> tuple:
+        """(fingerprint, cached result or None) of a photo; blocking, run on the image executor"""
+        fingerprint = image_fingerprint(data)
+        return fingerprint, self.cache.get(*fingerprint)
+
+    def _store(self, fingerprint: tuple, embedding, entry: dict) -> None:
+        self.cache.set(*fingerprint, entry)
+        classifier = get_food_classifier()
+        if classifier is not None and embedding is not None:
+            classifier.learn(embedding, entry["nutrition"]["dish"], entry)
+
+    async def _remember(self, fingerprint: tuple, embedding, entry: dict) -> None:
+        # Errors are never cached or learnt; both SQLite writes run on the image executor
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_preprocess_executor(), self._store, fingerprint, embedding, entry)
+
+    async def analyze(self, data: bytes) -> dict:
+        """Nutrients of one photo, as the /meals/analyze response"""
+        # Same or nearly the same photo analysed before: answer without the model
+        loop = asyncio.get_running_loop()
+        fingerprint, cached = await loop.run_in_executor(get_preprocess_executor(), self._lookup, data)
+        if cached is not None:
+            print(f"[Meals] Cache hit (distance {cached['distance']})")
+            return _cached_response(cached)
+
+        # A common dish the on-box classifier recognises confidently: answer without the model
+        classified, embedding = await self._classify(fingerprint, data)
+        if classified is not None:
+            return classified
+
+        # Downscaled, EXIF-free JPEG/WebP instead of the raw phone photo
+        image = await preprocess_upload(data)
+        image_url = await encode_data_url(image["data"], image["mime_type"])
+        # Set in local-nutrition mode: the model only names dishes and portions
+        food_index = await loop.run_in_executor(get_preprocess_executor(), local_food_index)
+
+        if food_index is not None:
+            prompt = PORTIONS_PROMPT
+        else:
+            prompt = ANALYZE_JSON_PROMPT if MEALS_STRUCTURED_OUTPUT else ANALYZE_PROMPT
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url
+                        }
+                    }
+                ]
+            }
+        ]
+
+        try:
+            answer = await create_completion(messages=messages, **_answer_options(1, portions=food_index is not None))
+        except Exception as e:
+            return {"error": str(e)}
+        if food_index is not None:
+            entry = _local_entry(food_index, parse_portions(answer))
+        else:
+            entry = _analysis_entry(parse_analysis(answer), answer)
+        await self._remember(fingerprint, embedding, entry)
+        return {**entry, "preprocess": _preprocess_summary(image), "cache": {"hit": False}}
+
+    async def analyze_batch(self, uploads: List[bytes]) -> dict:
+        """
+        Nutrients of several photos and their totals, as the /meals/analyze-batch
+        response (without filenames)
+
+        Photos are fingerprinted and preprocessed in parallel; cached ones and
+        those the local classifier recognises skip the model, and the rest are
+        packed into as few vision requests as the token budget allows (sent
+        concurrently). A photo that is not an image gets {"error": ...}.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def prepare(data: bytes) -> dict:
+            fingerprint, cached = await loop.run_in_executor(get_preprocess_executor(), self._lookup, data)
+            if cached is not None:
+                return _cached_response(cached)
+            classified, embedding = await self._classify(fingerprint, data)
+            if classified is not None:
+                return classified
+            image = await preprocess_upload(data)
+            return {"fingerprint": fingerprint, "embedding": embedding, "image": image,
+                    "image_url": await encode_data_url(image["data"], image["mime_type"])}
+
+        prepared = await asyncio.gather(*(prepare(data) for data in uploads), return_exceptions=True)
+        results = [None] * len(uploads)
+        pending = []
+        for index, item in enumerate(prepared):
+            if isinstance(item, ValueError):
+                results[index] = {"error": str(item)}
+            elif isinstance(item, BaseException):
+                raise item
+            elif "image" in item:
+                pending.append(index)
+            else:
+                results[index] = item
+
+        groups = [[pending[i] for i in group]
+                  for group in pack_images([prepared[index]["image"]["size"] for index in pending])]
+        food_index = await loop.run_in_executor(get_preprocess_executor(), local_food_index) if groups else None
+
+        def parse_group_answer(answer: str, count: int) -> list:
+            """Response entries for each photo of one request (None where the answer has nothing for it)"""
+            if food_index is not None:
+                photos = parse_batch_portions(answer, count)
+                if photos is None:
+                    photos = [None if section is None else parse_portions(section)
+                              for section in split_sections(answer, count)]
+                return [None if items is None else _local_entry(food_index, items) for items in photos]
+
+            records = parse_batch_analysis(answer, count)
+            if records is not None:
+                return [None if record is None else _analysis_entry(record) for record in records]
+            # Bullet-format answer (text mode, or a model that ignored the schema)
+            return [None if section is None else _analysis_entry(parse_nutrition_text(section), section)
+                    for section in split_sections(answer, count)]
+
+        async def analyze_group(indexes: list) -> None:
+            try:
+                answer = await create_completion(
+                    messages=build_batch_messages([prepared[index]["image_url"] for index in indexes],
+                                                  structured=MEALS_STRUCTURED_OUTPUT,
+                                                  portions=food_index is not None),
+                    **_answer_options(len(indexes), batch=True, portions=food_index is not None)
+                )
+            except Exception as e:
+                for index in indexes:
+                    results[index] = {"error": str(e)}
+                return
+            for index, entry in zip(indexes, parse_group_answer(answer, len(indexes))):
+                if entry is None:
+                    results[index] = {"error": "The model returned no answer for this photo"}
+                    continue
+                await self._remember(prepared[index]["fingerprint"], prepared[index]["embedding"], entry)
+                results[index] = {**entry, "preprocess": _preprocess_summary(prepared[index]["image"]),
+                                  "cache": {"hit": False}}
+
+        await asyncio.gather(*(analyze_group(group) for group in groups))
+
+        analyzed = [result["nutrition"] for result in results if "nutrition" in result]
+        print(f"[Meals] Batch of {len(uploads)} photos: {len(pending)} sent in {len(groups)} model requests")
+        return {
+            "images": results,
+            "totals": sum_nutrition(analyzed),
+            "analyzed": len(analyzed),
+            "model_requests": len(groups),
+        }
+
+    def stats(self) -> dict:
+        """Image preprocessing totals, perceptual-hash cache hit rate, vision-call concurrency and local classifier share"""
+        classifier = get_food_classifier()
+        return {"preprocess": preprocess_stats(), "cache": self.cache.stats(), "vision": vision_stats(),
+                "classifier": classifier.stats() if classifier is not None else None}
+
+# Shared by /meals and the standalone imagetest app
+meal_analyzer = MealAnalyzer()
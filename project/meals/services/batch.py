@@ -0,0 +1,109 @@
+import math
+import os
+import re
+
+# Image input tokens allowed in one model request (the prompt and answer come on top)
+MEALS_BATCH_TOKEN_BUDGET = int(os.getenv('MEALS_BATCH_TOKEN_BUDGET', 8000))
+# Images per model request; longer answers get less reliable to split
+MEALS_BATCH_MAX_IMAGES_PER_REQUEST = int(os.getenv('MEALS_BATCH_MAX_IMAGES_PER_REQUEST', 8))
+# Photos accepted by one /meals/analyze-batch call
+MEALS_BATCH_MAX_FILES = int(os.getenv('MEALS_BATCH_MAX_FILES', 20))
+# Answer tokens budgeted per image (bullet text / JSON record)
+ANSWER_TOKENS_PER_IMAGE = 200
+STRUCTURED_ANSWER_TOKENS_PER_IMAGE = 100
+# Dish names and portions only (local-nutrition mode)
+PORTION_ANSWER_TOKENS_PER_IMAGE = 60
+
+BATCH_PROMPT = """
+You are a food image analysis expert with deep knowledge in culinary arts.
+You will receive {count} food photos, numbered 1 to {count} in the order given.
+Analyze each photo separately and carefully, considering its appearance, ingredients, and regional characteristics.
+Do not add values of different photos together.
+
+⚠ IMPORTANT: Your response must be written in Korean
+
+For every photo, answer exactly in this format, starting with its number:
+
+### 사진 N
+- 요리명: (dish name in Korean)
+- 칼로리: (exact calories in kcal)
+- 탄수화물: (carbohydrates in the food(grams))
+- 단백질: (protein in the food(grams))
+- 지방: (fat in the food(grams))
+- 나트륨: (Sodium in this food(grams))
+- 식이섬유: (Dietary fiber in that food(grams))
+- 총량: (Number of foods and total amount (grams))
+"""
+
+BATCH_JSON_PROMPT = """
+You are a food image analysis expert with deep knowledge in culinary arts.
+You will receive {count} food photos, numbered 1 to {count} in the order given.
+Analyze each photo separately and carefully, considering its appearance, ingredients, and regional characteristics.
+Do not add values of different photos together.
+Return one entry in "meals" per photo, with its number in "photo".
+Write the dish name in Korean. Give calories in kcal and carbohydrates, protein, fat, sodium,
+dietary fiber and the total amount of food in grams. Use null only if a value cannot be estimated.
+"""
+
+BATCH_PORTIONS_PROMPT = """
+You are a food image analysis expert with deep knowledge in culinary arts.
+You will receive {count} food photos, numbered 1 to {count} in the order given.
+For each photo, list every food in it with the dish name in Korean, as commonly written in
+Korean food composition tables, and the estimated amount in grams.
+Return one entry in "meals" per photo, with its number in "photo".
+"""
+
+_SECTION = re.compile(r"^\s*#*\s*\**\s*(?:사진|Photo|Image)\s*(\d+)\b.*$", re.MULTILINE | re.IGNORECASE)
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Input tokens of a high-detail image: 85 plus 170 per 512 px tile after OpenAI's rescaling"""
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    tiles = math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+    return 85 + 170 * tiles
+
+def pack_images(sizes: list, token_budget: int = None, max_images: int = None) -> list:
+    """
+    Split image indexes, in order, into as few groups as the token budget and
+    per-request image limit allow; an image over the budget gets a group of its own
+    """
+    token_budget = token_budget or MEALS_BATCH_TOKEN_BUDGET
+    max_images = max_images or MEALS_BATCH_MAX_IMAGES_PER_REQUEST
+    groups, current, used = [], [], 0
+    for index, (width, height) in enumerate(sizes):
+        tokens = estimate_image_tokens(width, height)
+        if current and (used + tokens > token_budget or len(current) >= max_images):
+            groups.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def build_batch_messages(image_urls: list, structured: bool = False, portions: bool = False) -> list:
+    prompt = BATCH_PORTIONS_PROMPT if portions else BATCH_JSON_PROMPT if structured else BATCH_PROMPT
+    content = [{"type": "text", "text": prompt.format(count=len(image_urls))}]
+    for number, url in enumerate(image_urls, start=1):
+        content.append({"type": "text", "text": f"사진 {number}"})
+        content.append({"type": "image_url", "image_url": {"url": url}})
+    return [{"role": "user", "content": content}]
+
+def split_sections(text: str, count: int) -> list:
+    """
+    Per-photo parts of a batch answer, by their "사진 N" headings
+
+    Photos without a heading get None. A single-photo answer without any
+    heading is taken whole.
+    """
+    sections = [None] * count
+    matches = list(_SECTION.finditer(text))
+    for position, match in enumerate(matches):
+        number = int(match.group(1))
+        end = matches[position + 1].start() if position + 1 < len(matches) else len(text)
+        if 1 <= number <= count and sections[number - 1] is None:
+            sections[number - 1] = text[match.end():end].strip()
+    if count == 1 and not matches:
+        sections[0] = text.strip()
+    return sections
@@ -0,0 +1,265 @@
+import io
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from .image_preprocess import IMAGE_ERRORS, check_decoded_size
+
+# Local classification stage in front of the vision model: "" (off) or a CLASSIFIER_BACKENDS key
+MEALS_CLASSIFIER = os.getenv('MEALS_CLASSIFIER', '')
+DEFAULT_GALLERY_PATH = Path(__file__).parent.parent.parent / ".meal_gallery.sqlite3"
+# Cosine similarity the nearest gallery photo must reach before a local answer is considered
+MEALS_CLASSIFIER_MIN_SIMILARITY = float(os.getenv('MEALS_CLASSIFIER_MIN_SIMILARITY', 0.8))
+# Share of the (similarity-weighted) neighbour votes the winning dish needs
+MEALS_CLASSIFIER_MIN_AGREEMENT = float(os.getenv('MEALS_CLASSIFIER_MIN_AGREEMENT', 0.8))
+MEALS_CLASSIFIER_NEIGHBOURS = int(os.getenv('MEALS_CLASSIFIER_NEIGHBOURS', 5))
+# Gallery photos kept; the oldest are dropped beyond this
+MEALS_CLASSIFIER_GALLERY_MAX = int(os.getenv('MEALS_CLASSIFIER_GALLERY_MAX', 5000))
+# Rows first allocated for gallery embeddings; doubled as the gallery grows
+GALLERY_MIN_CAPACITY = 256
+
+EMBEDDING_SIDE = 64
+# Central share of the photo that is embedded; the table around the plate says little
+CENTER_CROP = 0.7
+HUE_BINS, SATURATION_BINS, VALUE_BINS = 12, 4, 4
+# Weight of a grey pixel (plate, table, rice) in the colour histogram relative to a fully saturated one
+GREY_WEIGHT = 0.1
+GRID, ORIENTATIONS = 4, 8
+# Colour tells dishes apart better than texture at this resolution
+COLOR_WEIGHT = 0.7
+
+def embed_image(image: Image.Image) -> np.ndarray:
+    """
+    Unit-length feature vector of a photo's centre: a saturation-weighted HSV
+    colour histogram plus a coarse grid of gradient-orientation histograms
+    (texture/layout)
+
+    Cosine similarity of two embeddings is their dot product.
+    """
+    width, height = image.size
+    margin_x, margin_y = width * (1 - CENTER_CROP) / 2, height * (1 - CENTER_CROP) / 2
+    image = image.convert("RGB").crop((margin_x, margin_y, width - margin_x, height - margin_y))
+    image = image.resize((EMBEDDING_SIDE, EMBEDDING_SIDE), Image.BILINEAR)
+    hsv = np.asarray(image.convert("HSV"), dtype=np.int32)
+    bins = ((hsv[..., 0] * HUE_BINS >> 8) * SATURATION_BINS + (hsv[..., 1] * SATURATION_BINS >> 8)) * VALUE_BINS \
+        + (hsv[..., 2] * VALUE_BINS >> 8)
+    weights = GREY_WEIGHT + (1 - GREY_WEIGHT) * hsv[..., 1].ravel() / 255.0
+    # Square root (Hellinger) so one large area does not swamp the rest of the dish
+    color = np.sqrt(np.bincount(bins.ravel(), weights=weights, minlength=HUE_BINS * SATURATION_BINS * VALUE_BINS))
+
+    gray = np.asarray(image.convert("L"), dtype=np.float32)
+    gx = np.zeros_like(gray)
+    gy = np.zeros_like(gray)
+    gx[:, 1:-1] = gray[:, 2:] - gray[:, :-2]
+    gy[1:-1, :] = gray[2:, :] - gray[:-2, :]
+    magnitude = np.hypot(gx, gy)
+    orientation = ((np.arctan2(gy, gx) % np.pi) / np.pi * ORIENTATIONS).astype(np.int32) % ORIENTATIONS
+    cell = EMBEDDING_SIDE // GRID
+    cells = (np.arange(EMBEDDING_SIDE) // cell)
+    index = ((cells[:, None] * GRID + cells[None, :]) * ORIENTATIONS + orientation).ravel()
+    texture = np.sqrt(np.bincount(index, weights=magnitude.ravel(), minlength=GRID * GRID * ORIENTATIONS))
+
+    color /= np.linalg.norm(color) or 1.0
+    texture /= np.linalg.norm(texture) or 1.0
+    embedding = np.concatenate([color * COLOR_WEIGHT, texture * (1 - COLOR_WEIGHT)]).astype(np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+def embed_bytes(data: bytes) -> np.ndarray:
+    """embed_image of an upload, decoded at a reduced JPEG scale. Raises ValueError for non-images."""
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("RGB", (EMBEDDING_SIDE * 2, EMBEDDING_SIDE * 2))
+        check_decoded_size(image)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except IMAGE_ERRORS as e:
+        raise ValueError(f"Unsupported or corrupt image: {e}") from e
+    return embed_image(image)
+
+class GalleryClassifier:
+    """
+    Nearest-neighbour dish classifier over a labeled gallery of analysed photos
+
+    Each gallery photo has its embedding, dish label and the analysis entry
+    that was returned for it. predict() takes the k most similar photos and
+    lets those at least min_similarity vote, weighted by similarity; if one
+    dish holds min_agreement of the votes, its nearest photo answers.
+    Otherwise the caller falls through to the vision model, and can learn()
+    its answer so the dish is recognised next time. The gallery is kept in
+    SQLite so it survives restarts. Embeddings live in one preallocated
+    array (grown by doubling up to max_entries, then reused as a ring whose
+    oldest photo is replaced), so learn() never copies the whole gallery.
+    """
+
+    def __init__(self, path: Path = DEFAULT_GALLERY_PATH, min_similarity: float = MEALS_CLASSIFIER_MIN_SIMILARITY,
+                 min_agreement: float = MEALS_CLASSIFIER_MIN_AGREEMENT, neighbours: int = MEALS_CLASSIFIER_NEIGHBOURS,
+                 max_entries: int = MEALS_CLASSIFIER_GALLERY_MAX):
+        self.path = Path(path)
+        self.min_similarity = min_similarity
+        self.min_agreement = min_agreement
+        self.neighbours = neighbours
+        self.max_entries = max_entries
+        # Per slot; the first len(self._ids) rows of self._embeddings are in use
+        self._ids = []
+        self._labels = []
+        self._entries = []
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._oldest = 0  # slot replaced next once the gallery is full
+        self._connection = None
+        self._lock = threading.Lock()
+        self.answered = 0
+        self.passed = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Opened (and the gallery loaded) on first use
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS meal_gallery (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    label TEXT NOT NULL,
+                    entry TEXT NOT NULL,
+                    embedding BLOB NOT NULL
+                )
+            """)
+            self._connection.commit()
+            rows = self._connection.execute(
+                "SELECT id, label, entry, embedding FROM meal_gallery ORDER BY id DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()[::-1]
+            self._ids = [row[0] for row in rows]
+            self._labels = [row[1] for row in rows]
+            self._entries = [json.loads(row[2]) for row in rows]
+            self._embeddings = (np.stack([np.frombuffer(row[3], dtype=np.float32) for row in rows])
+                                if rows else np.zeros((0, 0), dtype=np.float32))
+            self._oldest = 0
+        return self._connection
+
+    def _free_slot(self, dimensions: int) -> int:
+        """Row for the next photo: appended (growing the array by doubling) or the oldest once full"""
+        count = len(self._ids)
+        if count >= self.max_entries:
+            slot = self._oldest
+            self._oldest = (slot + 1) % self.max_entries
+            return slot
+        if count == self._embeddings.shape[0]:
+            capacity = min(self.max_entries, max(GALLERY_MIN_CAPACITY, 2 * count))
+            embeddings = np.empty((capacity, dimensions), dtype=np.float32)
+            if count:
+                embeddings[:count] = self._embeddings
+            self._embeddings = embeddings
+        return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._get_connection()
+            return len(self._labels)
+
+    def predict(self, embedding: np.ndarray) -> Optional[dict]:
+        """{"label", "confidence", "similarity", "entry"} when confident, else None"""
+        with self._lock:
+            self._get_connection()
+            if not self._labels or self._embeddings.shape[1] != embedding.shape[0]:
+                self.passed += 1
+                return None
+            similarities = self._embeddings[:len(self._labels)] @ embedding
+            k = min(self.neighbours, len(self._labels))
+            nearest = np.argpartition(-similarities, k - 1)[:k]
+            nearest = nearest[np.argsort(-similarities[nearest])]
+            # Only photos close enough to answer on their own get a vote
+            close = [row for row in nearest if similarities[row] >= self.min_similarity]
+            if not close:
+                self.passed += 1
+                return None
+
+            votes = {}
+            for row in close:
+                votes[self._labels[row]] = votes.get(self._labels[row], 0.0) + float(similarities[row])
+            label = max(votes, key=votes.get)
+            agreement = votes[label] / sum(votes.values())
+            best = next(row for row in close if self._labels[row] == label)
+            similarity = float(similarities[best])
+
+            if agreement < self.min_agreement:
+                self.passed += 1
+                return None
+            self.answered += 1
+            return {"label": label, "confidence": round(agreement, 3), "similarity": round(similarity, 4),
+                    "entry": self._entries[best]}
+
+    def learn(self, embedding: np.ndarray, label: str, entry: dict) -> None:
+        """Add an analysed photo to the gallery"""
+        if not label:
+            return
+        embedding = embedding.astype(np.float32)
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                if self._ids and self._embeddings.shape[1] != embedding.shape[0]:
+                    print(f"[Meals] Gallery embeddings have {self._embeddings.shape[1]} dimensions, "
+                          f"not {embedding.shape[0]}; not learnt")
+                    return
+                cursor = connection.execute(
+                    "INSERT INTO meal_gallery (label, entry, embedding) VALUES (?, ?, ?)",
+                    (label, json.dumps(entry, ensure_ascii=False), embedding.tobytes())
+                )
+                slot = self._free_slot(embedding.shape[0])
+                self._embeddings[slot] = embedding
+                if slot < len(self._ids):
+                    # The replaced photo is the oldest kept; older rows left by a larger max_entries go too
+                    connection.execute("DELETE FROM meal_gallery WHERE id <= ?", (self._ids[slot],))
+                    self._ids[slot], self._labels[slot], self._entries[slot] = cursor.lastrowid, label, entry
+                else:
+                    self._ids.append(cursor.lastrowid)
+                    self._labels.append(label)
+                    self._entries.append(entry)
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"[Meals] Gallery write error: {e}")
+
+    def stats(self) -> dict:
+        decided = self.answered + self.passed
+        return {
+            "backend": "gallery",
+            "gallery": len(self._labels),
+            "dishes": len(set(self._labels)),
+            "answered": self.answered,
+            "passed": self.passed,
+            "absorbed": self.answered / decided if decided else 0.0,
+        }
+
+CLASSIFIER_BACKENDS = {
+    "gallery": GalleryClassifier,
+}
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_food_classifier() -> Optional[GalleryClassifier]:
+    """The configured MEALS_CLASSIFIER backend (created on first use), or None when it is off"""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None and MEALS_CLASSIFIER:
+            try:
+                _classifier = CLASSIFIER_BACKENDS[MEALS_CLASSIFIER]()
+            except KeyError:
+                raise ValueError(f"Unknown classifier backend: {MEALS_CLASSIFIER}")
+        return _classifier
+
+def set_food_classifier(classifier) -> None:
+    """Replace the shared classifier (any object with predict/learn/stats)"""
+    global _classifier
+    with _classifier_lock:
+        _classifier = classifier
+
+def classify_upload(classifier, data: bytes) -> Tuple[Optional[dict], np.ndarray]:
+    """(prediction or None, embedding) for an upload; run it on the image executor"""
+    embedding = embed_bytes(data)
+    return classifier.predict(embedding), embedding
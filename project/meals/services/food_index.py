@@ -0,0 +1,221 @@
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Food tables main.py also ingests into the knowledge base
+DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
+# A CSV to use instead of scanning DATA_DIR
+MEALS_FOOD_TABLE = os.getenv('MEALS_FOOD_TABLE')
+# model: the vision model estimates nutrients; local: it only names dishes and portions,
+# nutrients come from the food table (falls back to model when there is none)
+MEALS_NUTRITION_SOURCE = os.getenv('MEALS_NUTRITION_SOURCE', 'model')
+# Minimum Dice similarity of syllable bigrams for a fuzzy name match
+MEALS_FOOD_MATCH_THRESHOLD = float(os.getenv('MEALS_FOOD_MATCH_THRESHOLD', 0.6))
+
+NUTRIENTS = ("kcal", "carbs", "protein", "fat", "sodium", "fiber")
+
+# Column names seen in food tables (same keys as convert_nutrition_row_to_text, plus
+# the Korean food composition database headers), compared without spaces and units
+COLUMN_ALIASES = {
+    "name": ("음식명", "식품명", "name", "food", "food_name"),
+    "kcal": ("칼로리", "에너지", "열량", "calories", "kcal", "energy"),
+    "carbs": ("탄수화물", "carbohydrates", "carbohydrate", "carbs"),
+    "protein": ("단백질", "protein"),
+    "fat": ("지방", "fat"),
+    "sodium": ("나트륨", "sodium"),
+    "fiber": ("식이섬유", "총식이섬유", "fiber", "dietary_fiber"),
+    "serving": ("1회제공량", "제공량", "serving", "serving_size", "serving_g", "grams"),
+}
+DEFAULT_SERVING_GRAMS = 100.0
+
+_UNIT = re.compile(r"\(.*?\)|\[.*?\]")
+_NOT_WORD = re.compile(r"[\W_]+")
+
+def normalize_name(name: str) -> str:
+    """Lower-case NFC name without spaces, punctuation or parenthesised notes ("김치찌개 (돼지)" -> "김치찌개")"""
+    name = unicodedata.normalize("NFC", str(name)).lower()
+    return _NOT_WORD.sub("", _UNIT.sub("", name)) or _NOT_WORD.sub("", name)
+
+def _bigrams(name: str) -> set:
+    return {name[i:i + 2] for i in range(len(name) - 1)} or {name}
+
+def _find_column(columns, key: str) -> Optional[str]:
+    for column in columns:
+        bare = _NOT_WORD.sub("", _UNIT.sub("", str(column))).lower()
+        if bare in COLUMN_ALIASES[key]:
+            return column
+    return None
+
+class FoodIndex:
+    """
+    Per-gram nutrients of a food table with exact and fuzzy name lookup
+
+    Nutrients are stored as one float matrix (foods x NUTRIENTS), so scaling
+    any number of matched foods by their portions is a single multiply.
+    Table values are per serving when a serving-size column exists and per
+    100 g otherwise; sodium is kept in grams like the vision answers.
+    """
+
+    def __init__(self, names: List[str], per_gram: np.ndarray, serving_grams: np.ndarray,
+                 threshold: float = MEALS_FOOD_MATCH_THRESHOLD):
+        self.names = list(names)
+        self.per_gram = per_gram
+        self.serving_grams = serving_grams
+        self.threshold = threshold
+        self._exact = {}
+        self._postings = {}
+        self._sizes = np.zeros(len(self.names), dtype=np.int32)
+        for row, name in enumerate(self.names):
+            key = normalize_name(name)
+            self._exact.setdefault(key, row)
+            grams = _bigrams(key)
+            self._sizes[row] = len(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(row)
+        self._postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in self._postings.items()}
+        self._matches = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, **options) -> "FoodIndex":
+        columns = {key: _find_column(frame.columns, key) for key in COLUMN_ALIASES}
+        if columns["name"] is None or not any(columns[key] for key in NUTRIENTS):
+            raise ValueError("Not a food table: needs a food name column and at least one nutrient column")
+
+        frame = frame.dropna(subset=[columns["name"]])
+        values = np.full((len(frame), len(NUTRIENTS)), np.nan)
+        for position, key in enumerate(NUTRIENTS):
+            if columns[key] is not None:
+                values[:, position] = pd.to_numeric(frame[columns[key]], errors="coerce").to_numpy(dtype=float)
+
+        sodium = values[:, NUTRIENTS.index("sodium")]
+        known = sodium[np.isfinite(sodium)]
+        # Composition tables list sodium in mg; a median above 20 cannot be grams per serving
+        if "mg" in str(columns["sodium"] or "").lower() or (known.size and np.median(known) > 20):
+            values[:, NUTRIENTS.index("sodium")] = sodium / 1000
+
+        if columns["serving"] is not None:
+            serving = pd.to_numeric(frame[columns["serving"]], errors="coerce").to_numpy(dtype=float)
+            serving = np.where(serving > 0, serving, np.nan)
+            per_gram = values / np.where(np.isnan(serving), DEFAULT_SERVING_GRAMS, serving)[:, None]
+            serving = np.where(np.isnan(serving), DEFAULT_SERVING_GRAMS, serving)
+        else:
+            per_gram = values / DEFAULT_SERVING_GRAMS
+            serving = np.full(len(frame), DEFAULT_SERVING_GRAMS)
+
+        return cls(frame[columns["name"]].astype(str).tolist(), per_gram, serving, **options)
+
+    def match(self, name: str) -> Optional[dict]:
+        """Best table row for a dish name: exact after normalising, else the closest by bigram Dice score"""
+        key = normalize_name(name or "")
+        if not key:
+            return None
+        if key in self._matches:
+            return self._matches[key]
+
+        row, score = self._exact.get(key), 1.0
+        if row is None:
+            grams = _bigrams(key)
+            hits = [self._postings[gram] for gram in grams if gram in self._postings]
+            row = None
+            if hits:
+                shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+                dice = 2 * shared / (len(grams) + self._sizes)
+                best = int(np.argmax(dice))
+                if dice[best] >= self.threshold:
+                    row, score = best, float(dice[best])
+
+        match = None if row is None else {"row": row, "name": self.names[row], "score": round(score, 3)}
+        self._matches[key] = match
+        return match
+
+    def estimate(self, items: list) -> list:
+        """
+        Nutrients for [{"dish", "grams"}, ...]: each item matched and scaled by its portion
+
+        Items without grams get the table's serving size; unmatched items get
+        match None and no nutrient values.
+        """
+        matches = [self.match(item.get("dish")) for item in items]
+        rows = np.array([match["row"] if match else 0 for match in matches], dtype=np.int64)
+        matched = np.array([match is not None for match in matches], dtype=bool)
+        grams = np.array([item.get("grams") if item.get("grams") else np.nan for item in items], dtype=float)
+        grams = np.where(np.isnan(grams), self.serving_grams[rows], grams)
+        amounts = self.per_gram[rows] * grams[:, None]
+
+        estimates = []
+        for item, match, matched_row, portion, row_amounts in zip(items, matches, matched, grams, amounts):
+            estimate = {"dish": item.get("dish"), "grams": float(portion) if matched_row else item.get("grams"),
+                        "match": match}
+            for key, value in zip(NUTRIENTS, row_amounts):
+                estimate[key] = round(float(value), 2) if matched_row and np.isfinite(value) else None
+            estimates.append(estimate)
+        return estimates
+
+def _read_table(path: Path) -> Optional[pd.DataFrame]:
+    # Same encodings process_large_food_csv tries
+    for encoding in ("utf-8", "cp949", "euc-kr", "latin-1"):
+        try:
+            return pd.read_csv(path, encoding=encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+def load_food_index(paths: List[Path] = None) -> Optional[FoodIndex]:
+    """FoodIndex over every readable food table among paths (default: MEALS_FOOD_TABLE or DATA_DIR/*.csv)"""
+    if paths is None:
+        paths = [Path(MEALS_FOOD_TABLE)] if MEALS_FOOD_TABLE else sorted(DATA_DIR.glob("*.csv"))
+    frames = []
+    for path in paths:
+        frame = _read_table(path)
+        if frame is None:
+            continue
+        try:
+            index = FoodIndex.from_frame(frame)
+        except ValueError:
+            continue  # exercise tables and the like
+        frames.append(index)
+        print(f"[Meals] Food table {path.name}: {len(index)} foods")
+    if not frames:
+        print("[Meals] No food table found; nutrients will come from the vision model")
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    return FoodIndex(
+        [name for index in frames for name in index.names],
+        np.vstack([index.per_gram for index in frames]),
+        np.concatenate([index.serving_grams for index in frames]),
+    )
+
+_food_index = None
+_food_index_loaded = False
+_food_index_lock = threading.Lock()
+
+def get_food_index() -> Optional[FoodIndex]:
+    """Shared index, built on first use; None when no food table is available"""
+    global _food_index, _food_index_loaded
+    with _food_index_lock:
+        if not _food_index_loaded:
+            _food_index = load_food_index()
+            _food_index_loaded = True
+        return _food_index
+
+def local_food_index() -> Optional[FoodIndex]:
+    """The shared index when MEALS_NUTRITION_SOURCE is local, else None"""
+    if MEALS_NUTRITION_SOURCE != "local":
+        return None
+    return get_food_index()
+
+def set_food_index(index: Optional[FoodIndex]) -> None:
+    """Replace the shared index (after loading a new table)"""
+    global _food_index, _food_index_loaded
+    with _food_index_lock:
+        _food_index, _food_index_loaded = index, True
@@ -0,0 +1,281 @@
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from .image_preprocess import IMAGE_ERRORS, check_decoded_size
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".meal_image_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+# Differing bits (of 64) still treated as the same photo; both hashes must be within it
+DEFAULT_MAX_DISTANCE = 6
+
+# Hits update recency in memory; their last_access is written in batches of up to N
+ACCESS_FLUSH_INTERVAL = 100
+
+# Version of the stored result format; entries written under another one are ignored
+ANALYSIS_CACHE_NAMESPACE = "analyze:v2"
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+_DCT_32 = _dct_matrix(32)
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8)).tobytes(), "big")
+
+def phash(image: Image.Image) -> int:
+    """64-bit DCT perceptual hash: low frequencies of a 32x32 grayscale, above/below their median"""
+    pixels = np.asarray(image.convert("L").resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT_32 @ pixels @ _DCT_32.T)[:8, :8].flatten()
+    # The DC term only reflects overall brightness
+    return _bits_to_int(low > np.median(low[1:]))
+
+def dhash(image: Image.Image) -> int:
+    """64-bit difference hash: is each pixel brighter than its left neighbour (9x8 grayscale)"""
+    pixels = np.asarray(image.convert("L").resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+def image_fingerprint(data: bytes) -> Tuple[int, int]:
+    """
+    (pHash, dHash) of an uploaded photo
+
+    Decoded at the smallest JPEG draft scale, so this costs a few
+    milliseconds even for a 12 MP photo. Raises ValueError for non-images.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("L", (64, 64))
+        check_decoded_size(image)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((128, 128))
+    except IMAGE_ERRORS as e:
+        raise ValueError(f"Unsupported or corrupt image: {e}") from e
+    return phash(image), dhash(image)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+class ImageResultCache:
+    """
+    Analysis results keyed by perceptual hash, so re-uploads skip the vision model
+
+    A lookup first tries the exact (pHash, dHash) pair, then the nearest stored
+    photo whose hashes both differ in at most max_distance bits (re-encoded,
+    resized or slightly cropped copies). Entries live in memory (LRU, at most
+    max_entries) and in SQLite, so a restart keeps them. A hit only touches
+    memory: last_access (which orders the reload after a restart) is written
+    with the next set() or every ACCESS_FLUSH_INTERVAL hits. get() and set()
+    still block on SQLite now and then; async callers run them on the image
+    executor.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_distance: int = DEFAULT_MAX_DISTANCE, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 namespace: str = ANALYSIS_CACHE_NAMESPACE, enabled: bool = True):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.enabled = enabled
+        self._entries = OrderedDict()  # (phash, dhash) -> (result, created_at)
+        self._hash_arrays = None       # (keys, phashes, dhashes) for near-duplicate scans
+        self._accessed = {}            # key -> last hit time not yet written
+        self._connection = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lookup_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ImageResultCache":
+        return cls(
+            path=Path(os.getenv("MEALS_IMAGE_CACHE_PATH", str(DEFAULT_CACHE_PATH))),
+            max_entries=int(os.getenv("MEALS_IMAGE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_distance=int(os.getenv("MEALS_IMAGE_CACHE_MAX_DISTANCE", DEFAULT_MAX_DISTANCE)),
+            ttl_seconds=float(os.getenv("MEALS_IMAGE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            # Answers with model-estimated and table-based nutrients are kept apart
+            namespace=f"{ANALYSIS_CACHE_NAMESPACE}:{os.getenv('MEALS_NUTRITION_SOURCE', 'model')}",
+            enabled=os.getenv("MEALS_IMAGE_CACHE_ENABLED", "1") not in ("0", "false", "False"),
+        )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Opened (and the stored entries loaded) on first use, never at import
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS meal_image_cache (
+                    namespace TEXT NOT NULL,
+                    phash TEXT NOT NULL,
+                    dhash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, phash, dhash)
+                )
+            """)
+            self._connection.commit()
+            rows = self._connection.execute(
+                "SELECT phash, dhash, result, created_at FROM meal_image_cache "
+                "WHERE namespace = ? AND created_at >= ? ORDER BY last_access DESC LIMIT ?",
+                (self.namespace, time.time() - self.ttl_seconds, self.max_entries)
+            ).fetchall()
+            for phash_hex, dhash_hex, result, created_at in reversed(rows):
+                self._entries[(int(phash_hex, 16), int(dhash_hex, 16))] = (json.loads(result), created_at)
+            self._hash_arrays = None
+        return self._connection
+
+    def load(self) -> int:
+        """Open the database and load the stored entries now instead of on the first lookup; returns their count"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            self._get_connection()
+            return len(self._entries)
+
+    def _nearest(self, key: Tuple[int, int]) -> Tuple[Optional[Tuple[int, int]], int]:
+        if not self._entries:
+            return None, 64
+        if self._hash_arrays is None:
+            keys = list(self._entries)
+            self._hash_arrays = (
+                keys,
+                np.array([k[0] for k in keys], dtype=np.uint64),
+                np.array([k[1] for k in keys], dtype=np.uint64),
+            )
+        keys, phashes, dhashes = self._hash_arrays
+        distances = np.maximum(_popcount(phashes ^ np.uint64(key[0])), _popcount(dhashes ^ np.uint64(key[1])))
+        best = int(np.argmin(distances))
+        return keys[best], int(distances[best])
+
+    def get(self, phash_value: int, dhash_value: int) -> Optional[dict]:
+        """Stored result for this photo or a near-duplicate (with "distance" added), else None"""
+        if not self.enabled:
+            return None
+
+        started = time.perf_counter()
+        key = (phash_value, dhash_value)
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                distance = 0
+                if key not in self._entries:
+                    key, distance = self._nearest(key)
+                    if key is None or distance > self.max_distance:
+                        self.misses += 1
+                        return None
+
+                result, created_at = self._entries[key]
+                if time.time() - created_at > self.ttl_seconds:
+                    self._remove(connection, key)
+                    self.misses += 1
+                    return None
+
+                self._entries.move_to_end(key)
+                self._accessed[key] = time.time()
+                if len(self._accessed) >= ACCESS_FLUSH_INTERVAL:
+                    self._flush_access(connection)
+                    connection.commit()
+                if distance:
+                    self.near_hits += 1
+                else:
+                    self.hits += 1
+                return dict(result, distance=distance)
+        except sqlite3.Error as e:
+            print(f"[Meal cache] Read error: {e}")
+            return None
+        finally:
+            self._lookup_seconds += time.perf_counter() - started
+
+    def set(self, phash_value: int, dhash_value: int, result: dict) -> None:
+        """Store a successful analysis result (never an error response)"""
+        if not self.enabled:
+            return
+
+        key = (phash_value, dhash_value)
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                connection.execute(
+                    "INSERT OR REPLACE INTO meal_image_cache (namespace, phash, dhash, result, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, f"{key[0]:016x}", f"{key[1]:016x}", json.dumps(result, ensure_ascii=False), now, now)
+                )
+                self._entries[key] = (result, now)
+                self._entries.move_to_end(key)
+                self._accessed.pop(key, None)
+                self._hash_arrays = None
+                while len(self._entries) > self.max_entries:
+                    self._remove(connection, next(iter(self._entries)))
+                self._flush_access(connection)
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"[Meal cache] Write error: {e}")
+
+    def _flush_access(self, connection: sqlite3.Connection) -> None:
+        if self._accessed:
+            connection.executemany(
+                "UPDATE meal_image_cache SET last_access = ? WHERE namespace = ? AND phash = ? AND dhash = ?",
+                [(accessed, self.namespace, f"{key[0]:016x}", f"{key[1]:016x}") for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _remove(self, connection: sqlite3.Connection, key: Tuple[int, int]) -> None:
+        self._entries.pop(key, None)
+        self._accessed.pop(key, None)
+        self._hash_arrays = None
+        connection.execute(
+            "DELETE FROM meal_image_cache WHERE namespace = ? AND phash = ? AND dhash = ?",
+            (self.namespace, f"{key[0]:016x}", f"{key[1]:016x}")
+        )
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute("DELETE FROM meal_image_cache WHERE namespace = ?", (self.namespace,))
+            connection.commit()
+            self._entries.clear()
+            self._accessed.clear()
+            self._hash_arrays = None
+        self.hits = self.near_hits = self.misses = 0
+        self._lookup_seconds = 0.0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            "avg_lookup_ms": self._lookup_seconds * 1000 / lookups if lookups else 0.0,
+        }
+
+# Shared by the meals endpoints
+image_result_cache = ImageResultCache.from_env()
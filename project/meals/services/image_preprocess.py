@@ -0,0 +1,122 @@
+import asyncio
+import functools
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Longest side sent to the vision model; more pixels only add tokens and upload time
+MEALS_IMAGE_MAX_SIDE = int(os.getenv('MEALS_IMAGE_MAX_SIDE', 1024))
+# JPEG or WEBP
+MEALS_IMAGE_FORMAT = os.getenv('MEALS_IMAGE_FORMAT', 'JPEG').upper()
+MEALS_IMAGE_QUALITY = int(os.getenv('MEALS_IMAGE_QUALITY', 82))
+# Threads that decode / resize / encode uploads (Pillow releases the GIL while doing so)
+MEALS_PREPROCESS_WORKERS = int(os.getenv('MEALS_PREPROCESS_WORKERS', min(4, os.cpu_count() or 1)))
+# Pixels an upload may decode to (after JPEG draft scaling); bounds the memory of one decode
+MEALS_MAX_DECODED_PIXELS = int(os.getenv('MEALS_MAX_DECODED_PIXELS', 40_000_000))
+
+# Errors Pillow raises for data it cannot (or will not) decode
+IMAGE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError)
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+def check_decoded_size(image: Image.Image) -> None:
+    """Raise ValueError before decoding an opened image whose pixels exceed MEALS_MAX_DECODED_PIXELS"""
+    width, height = image.size
+    if width * height > MEALS_MAX_DECODED_PIXELS:
+        raise ValueError(f"Image is {width}x{height}; at most {MEALS_MAX_DECODED_PIXELS:,} pixels are decoded")
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode == "RGB":
+        return image
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent areas become white rather than black
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+def preprocess_image(data: bytes, max_side: int = MEALS_IMAGE_MAX_SIDE,
+                     output_format: str = MEALS_IMAGE_FORMAT, quality: int = MEALS_IMAGE_QUALITY) -> dict:
+    """
+    Shrink an uploaded photo to what the vision model can use
+
+    JPEGs are decoded at a reduced DCT scale (draft mode) when possible, the
+    EXIF orientation is applied and all metadata dropped, the image is fitted
+    into max_side x max_side and re-encoded as output_format (JPEG or WEBP).
+    Returns the encoded bytes with sizes before and after.
+    Raises ValueError for data Pillow cannot read.
+    """
+    output_format = output_format.upper()
+    if output_format not in MIME_TYPES:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        original_format = image.format
+        original_size = image.size
+        # Only JPEG supports draft; it picks the smallest scale still >= the requested size
+        image.draft("RGB", (max_side, max_side))
+        check_decoded_size(image)
+        image = ImageOps.exif_transpose(image)
+        image = _to_rgb(image)
+    except IMAGE_ERRORS as e:
+        raise ValueError(f"Unsupported or corrupt image: {e}") from e
+
+    image.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+
+    output = io.BytesIO()
+    save_options = {"quality": quality}
+    if output_format == "JPEG":
+        save_options.update(optimize=True, progressive=True)
+    else:
+        save_options.update(method=4)
+    # No exif= / icc_profile= passed: metadata (GPS, camera, thumbnails) is not carried over
+    image.save(output, format=output_format, **save_options)
+    encoded = output.getvalue()
+
+    return {
+        "data": encoded,
+        "mime_type": MIME_TYPES[output_format],
+        "original_format": original_format,
+        "original_size": original_size,
+        "size": image.size,
+        "original_bytes": len(data),
+        "bytes": len(encoded),
+        "bytes_saved": len(data) - len(encoded),
+    }
+
+_executor = None
+_executor_lock = threading.Lock()
+_stats = {"images": 0, "original_bytes": 0, "bytes": 0}
+_stats_lock = threading.Lock()
+
+def get_preprocess_executor() -> ThreadPoolExecutor:
+    """Bounded thread pool for image work, kept off the event loop and the default executor"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MEALS_PREPROCESS_WORKERS, thread_name_prefix="meals-image")
+        return _executor
+
+async def preprocess_upload(data: bytes, **options) -> dict:
+    """Run preprocess_image on the image executor and record the bytes saved"""
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(get_preprocess_executor(), functools.partial(preprocess_image, data, **options))
+    with _stats_lock:
+        _stats["images"] += 1
+        _stats["original_bytes"] += result["original_bytes"]
+        _stats["bytes"] += result["bytes"]
+    print(f"[Meals] Image {result['original_size']} {result['original_bytes']:,} B -> "
+          f"{result['size']} {result['bytes']:,} B ({result['bytes_saved']:,} B saved)")
+    return result
+
+def preprocess_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["bytes_saved"] = stats["original_bytes"] - stats["bytes"]
+    stats["ratio"] = stats["bytes"] / stats["original_bytes"] if stats["original_bytes"] else 0.0
+    return stats
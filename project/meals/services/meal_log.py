@@ -0,0 +1,199 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .nutrition import NUTRIENTS, NutritionRecord
+
+DEFAULT_LOG_PATH = Path(__file__).parent.parent.parent / ".meal_log.sqlite3"
+# Users whose current day/week totals are kept in memory
+MEALS_LOG_MEMO_USERS = int(os.getenv('MEALS_LOG_MEMO_USERS', 10000))
+
+def week_start(day: datetime.date) -> datetime.date:
+    """Monday of the day's week"""
+    return day - datetime.timedelta(days=day.weekday())
+
+def _empty_totals() -> dict:
+    return {"meals": 0, **{key: 0.0 for key in NUTRIENTS}}
+
+def _copy(summary: dict) -> dict:
+    return {**summary, "today": dict(summary["today"]), "week": dict(summary["week"])}
+
+class MealLog:
+    """
+    Analysed meals per user and day, with running daily and weekly totals
+
+    Every add() stores the meal row and, in the same transaction, adds its
+    nutrients to the user's day and week total rows, so totals are read as
+    one row each and never summed from the meals. The totals of each user's
+    current day and week are also kept in memory (up to memo_users users),
+    so summary() for today usually costs no query at all. Unknown nutrient
+    values count as 0.
+    """
+
+    def __init__(self, path: Path = DEFAULT_LOG_PATH, memo_users: int = MEALS_LOG_MEMO_USERS):
+        self.path = Path(path)
+        self.memo_users = memo_users
+        self._memo = OrderedDict()  # user_id -> summary of the day it was built for
+        self._connection = None
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Opened on first use, never at import
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{key} REAL NOT NULL DEFAULT 0" for key in NUTRIENTS)
+            self._connection.executescript(f"""
+                CREATE TABLE IF NOT EXISTS meal_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    logged_at REAL NOT NULL,
+                    source TEXT,
+                    nutrition TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_meal_log_user_day ON meal_log (user_id, day);
+                CREATE TABLE IF NOT EXISTS meal_daily_totals (
+                    user_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    meals INTEGER NOT NULL DEFAULT 0,
+                    {columns},
+                    PRIMARY KEY (user_id, day)
+                );
+                CREATE TABLE IF NOT EXISTS meal_weekly_totals (
+                    user_id TEXT NOT NULL,
+                    week TEXT NOT NULL,
+                    days INTEGER NOT NULL DEFAULT 0,
+                    meals INTEGER NOT NULL DEFAULT 0,
+                    {columns},
+                    PRIMARY KEY (user_id, week)
+                );
+            """)
+            self._connection.commit()
+        return self._connection
+
+    def _read_totals(self, connection: sqlite3.Connection, table: str, key: str, user_id: str, value: str,
+                     counts: tuple = ("meals",)) -> dict:
+        self.queries += 1
+        row = connection.execute(
+            f"SELECT {', '.join(counts + NUTRIENTS)} FROM {table} WHERE user_id = ? AND {key} = ?", (user_id, value)
+        ).fetchone()
+        row = row or (0,) * (len(counts) + len(NUTRIENTS))
+        totals = dict(zip(counts, row))
+        totals.update({name: round(float(amount), 2) for name, amount in zip(NUTRIENTS, row[len(counts):])})
+        return totals
+
+    def _load_summary(self, connection: sqlite3.Connection, user_id: str, day: datetime.date) -> dict:
+        week = week_start(day).isoformat()
+        return {
+            "day": day.isoformat(),
+            "week_start": week,
+            "today": self._read_totals(connection, "meal_daily_totals", "day", user_id, day.isoformat()),
+            "week": self._read_totals(connection, "meal_weekly_totals", "week", user_id, week, ("days", "meals")),
+        }
+
+    def _remember(self, user_id: str, summary: dict) -> None:
+        self._memo[user_id] = summary
+        self._memo.move_to_end(user_id)
+        while len(self._memo) > self.memo_users:
+            self._memo.popitem(last=False)
+
+    def add(self, user_id: str, nutrition, day: datetime.date = None, source: str = None) -> Optional[dict]:
+        """
+        Log one meal (NutritionRecord or dict) for the user; returns the user's
+        summary for that day, or None if it could not be stored
+        """
+        if isinstance(nutrition, NutritionRecord):
+            nutrition = nutrition.model_dump()
+        day = day or datetime.date.today()
+        week = week_start(day).isoformat()
+        amounts = [float(nutrition.get(key) or 0.0) for key in NUTRIENTS]
+        additions = ", ".join(f"{key} = {key} + excluded.{key}" for key in NUTRIENTS)
+        placeholders = ", ".join("?" for _ in NUTRIENTS)
+
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                with connection:
+                    connection.execute(
+                        "INSERT INTO meal_log (user_id, day, logged_at, source, nutrition) VALUES (?, ?, ?, ?, ?)",
+                        (user_id, day.isoformat(), time.time(), source, json.dumps(nutrition, ensure_ascii=False))
+                    )
+                    meals_today = connection.execute(
+                        f"INSERT INTO meal_daily_totals (user_id, day, meals, {', '.join(NUTRIENTS)}) "
+                        f"VALUES (?, ?, 1, {placeholders}) "
+                        f"ON CONFLICT (user_id, day) DO UPDATE SET meals = meals + 1, {additions} RETURNING meals",
+                        (user_id, day.isoformat(), *amounts)
+                    ).fetchone()[0]
+                    # The first meal of a day also counts the day, for the week's daily average
+                    connection.execute(
+                        f"INSERT INTO meal_weekly_totals (user_id, week, days, meals, {', '.join(NUTRIENTS)}) "
+                        f"VALUES (?, ?, 1, 1, {placeholders}) "
+                        f"ON CONFLICT (user_id, week) DO UPDATE SET days = days + ?, meals = meals + 1, {additions}",
+                        (user_id, week, *amounts, 1 if meals_today == 1 else 0)
+                    )
+
+                summary = self._memo.get(user_id)
+                if summary is not None and summary["week_start"] == week:
+                    # Same increments as the rows above, applied to the memoised totals
+                    same_day = summary["day"] == day.isoformat()
+                    for totals in (summary["week"], summary["today"]) if same_day else (summary["week"],):
+                        totals["meals"] += 1
+                        for key, amount in zip(NUTRIENTS, amounts):
+                            totals[key] = round(totals[key] + amount, 2)
+                    if meals_today == 1:
+                        summary["week"]["days"] += 1
+                if summary is None or summary["day"] != day.isoformat():
+                    summary = self._load_summary(connection, user_id, day)
+                    if day == datetime.date.today():
+                        self._remember(user_id, summary)
+                return _copy(summary)
+        except sqlite3.Error as e:
+            print(f"[Meal log] Write error: {e}")
+            return None
+
+    def summary(self, user_id: str, day: datetime.date = None) -> dict:
+        """
+        {"day", "week_start", "today": totals, "week": totals with "days"} for the user;
+        totals have "meals" and each nutrient
+        """
+        day = day or datetime.date.today()
+        with self._lock:
+            summary = self._memo.get(user_id)
+            if summary is not None and summary["day"] == day.isoformat():
+                self._memo.move_to_end(user_id)
+                return _copy(summary)
+            try:
+                summary = self._load_summary(self._get_connection(), user_id, day)
+            except sqlite3.Error as e:
+                print(f"[Meal log] Read error: {e}")
+                return {"day": day.isoformat(), "week_start": week_start(day).isoformat(),
+                        "today": _empty_totals(), "week": {"days": 0, **_empty_totals()}}
+            if day == datetime.date.today():
+                self._remember(user_id, summary)
+            return _copy(summary)
+
+_meal_log = None
+_meal_log_lock = threading.Lock()
+
+def get_meal_log() -> MealLog:
+    """Shared log (MEALS_LOG_PATH or project/.meal_log.sqlite3), created on first use"""
+    global _meal_log
+    with _meal_log_lock:
+        if _meal_log is None:
+            _meal_log = MealLog(path=Path(os.getenv("MEALS_LOG_PATH", str(DEFAULT_LOG_PATH))))
+        return _meal_log
+
+def set_meal_log(meal_log: Optional[MealLog]) -> None:
+    """Replace the shared log (tests, another database file)"""
+    global _meal_log
+    with _meal_log_lock:
+        _meal_log = meal_log
@@ -0,0 +1,227 @@
+import json
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+class NutritionRecord(BaseModel):
+    """One analysed meal photo; amounts in grams except kcal, None when unknown"""
+    dish: Optional[str] = None
+    kcal: Optional[float] = None
+    carbs: Optional[float] = None
+    protein: Optional[float] = None
+    fat: Optional[float] = None
+    sodium: Optional[float] = None
+    fiber: Optional[float] = None
+    grams: Optional[float] = None
+
+class PortionItem(BaseModel):
+    """One food in a photo as named by the vision model in local-nutrition mode"""
+    dish: Optional[str] = None
+    grams: Optional[float] = None
+
+NUTRIENTS = ("kcal", "carbs", "protein", "fat", "sodium", "fiber", "grams")
+
+# Bullet labels of the text prompt -> record fields
+LABELS = {
+    "요리명": "dish",
+    "칼로리": "kcal",
+    "탄수화물": "carbs",
+    "단백질": "protein",
+    "지방": "fat",
+    "나트륨": "sodium",
+    "식이섬유": "fiber",
+    "총량": "grams",
+}
+
+def _record_schema(extra_properties: dict = None) -> dict:
+    # Strict structured outputs need every property listed in required; null marks "unknown"
+    properties = {"dish": {"type": ["string", "null"], "description": "Dish name in Korean"}}
+    properties.update({key: {"type": ["number", "null"]} for key in NUTRIENTS})
+    properties["sodium"]["description"] = "Sodium in grams"
+    properties["grams"]["description"] = "Total amount of food in grams"
+    properties.update(extra_properties or {})
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+def response_format(batch: bool = False) -> dict:
+    """response_format for chat.completions: one record, or {"meals": [...]} with a photo number each"""
+    if batch:
+        schema = {
+            "type": "object",
+            "properties": {"meals": {"type": "array", "items": _record_schema({"photo": {"type": "integer"}})}},
+            "required": ["meals"],
+            "additionalProperties": False,
+        }
+        name = "meal_batch"
+    else:
+        schema = _record_schema()
+        name = "meal_nutrition"
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+def portion_response_format(batch: bool = False) -> dict:
+    """response_format asking only for dish names and portions: {"items": [...]}, per photo for batches"""
+    item = {
+        "type": "object",
+        "properties": {"dish": {"type": "string", "description": "Dish name in Korean"},
+                       "grams": {"type": ["number", "null"], "description": "Estimated amount in grams"}},
+        "required": ["dish", "grams"],
+        "additionalProperties": False,
+    }
+    items = {"items": {"type": "array", "items": item}}
+    if batch:
+        photo = {"type": "object", "properties": {"photo": {"type": "integer"}, **items},
+                 "required": ["photo", "items"], "additionalProperties": False}
+        schema = {"type": "object", "properties": {"meals": {"type": "array", "items": photo}},
+                  "required": ["meals"], "additionalProperties": False}
+        name = "meal_batch_portions"
+    else:
+        schema = {"type": "object", "properties": items, "required": ["items"], "additionalProperties": False}
+        name = "meal_portions"
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+_LINE = re.compile(r"^\s*[-*•]?\s*(?:\*\*)?(%s)(?:\*\*)?\s*[:：]\s*(.+?)\s*$" % "|".join(LABELS), re.MULTILINE)
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_GRAMS = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(?:g|그램)\b", re.IGNORECASE)
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+def _first_number(text: str) -> Optional[float]:
+    match = _NUMBER.search(text)
+    return float(match.group().replace(",", "")) if match else None
+
+def _parse_value(key: str, text: str) -> Optional[float]:
+    if key == "grams":
+        # "2개, 총 500g": the amount is the number with a gram unit, not the count
+        match = _GRAMS.search(text)
+        return float(match.group(1).replace(",", "")) if match else _first_number(text)
+    value = _first_number(text)
+    if value is not None and key == "sodium" and re.search(r"\d\s*mg", text, re.IGNORECASE):
+        value /= 1000
+    return value
+
+def parse_nutrition_text(text: str) -> NutritionRecord:
+    """
+    Record from the "- 요리명: ..." bullet answer
+
+    Missing or unreadable values are None; sodium given in mg is converted
+    to grams like the other nutrients.
+    """
+    values = {}
+    for label, value in _LINE.findall(text):
+        key = LABELS[label]
+        if key not in values:
+            values[key] = value if key == "dish" else _parse_value(key, value)
+    return NutritionRecord(**values)
+
+def _load_json(text: str):
+    try:
+        return json.loads(_FENCE.sub("", text))
+    except ValueError:
+        return None
+
+def parse_analysis(text: str) -> NutritionRecord:
+    """Record from a single-photo answer: the JSON of structured mode, else the bullet format"""
+    data = _load_json(text)
+    if isinstance(data, dict):
+        try:
+            return NutritionRecord.model_validate(data)
+        except ValidationError:
+            pass
+    return parse_nutrition_text(text)
+
+def parse_batch_analysis(text: str, count: int) -> Optional[List[Optional[NutritionRecord]]]:
+    """
+    Per-photo records from a structured batch answer ({"meals": [...]})
+
+    Meals are placed by their photo number, or by position when that is
+    missing or out of range. Returns None when the text is not such JSON,
+    so the caller can fall back to splitting the bullet format.
+    """
+    data = _load_json(text)
+    if not isinstance(data, dict) or not isinstance(data.get("meals"), list):
+        return None
+    records = [None] * count
+    for position, meal in enumerate(data["meals"]):
+        if not isinstance(meal, dict):
+            continue
+        photo = meal.get("photo")
+        index = photo - 1 if isinstance(photo, int) and 1 <= photo <= count else position
+        if index < count and records[index] is None:
+            try:
+                records[index] = NutritionRecord.model_validate(meal)
+            except ValidationError:
+                pass
+    return records
+
+def _portion_items(data) -> Optional[List[dict]]:
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+        return None
+    items = []
+    for item in data["items"]:
+        try:
+            item = PortionItem.model_validate(item)
+        except ValidationError:
+            continue
+        if item.dish:
+            items.append(item.model_dump())
+    return items
+
+def parse_portions(text: str) -> List[dict]:
+    """[{"dish", "grams"}, ...] from a portions answer; the bullet format gives at most one item"""
+    items = _portion_items(_load_json(text))
+    if items is not None:
+        return items
+    record = parse_nutrition_text(text)
+    return [{"dish": record.dish, "grams": record.grams}] if record.dish else []
+
+def parse_batch_portions(text: str, count: int) -> Optional[List[Optional[List[dict]]]]:
+    """Per-photo item lists from a batch portions answer, placed like parse_batch_analysis; None if not JSON"""
+    data = _load_json(text)
+    if not isinstance(data, dict) or not isinstance(data.get("meals"), list):
+        return None
+    photos = [None] * count
+    for position, meal in enumerate(data["meals"]):
+        items = _portion_items(meal)
+        if items is None:
+            continue
+        photo = meal.get("photo")
+        index = photo - 1 if isinstance(photo, int) and 1 <= photo <= count else position
+        if index < count and photos[index] is None:
+            photos[index] = items
+    return photos
+
+def combine_estimates(estimates: list) -> NutritionRecord:
+    """One record for a photo from its per-food estimates; a nutrient is None only if no food has it"""
+    values = {"dish": ", ".join(estimate["dish"] for estimate in estimates if estimate.get("dish")) or None}
+    for key in NUTRIENTS:
+        known = [estimate[key] for estimate in estimates if estimate.get(key) is not None]
+        values[key] = round(sum(known), 2) if known else None
+    return NutritionRecord(**values)
+
+def _format_amount(value: Optional[float], unit: str) -> str:
+    if value is None:
+        return "알 수 없음"
+    return f"{value:g}{unit}"
+
+def render_nutrition_text(record: NutritionRecord) -> str:
+    """The record in the bullet format clients of the text answer already read"""
+    return "\n".join([
+        f"- 요리명: {record.dish or '알 수 없음'}",
+        f"- 칼로리: {_format_amount(record.kcal, ' kcal')}",
+        f"- 탄수화물: {_format_amount(record.carbs, 'g')}",
+        f"- 단백질: {_format_amount(record.protein, 'g')}",
+        f"- 지방: {_format_amount(record.fat, 'g')}",
+        f"- 나트륨: {_format_amount(record.sodium, 'g')}",
+        f"- 식이섬유: {_format_amount(record.fiber, 'g')}",
+        f"- 총량: {_format_amount(record.grams, 'g')}",
+    ])
+
+def sum_nutrition(records: list) -> dict:
+    """Per-nutrient totals over records (NutritionRecord or dict), skipping unknown values"""
+    totals = {key: 0.0 for key in NUTRIENTS}
+    for record in records:
+        if isinstance(record, NutritionRecord):
+            record = record.model_dump()
+        for key in NUTRIENTS:
+            if record.get(key) is not None:
+                totals[key] += record[key]
+    return {key: round(value, 2) for key, value in totals.items()}
@@ -0,0 +1,147 @@
+import asyncio
+import contextlib
+import os
+import weakref
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+
+# Uploads larger than this are rejected (413) without reading the rest
+MEALS_MAX_UPLOAD_BYTES = int(os.getenv('MEALS_MAX_UPLOAD_BYTES', 20 * 1024 * 1024))
+# Raw upload bytes all in-flight requests of a worker may hold in memory; further requests wait
+MEALS_UPLOAD_MEMORY_BYTES = int(os.getenv('MEALS_UPLOAD_MEMORY_BYTES', 256 * 1024 * 1024))
+# Multipart boundaries, part headers and small form fields on top of the files
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class UploadTooLarge(ValueError):
+    pass
+
+_budgets = weakref.WeakKeyDictionary()
+_stats = {"rejected_early": 0, "rejected_streaming": 0, "waited": 0, "bytes_in_memory": 0, "max_bytes_in_memory": 0}
+
+def limit_uploads(files: int = 1):
+    """
+    Mark an endpoint of an UploadLimitRoute router as taking at most this many
+    files of MEALS_MAX_UPLOAD_BYTES each
+    """
+    def decorate(endpoint):
+        endpoint.max_upload_files = files
+        return endpoint
+    return decorate
+
+def max_body_bytes(files: int) -> int:
+    return files * MEALS_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+
+class UploadLimitRoute(APIRoute):
+    """
+    APIRoute that caps the raw request body of limit_uploads endpoints
+
+    A Content-Length over the cap is answered with 413 before any of the body
+    is read; a body without one (chunked) is cut off with 413 as soon as it
+    passes the cap. Either way the multipart parser never spools more than
+    the cap to disk.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        files = getattr(self.endpoint, "max_upload_files", None)
+        if files is None:
+            return handler
+
+        async def limited_handler(request: Request):
+            limit = max_body_bytes(files)
+            length = request.headers.get("content-length")
+            if length is not None:
+                if not length.isdigit():
+                    raise HTTPException(status_code=400, detail="Invalid Content-Length")
+                if int(length) > limit:
+                    _stats["rejected_early"] += 1
+                    raise HTTPException(status_code=413, detail=f"Request is {int(length):,} bytes; "
+                                                                f"the limit is {limit:,}")
+            received = 0
+            receive = request.receive
+
+            async def counted_receive():
+                nonlocal received
+                message = await receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        _stats["rejected_streaming"] += 1
+                        raise HTTPException(status_code=413, detail=f"Request exceeds the {limit:,} byte limit")
+                return message
+
+            return await handler(Request(request.scope, counted_receive))
+
+        return limited_handler
+
+class _ByteBudget:
+    """Async semaphore counted in bytes; a request larger than the whole budget waits for all of it"""
+
+    def __init__(self, total: int):
+        self.total = max(1, total)
+        self.available = self.total
+        self.condition = asyncio.Condition()
+
+    @contextlib.asynccontextmanager
+    async def hold(self, size: int):
+        size = min(max(size, 0), self.total)
+        async with self.condition:
+            if self.available < size:
+                _stats["waited"] += 1
+            await self.condition.wait_for(lambda: self.available >= size)
+            self.available -= size
+            _stats["bytes_in_memory"] += size
+            _stats["max_bytes_in_memory"] = max(_stats["max_bytes_in_memory"], _stats["bytes_in_memory"])
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.available += size
+                _stats["bytes_in_memory"] -= size
+                self.condition.notify_all()
+
+def upload_memory(size: int):
+    """
+    Async context reserving size bytes of MEALS_UPLOAD_MEMORY_BYTES while an
+    upload is held in memory (one budget per event loop)
+    """
+    loop = asyncio.get_running_loop()
+    budget = _budgets.get(loop)
+    if budget is None:
+        budget = _ByteBudget(MEALS_UPLOAD_MEMORY_BYTES)
+        _budgets[loop] = budget
+    return budget.hold(size)
+
+def upload_size(file: UploadFile) -> int:
+    """Bytes an upload will take in memory; the cap when the size is not known yet"""
+    return file.size if file.size is not None else MEALS_MAX_UPLOAD_BYTES
+
+async def read_upload(file: UploadFile, max_bytes: int = None) -> bytes:
+    """
+    Read an upload into one buffer, stopping as soon as it exceeds max_bytes
+    (MEALS_MAX_UPLOAD_BYTES by default)
+
+    Raises UploadTooLarge (a ValueError) when it does.
+    """
+    if max_bytes is None:
+        max_bytes = MEALS_MAX_UPLOAD_BYTES
+    if file.size is not None:
+        if file.size > max_bytes:
+            raise UploadTooLarge(f"Upload is {file.size:,} bytes; the limit is {max_bytes:,}")
+        # Size known (the parser spooled the part): a single read, no chunk list to join
+        return await file.read(file.size)
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {max_bytes:,} byte limit")
+        buffer += chunk
+    return bytes(buffer)
+
+def upload_stats() -> dict:
+    return dict(_stats, memory_limit=MEALS_UPLOAD_MEMORY_BYTES, max_upload_bytes=MEALS_MAX_UPLOAD_BYTES)
@@ -0,0 +1,83 @@
+import asyncio
+import binascii
+import os
+import weakref
+
+import openai
+
+from .image_preprocess import get_preprocess_executor
+
+# Structured outputs (json_schema) need a model that supports them, such as gpt-4o
+MEALS_VISION_MODEL = os.getenv('MEALS_VISION_MODEL', 'gpt-4o')
+# 1: answers are JSON records validated against a schema; 0: the "- 요리명:" bullet text
+MEALS_STRUCTURED_OUTPUT = os.getenv('MEALS_STRUCTURED_OUTPUT', '1') not in ('0', 'false', 'False')
+# Vision-model calls in flight at once per worker; further requests wait for a slot
+MEALS_MAX_CONCURRENT_ANALYSES = int(os.getenv('MEALS_MAX_CONCURRENT_ANALYSES', 8))
+# Input bytes per base64 step; a multiple of 3 so the pieces join without padding
+BASE64_CHUNK_SIZE = 3 * 256 * 1024
+
+# One AsyncOpenAI client and one limiter per event loop (neither can move between loops)
+_clients = weakref.WeakKeyDictionary()
+_limiters = weakref.WeakKeyDictionary()
+_stats = {"calls": 0, "in_flight": 0, "max_in_flight": 0, "waited": 0, "completion_tokens": 0}
+
+def get_vision_client() -> openai.AsyncOpenAI:
+    """Shared async OpenAI client for the running event loop (honours OPENAI_BASE_URL)"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        _clients[loop] = client
+    return client
+
+def _get_limiter() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(max(1, MEALS_MAX_CONCURRENT_ANALYSES))
+        _limiters[loop] = limiter
+    return limiter
+
+def build_data_url(data: bytes, mime_type: str) -> str:
+    """
+    "data:<mime>;base64,..." built in one preallocated buffer: the data is
+    encoded piece by piece straight into it and decoded to str once
+    """
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+    buffer = bytearray(len(prefix) + 4 * ((len(data) + 2) // 3))
+    buffer[:len(prefix)] = prefix
+    position = len(prefix)
+    view = memoryview(data)
+    for start in range(0, len(data), BASE64_CHUNK_SIZE):
+        encoded = binascii.b2a_base64(view[start:start + BASE64_CHUNK_SIZE], newline=False)
+        buffer[position:position + len(encoded)] = encoded
+        position += len(encoded)
+    return buffer.decode("ascii")
+
+async def encode_data_url(data: bytes, mime_type: str) -> str:
+    """Base64 data URL for the model, encoded on the image executor instead of the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_preprocess_executor(), build_data_url, data, mime_type)
+
+async def create_completion(**request) -> str:
+    """
+    chat.completions.create on the async client, at most
+    MEALS_MAX_CONCURRENT_ANALYSES at a time; returns the message text
+    """
+    limiter = _get_limiter()
+    if limiter.locked():
+        _stats["waited"] += 1
+    async with limiter:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+        _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+        try:
+            response = await get_vision_client().chat.completions.create(**request)
+        finally:
+            _stats["in_flight"] -= 1
+    if response.usage is not None:
+        _stats["completion_tokens"] += response.usage.completion_tokens
+    return response.choices[0].message.content
+
+def vision_stats() -> dict:
+    return dict(_stats, limit=MEALS_MAX_CONCURRENT_ANALYSES)
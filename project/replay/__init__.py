@@ -0,0 +1 @@
+# Offline replay harness: local stand-ins for kjcn.or.kr and the OpenAI API
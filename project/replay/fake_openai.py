@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+
+FAKE_MEAL_ANSWER = """- 요리명: 비빔밥
+- 칼로리: 550 kcal
+- 탄수화물: 80g
+- 단백질: 20g
+- 지방: 15g
+- 나트륨: 1,200mg
+- 식이섬유: 6g
+- 총량: 1인분, 450g"""
+FAKE_MEAL_RECORD = {"dish": "비빔밥", "kcal": 550, "carbs": 80, "protein": 20, "fat": 15,
+                    "sodium": 1.2, "fiber": 6, "grams": 450}
+FAKE_MEAL_PORTIONS = [{"dish": "비빔밥", "grams": 400}, {"dish": "배추김치", "grams": 40}]
+
+
+def create_fake_openai_app(latency: float = 0.5, jitter: float = 0.0) -> FastAPI:
+    """
+    Fake chat-completions server
+
+    Every call sleeps `latency` seconds (plus up to `jitter` random seconds)
+    before answering, so benchmarks see realistic round trips without paying
+    for them. The reply is a short deterministic text derived from the prompt;
+    requests with images get one "### 사진 N" nutrition block per image, or
+    the matching JSON when they ask for a json_schema response_format.
+    Point the openai client at it with OPENAI_BASE_URL=<server url>/v1.
+    """
+    app = FastAPI(title="Fake OpenAI")
+    app.state.calls = 0
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+    app.state.max_request_bytes = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        raw = await request.body()
+        body = json.loads(raw)
+        app.state.calls += 1
+        app.state.max_request_bytes = max(app.state.max_request_bytes, len(raw))
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            await asyncio.sleep(latency + random.uniform(0, jitter))
+        finally:
+            app.state.in_flight -= 1
+
+        prompt = body["messages"][-1]["content"]
+        images = 0
+        if isinstance(prompt, list):
+            images = sum(1 for part in prompt if part.get("type") == "image_url")
+            prompt = " ".join(part.get("text", "") for part in prompt if part.get("type") == "text")
+        schema = body.get("response_format", {}).get("json_schema", {}).get("schema", {})
+        properties = schema.get("properties", {})
+        if images and "meals" in properties:
+            # Per-photo records, or dish/portion lists when only those are asked for
+            per_photo = ({"items": FAKE_MEAL_PORTIONS} if "items" in properties["meals"]["items"]["properties"]
+                         else FAKE_MEAL_RECORD)
+            content = json.dumps({"meals": [dict(per_photo, photo=number) for number in range(1, images + 1)]},
+                                 ensure_ascii=False)
+        elif images and "items" in properties:
+            content = json.dumps({"items": FAKE_MEAL_PORTIONS}, ensure_ascii=False)
+        elif images and schema:
+            content = json.dumps(FAKE_MEAL_RECORD, ensure_ascii=False)
+        elif images:
+            content = "\n\n".join(f"### 사진 {number}\n{FAKE_MEAL_ANSWER}" for number in range(1, images + 1))
+        else:
+            content = f"요약: {prompt.strip()[:60]}"
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4
+            }
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            "calls": app.state.calls,
+            "max_in_flight": app.state.max_in_flight,
+            "max_request_bytes": app.state.max_request_bytes,
+        }
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        app.state.calls = 0
+        app.state.max_in_flight = 0
+        app.state.max_request_bytes = 0
+        return {"status": "reset"}
+
+    return app
+
+
+@contextlib.contextmanager
+def openai_env(base_url: str):
+    """Point OpenAI clients created inside the block at base_url, restoring the environment afterwards"""
+    saved = {key: os.environ.get(key) for key in ("OPENAI_BASE_URL", "OPENAI_API_KEY")}
+    os.environ.update(OPENAI_BASE_URL=base_url, OPENAI_API_KEY="test")
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
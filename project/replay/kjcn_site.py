@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "kjcn"
+
+
+def load_article_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> dict:
+    """Map article number -> recorded page HTML for every <number>.html fixture"""
+    pages = {}
+    for path in sorted(fixtures_dir.glob("*.html")):
+        if path.stem.isdigit():
+            pages[int(path.stem)] = path.read_text(encoding="utf-8")
+    return pages
+
+
+def create_kjcn_app(fixtures_dir: Path = FIXTURES_DIR, max_number: Optional[int] = None) -> FastAPI:
+    """
+    Local stand-in for kjcn.or.kr serving recorded article pages
+
+    Args:
+        fixtures_dir: Directory of recorded <number>.html pages
+        max_number: When set, every number from the first fixture up to
+            max_number is served by cycling through the valid fixtures, so a
+            handful of recordings can stand in for a long article range
+
+    Pages that are recorded but have no article (e.g. 9999.html) are served
+    as-is; any other number returns 404, which ends find_new_articles' probe.
+    """
+    pages = load_article_fixtures(fixtures_dir)
+    article_pages = [html for html in pages.values() if "articleCon" in html]
+    first_number = min(pages) if pages else 0
+
+    app = FastAPI(title="KJCN replay")
+    app.state.requests_served = 0
+
+    @app.get("/journal/view.php")
+    async def view_article(number: int):
+        app.state.requests_served += 1
+        if number in pages:
+            return HTMLResponse(pages[number])
+        if max_number is not None and article_pages and first_number <= number <= max_number:
+            return HTMLResponse(article_pages[(number - first_number) % len(article_pages)])
+        return HTMLResponse("<html><body>Not Found</body></html>", status_code=404)
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests_served": app.state.requests_served, "fixtures": sorted(pages)}
+
+    return app
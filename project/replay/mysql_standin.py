@@ -0,0 +1,224 @@
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from .server import find_free_port
+
+# Test and benchmark dependency (requirements-dev.txt): pip install mysql-mimic (pulls in sqlglot)
+try:
+    from mysql_mimic import IdentityProvider, MysqlServer, NativePasswordAuthPlugin, Session, User
+    from sqlglot import exp
+    MYSQL_STANDIN_AVAILABLE = True
+except ImportError:
+    IdentityProvider = Session = object
+    MYSQL_STANDIN_AVAILABLE = False
+
+STANDIN_DATABASE = "harukcal2"
+STANDIN_USER = "anra1"
+STANDIN_PASSWORD = "standin"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS member (
+    id INTEGER PRIMARY KEY,
+    email TEXT,
+    nickname TEXT,
+    role TEXT
+);
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    reference TEXT COLLATE NOCASE,  -- MySQL's default collations compare case-insensitively
+    created_at TEXT,
+    updated_at TEXT,
+    role TEXT,
+    admin_id INTEGER
+);
+"""
+
+
+class _StandinIdentityProvider(IdentityProvider):
+    """Accept any user name with the stand-in password"""
+
+    def get_plugins(self):
+        return [NativePasswordAuthPlugin()]
+
+    async def get_user(self, username):
+        return User(
+            name=username,
+            auth_string=NativePasswordAuthPlugin.create_auth_string(STANDIN_PASSWORD),
+            auth_plugin="mysql_native_password",
+        )
+
+
+async def _stream_rows(cursor, batch_size: int = 500):
+    # Rows are sent as they are read, so large result sets are never held in memory
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield row
+        await asyncio.sleep(0)
+
+
+class _SQLiteSession(Session):
+    def __init__(self, standin: "MySQLStandin"):
+        super().__init__()
+        self.standin = standin
+        self._write_result = None  # (affected_rows, last_insert_id) of the last write statement
+
+    async def init(self, connection):
+        await super().init(connection)
+        # Stands in for the TCP + auth round trips to a remote MySQL server
+        if self.standin.connect_latency:
+            await asyncio.sleep(self.standin.connect_latency)
+        self.standin.connections_accepted += 1
+
+        # mysql-mimic answers statements without a result set with a bare OK
+        # packet; fill in what the write did so cursor.rowcount / lastrowid work
+        send_ok = connection.ok
+
+        def ok(**kwargs):
+            if self._write_result is not None:
+                affected_rows, last_insert_id = self._write_result
+                self._write_result = None
+                kwargs.setdefault("affected_rows", affected_rows)
+                kwargs.setdefault("last_insert_id", last_insert_id)
+            return send_ok(**kwargs)
+
+        connection.ok = ok
+
+    async def query(self, expression, sql, attrs):
+        if self.standin.query_latency:
+            await asyncio.sleep(self.standin.query_latency)
+        conflict = expression.args.get("conflict") if expression.key == "insert" else None
+        if conflict is not None and conflict.args.get("duplicate"):
+            # Only no-op updates are used ("ON DUPLICATE KEY UPDATE id = id"): SQLite's DO NOTHING
+            expression.set("conflict", exp.OnConflict(action=exp.var("DO NOTHING")))
+        cursor = self.standin.db.execute(expression.sql(dialect="sqlite"))
+        self.standin.db.commit()
+        if cursor.description is None:
+            affected_rows = max(cursor.rowcount, 0)
+            # MySQL reports the first id of a multi-row insert, SQLite the last
+            last_insert_id = cursor.lastrowid - affected_rows + 1 if expression.key == "insert" and affected_rows else 0
+            self._write_result = (affected_rows, last_insert_id)
+            return [], []
+        return _stream_rows(cursor), [column[0] for column in cursor.description]
+
+    async def schema(self):
+        return {}
+
+
+class MySQLStandin:
+    """
+    Local MySQL-compatible stand-in: mysql-mimic speaks the wire protocol and
+    statements are transpiled with sqlglot to run on an in-memory SQLite copy
+    of the issues/member tables.
+
+    Meant for benchmarks and tests only: SQL that SQLite cannot run will fail.
+    connect_latency / query_latency add artificial delay per new connection
+    and per statement to mimic a remote server.
+    """
+
+    def __init__(self, port: int = None, connect_latency: float = 0.0, query_latency: float = 0.0):
+        if not MYSQL_STANDIN_AVAILABLE:
+            raise RuntimeError("mysql-mimic is not installed. Run: pip install mysql-mimic")
+
+        self.host = "127.0.0.1"
+        self.port = port or find_free_port()
+        self.connect_latency = connect_latency
+        self.query_latency = query_latency
+        self.connections_accepted = 0
+
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.create_function("NOW", 0, lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.db.executescript(SCHEMA)
+
+        self._loop = None
+        self._server = None
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def config(self) -> dict:
+        """mysql.connector settings for this stand-in"""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "database": STANDIN_DATABASE,
+            "user": STANDIN_USER,
+            "password": STANDIN_PASSWORD,
+        }
+
+    def env(self) -> dict:
+        """MYSQL_* environment variables understood by config/database.py and issue_repository.py"""
+        return {
+            "MYSQL_HOST": self.host,
+            "MYSQL_PORT": str(self.port),
+            "MYSQL_DATABASE": STANDIN_DATABASE,
+            "MYSQL_USER": STANDIN_USER,
+            "MYSQL_PASSWORD": STANDIN_PASSWORD,
+        }
+
+    def seed(self, issue_count: int, content_length: int = 800, admin_id: int = 8) -> None:
+        """Insert an admin member and issue_count synthetic issues"""
+        self.db.execute(
+            "INSERT OR REPLACE INTO member (id, email, nickname, role) VALUES (?, ?, ?, ?)",
+            (admin_id, "admin@haru.test", "관리자", "ADMIN")
+        )
+        self.db.execute(
+            "INSERT OR REPLACE INTO member (id, email, nickname, role) VALUES (?, ?, ?, ?)",
+            (admin_id + 1, "user@haru.test", "사용자", "USER")
+        )
+        start = datetime(2024, 1, 1)
+        self.db.executemany(
+            "INSERT INTO issues (title, content, reference, created_at, updated_at, role, admin_id) "
+            "VALUES (?, ?, ?, ?, ?, 'ADMIN', ?)",
+            (
+                (
+                    f"영양 연구 {i}",
+                    ("요약 내용 " * (content_length // 6 + 1))[:content_length],
+                    f"https://kjcn.or.kr/journal/view.php?number={1000 + i}",
+                    (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                    (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                    admin_id,
+                )
+                for i in range(issue_count)
+            )
+        )
+        self.db.commit()
+
+    def _run(self):
+        async def serve():
+            self._loop = asyncio.get_running_loop()
+            self._server = MysqlServer(
+                session_factory=lambda: _SQLiteSession(self),
+                identity_provider=_StandinIdentityProvider(),
+            )
+            await self._server.start_server(host=self.host, port=self.port)
+            self._started.set()
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(serve())
+
+    def start(self, timeout: float = 10.0) -> "MySQLStandin":
+        self._thread.start()
+        if not self._started.wait(timeout):
+            raise RuntimeError(f"MySQL stand-in on port {self.port} did not start")
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        self._thread.join(timeout=5.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,53 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from .kjcn_site import FIXTURES_DIR
+
+LIVE_BASE_URL = "https://kjcn.or.kr"
+
+
+def record_articles(start_number: int, end_number: int, fixtures_dir: Path = FIXTURES_DIR, delay: float = 1.0) -> list:
+    """Save live article pages as <number>.html fixtures for the replay site"""
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    recorded = []
+
+    with httpx.Client(timeout=10.0) as client:
+        for article_number in range(start_number, end_number + 1):
+            url = f"{LIVE_BASE_URL}/journal/view.php?number={article_number}"
+            try:
+                response = client.get(url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"❌ Article {article_number}: {e}")
+                continue
+
+            path = fixtures_dir / f"{article_number}.html"
+            path.write_text(response.text, encoding="utf-8")
+            recorded.append(article_number)
+            print(f"✅ Article {article_number}: saved {len(response.text)} chars to {path}")
+
+            if article_number < end_number:
+                time.sleep(delay)
+
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live KJCN article pages as replay fixtures")
+    parser.add_argument("start_number", type=int)
+    parser.add_argument("end_number", type=int)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    recorded = record_articles(args.start_number, args.end_number, args.fixtures, args.delay)
+    print(f"Recorded {len(recorded)} articles")
+    return 0 if recorded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
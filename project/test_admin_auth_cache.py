@@ -0,0 +1,100 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import time
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.services.auth_cache import AuthDecisionCache
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+def test_ttl_negative_caching_and_eviction():
+    cache = AuthDecisionCache(ttl=0.2, negative_ttl=0.05, max_entries=2)
+    assert cache.get("admin@haru.test") == (False, None)
+
+    cache.set("admin@haru.test", "ADMIN")
+    cache.set("nobody@haru.test", None)
+    assert cache.get("admin@haru.test") == (True, "ADMIN")
+    assert cache.get("nobody@haru.test") == (True, None)
+
+    # Unknown users expire sooner than real roles
+    time.sleep(0.1)
+    assert cache.get("nobody@haru.test") == (False, None)
+    assert cache.get("admin@haru.test") == (True, "ADMIN")
+
+    # Least recently used entry goes first
+    cache.set("a", "USER")
+    cache.set("b", "USER")
+    assert cache.get("admin@haru.test") == (False, None)
+
+    cache.invalidate("a")
+    assert cache.get("a") == (False, None)
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+    print(f"✅ Auth cache TTL / negative TTL / LRU / invalidation: {cache.stats()}")
+
+def test_admin_requests_skip_the_member_query():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    import httpx
+    from fastapi import FastAPI
+    from issues.crud_routes import router as crud_router
+    from issues.services import issue_repository
+    from issues.services.auth_cache import admin_auth_cache
+    from issues.services.database import close_pools, get_pool
+
+    app = FastAPI()
+    app.include_router(crud_router, prefix="/issues")
+    admin = {"Authorization": "admin@haru.test"}
+
+    async def check(standin):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            pool = get_pool(issue_repository.MYSQL_CONFIG)
+
+            # One role lookup, then only the update's own query per call
+            for _ in range(5):
+                response = await client.put("/issues/999", json={"title": "x"}, headers=admin)
+                assert response.status_code == 404
+            assert pool.stats()["checkouts"] == 1 + 5
+
+            # Unknown users are answered from the negative cache too
+            for _ in range(3):
+                response = await client.delete("/issues/1", headers={"Authorization": "ghost@haru.test"})
+                assert response.status_code == 401
+            assert pool.stats()["checkouts"] == 6 + 1
+
+            # A demoted admin keeps access until the entry expires or is invalidated
+            standin.db.execute("UPDATE member SET role = 'ADMIN' WHERE email = 'user@haru.test'")
+            standin.db.commit()
+            promoted = {"Authorization": "user@haru.test"}
+            assert (await client.put("/issues/999", json={"title": "x"}, headers=promoted)).status_code == 404
+            standin.db.execute("UPDATE member SET role = 'USER' WHERE email = 'user@haru.test'")
+            standin.db.commit()
+            assert (await client.put("/issues/999", json={"title": "x"}, headers=promoted)).status_code == 404
+
+            response = await client.post("/issues/auth-cache/invalidate",
+                                         params={"authorization_value": "user@haru.test"}, headers=admin)
+            assert response.status_code == 200
+            assert (await client.put("/issues/999", json={"title": "x"}, headers=promoted)).status_code == 403
+
+    with MySQLStandin() as standin:
+        standin.seed(3)
+        original_config = dict(issue_repository.MYSQL_CONFIG)
+        issue_repository.MYSQL_CONFIG.update(standin.config)
+        admin_auth_cache.invalidate()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(check(standin))
+        finally:
+            issue_repository.MYSQL_CONFIG.clear()
+            issue_repository.MYSQL_CONFIG.update(original_config)
+            admin_auth_cache.invalidate()
+            close_pools()
+    print(f"✅ Admin checks served from cache: {admin_auth_cache.stats()}")
+
+if __name__ == "__main__":
+    test_ttl_negative_caching_and_eviction()
+    test_admin_requests_skip_the_member_query()
@@ -0,0 +1,101 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import time
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from issues.crud_routes import router as crud_router
+from issues.services import issue_repository
+from issues.services.database import close_pools
+from issues.services.issue_cache import issue_read_cache
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+from replay.server import BackgroundServer
+
+QUERY_LATENCY = 0.1  # Per statement, mimics a remote MySQL round trip
+
+def create_test_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(crud_router, prefix="/issues")
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/blocking-issues")
+    async def blocking_issues():
+        # The old pattern: blocking mysql.connector call inside an async handler
+        return len(issue_repository._fetch_issue_page(None, 50, issue_repository.LIST_COLUMNS))
+
+    return app
+
+def p99(latencies: list) -> float:
+    latencies = sorted(latencies)
+    return latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+async def health_p99_under_load(base_url: str, load_path: str, total: int = 60, concurrency: int = 8) -> dict:
+    import httpx
+
+    # Real sockets against uvicorn, so a stalled server loop shows up in /health latency
+    limits = httpx.Limits(max_connections=concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        # Warm up the pool and the import paths
+        assert (await client.get(load_path)).status_code == 200
+
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+        health_latencies = []
+
+        async def load_request():
+            async with semaphore:
+                response = await client.get(load_path)
+                assert response.status_code == 200
+
+        async def probe_health():
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/health")
+                health_latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                await asyncio.sleep(0.005)
+
+        prober = asyncio.create_task(probe_health())
+        await asyncio.gather(*(load_request() for _ in range(total)))
+        done.set()
+        await prober
+
+    return {"health_p99_ms": p99(health_latencies) * 1000, "probes": len(health_latencies)}
+
+def test_health_stays_responsive_while_issues_hammered():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    with MySQLStandin(query_latency=QUERY_LATENCY) as standin:
+        standin.seed(20, content_length=200)
+        original_config = dict(issue_repository.MYSQL_CONFIG)
+        issue_repository.MYSQL_CONFIG.update(standin.config)
+        # Every /issues/ request must reach the database, not the read cache
+        issue_read_cache.enabled = False
+        try:
+            with BackgroundServer(create_test_app()) as server, contextlib.redirect_stdout(io.StringIO()):
+                offloaded = asyncio.run(health_p99_under_load(server.url, "/issues/"))
+                blocking = asyncio.run(health_p99_under_load(server.url, "/blocking-issues", total=20))
+        finally:
+            issue_repository.MYSQL_CONFIG.clear()
+            issue_repository.MYSQL_CONFIG.update(original_config)
+            issue_read_cache.enabled = issue_read_cache.ttl > 0
+            close_pools()
+
+    print(f"✅ /health p99 while /issues/ is hammered: {offloaded['health_p99_ms']:.1f} ms "
+          f"({offloaded['probes']} probes); with blocking handlers: {blocking['health_p99_ms']:.1f} ms")
+
+    # Blocking handlers stall the loop for at least one query round trip...
+    assert blocking["health_p99_ms"] >= QUERY_LATENCY * 1000
+    # ...while executor-backed handlers keep /health well under it
+    assert offloaded["health_p99_ms"] < QUERY_LATENCY * 1000 / 2
+
+if __name__ == "__main__":
+    test_health_stays_responsive_while_issues_hammered()
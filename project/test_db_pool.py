@@ -0,0 +1,183 @@
+import sys
+import os
+import asyncio
+import contextlib
+import threading
+import time
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mysql.connector.errors import DataError, PoolError
+from issues.services import bulk_writer, database
+from issues.services.bulk_writer import IssueBatchWriter
+from issues.services.database import ConnectionPool, close_pools, get_pool, write_issue_batch
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+def run_with_standin(check):
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+    with MySQLStandin() as standin:
+        standin.seed(3)
+        check(standin)
+
+def test_connections_are_reused():
+    def check(standin):
+        pool = ConnectionPool(standin.config, pool_size=2)
+        for _ in range(5):
+            with pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM issues")
+                assert cursor.fetchone()[0] == 3
+                cursor.close()
+        
+        assert pool.stats()["connections_opened"] == 1
+        assert pool.stats()["checkouts"] == 5
+        pool.close()
+        print(f"✅ Pool stats: {pool.stats()}")
+    run_with_standin(check)
+
+def test_checkout_waits_then_times_out():
+    def check(standin):
+        pool = ConnectionPool(standin.config, pool_size=1, timeout=0.2)
+        released = threading.Event()
+        
+        def hold_connection():
+            with pool.connection():
+                time.sleep(0.1)
+            released.set()
+        
+        holder = threading.Thread(target=hold_connection)
+        holder.start()
+        time.sleep(0.02)
+        
+        # Waits for the holder instead of failing immediately
+        with pool.connection():
+            assert released.is_set()
+        holder.join()
+        
+        with pool.connection():
+            started = time.monotonic()
+            try:
+                with pool.connection():
+                    raise AssertionError("Second checkout should not succeed")
+            except PoolError:
+                assert time.monotonic() - started >= 0.2
+        pool.close()
+        print("✅ Exhausted pool waits, then raises PoolError")
+    run_with_standin(check)
+
+def test_unpooled_mode():
+    def check(standin):
+        pool = ConnectionPool(standin.config, pool_size=0)
+        for _ in range(3):
+            with pool.connection() as conn:
+                assert conn.is_connected()
+        assert pool.stats()["connections_opened"] == 3
+        print("✅ pool_size=0 opens a connection per checkout")
+    run_with_standin(check)
+
+def test_batch_writer_outcomes():
+    def check(standin):
+        existing = "https://kjcn.or.kr/journal/view.php?number=1000"  # seeded row
+        
+        async def write():
+            async with IssueBatchWriter(batch_size=3, config=standin.config) as writer:
+                saved = [
+                    writer.add("새 기사 1", "요약", "https://kjcn.or.kr/a"),
+                    writer.add("이미 있음", "요약", existing),
+                    writer.add("새 기사 1 (재시도)", "요약", "https://kjcn.or.kr/a"),
+                    writer.add("새 기사 2", "요약", "https://kjcn.or.kr/b"),
+                ]
+            return [future.result() for future in saved], writer.batches_written
+        
+        outcomes, batches = asyncio.run(write())
+        assert outcomes == ["inserted", "duplicate", "duplicate", "inserted"]
+        assert batches == 2, batches
+        # One pooled checkout (and one commit) per batch, not per row
+        assert get_pool(standin.config).stats()["checkouts"] == 2
+        assert standin.db.execute("SELECT COUNT(*) FROM issues").fetchone()[0] == 3 + 2
+        close_pools()
+        print(f"✅ Batch writer outcomes: {outcomes}")
+    run_with_standin(check)
+
+class ScriptedCursor:
+    """Answers write_issue_batch's statements as MySQL would for the scripted references"""
+
+    def __init__(self, log: list):
+        self.log = log
+        self.rowcount = self.warning_count = self.lastrowid = 0
+
+    def execute(self, query, params=()):
+        self.log.append(query.split()[0])
+        self.rowcount = self.warning_count = 0
+        if query.startswith("INSERT") and len(params) > 5:
+            self.rowcount = len(params) // 5 - 1  # "raced" was stored by another writer meanwhile
+        elif query.startswith("INSERT"):
+            reference = params[2]
+            if reference == "too-long":
+                raise DataError(msg="Data too long for column 'reference'", errno=1406)
+            self.rowcount = 0 if reference == "raced" else 1
+            self.warning_count = 1 if reference == "warns" else 0
+            self.lastrowid = 99
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+class ScriptedConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return ScriptedCursor(self.log)
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+def test_batch_outcomes_are_read_per_row(monkeypatch):
+    connection = ScriptedConnection()
+    monkeypatch.setattr(database, "db_connection", lambda config=None: contextlib.nullcontext(connection))
+    rows = [("t", "c", reference, "ADMIN") for reference in ("new", "raced", "too-long", "warns", "new")]
+    
+    outcomes = write_issue_batch(rows)
+    # The multi-row insert affected fewer rows than sent: rolled back, then one statement per row
+    assert connection.log == ["SELECT", "INSERT", "ROLLBACK", "INSERT", "INSERT", "INSERT", "INSERT", "DELETE", "COMMIT"]
+    assert outcomes == ["inserted", "duplicate", "error", "error", "duplicate"]
+    print(f"✅ Per-row outcomes after a short multi-row insert: {outcomes}")
+
+def test_batch_writer_writes_one_batch_at_a_time(monkeypatch):
+    active = {"now": 0, "max": 0}
+    
+    def write_batch(rows, config=None):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        active["now"] -= 1
+        return ["inserted"] * len(rows)
+    
+    monkeypatch.setattr(bulk_writer, "write_issue_batch", write_batch)
+    
+    async def write():
+        async with IssueBatchWriter(batch_size=2) as writer:
+            saved = [writer.add("t", "c", f"https://kjcn.or.kr/{i}") for i in range(10)]
+        return [future.result() for future in saved], writer.batches_written
+    
+    outcomes, batches = asyncio.run(write())
+    assert outcomes == ["inserted"] * 10 and batches == 5
+    assert active["max"] == 1
+    print("✅ A writer's background batches never overlap")
+
+if __name__ == "__main__":
+    test_connections_are_reused()
+    test_checkout_waits_then_times_out()
+    test_unpooled_mode()
+    test_batch_writer_outcomes()
+    with pytest.MonkeyPatch.context() as patch:
+        test_batch_outcomes_are_read_per_row(patch)
+    with pytest.MonkeyPatch.context() as patch:
+        test_batch_writer_writes_one_batch_at_a_time(patch)
@@ -0,0 +1,122 @@
+import sys
+import os
+import contextlib
+import io
+import tempfile
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import delete_db_rows
+from delete_db_rows import delete_all_rows, delete_rows_in_chunks, read_values, render_progress, run_batch
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+def test_read_values_and_progress_bar():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "ids.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# ids to drop\n3\n\n1\n3\n 2 \n")
+        assert read_values(path, as_ids=True) == [3, 1, 2]
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("abc\n")
+        try:
+            read_values(path, as_ids=True)
+            assert False, "non-numeric id accepted"
+        except ValueError as e:
+            assert ":7:" in str(e)
+
+    assert render_progress(5, 20, width=10) == "[##........] 5/20 (25%)"
+    assert render_progress(0, 0, width=4) == "[####] 0/0 (100%)"
+    print("✅ Value files parsed, progress bar rendered")
+
+def test_chunked_deletes_share_one_connection():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    from config.database import MYSQL_CONFIG
+    from issues.services.database import close_pools, get_pool
+
+    with MySQLStandin() as standin:
+        standin.seed(300, content_length=20)
+        original_config = dict(MYSQL_CONFIG)
+        MYSQL_CONFIG.update(standin.config)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                ids = list(range(1, 121)) + [9001, 9002]
+                dry_run = delete_rows_in_chunks("id", ids, chunk_size=50, dry_run=True)
+                assert standin.db.execute("SELECT COUNT(*) FROM issues").fetchone()[0] == 300
+
+                pool = get_pool()
+                checkouts = pool.stats()["checkouts"]
+                deleted = delete_rows_in_chunks("id", ids, chunk_size=50, throttle=0.01)
+                assert pool.stats()["checkouts"] == checkouts + 1
+
+                references = [f"https://kjcn.or.kr/journal/view.php?number={1000 + i}" for i in range(150, 160)]
+                by_reference = delete_rows_in_chunks("reference", references, chunk_size=4)
+
+                everything_dry = delete_all_rows(chunk_size=64, dry_run=True)
+                everything = delete_all_rows(chunk_size=64)
+        finally:
+            MYSQL_CONFIG.clear()
+            MYSQL_CONFIG.update(original_config)
+            close_pools()
+        remaining = standin.db.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+
+    assert dry_run["matched"] == 120 and dry_run["deleted"] == 0 and dry_run["missing"] == [9001, 9002]
+    assert deleted["deleted"] == 120 and deleted["chunks"] == 3
+    assert by_reference["deleted"] == 10 and by_reference["chunks"] == 3
+    assert everything_dry["matched"] == 170 and everything_dry["deleted"] == 0
+    assert everything["deleted"] == 170 and everything["chunks"] == 3  # 64 + 64 + 42
+    assert remaining == 0
+    print(f"✅ Chunked deletes on one connection: {deleted['deleted']} by id, "
+          f"{by_reference['deleted']} by reference, {everything['deleted']} in delete-all")
+
+def test_missing_references_follow_the_column_collation():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    from config.database import MYSQL_CONFIG
+    from issues.services.database import close_pools
+
+    with MySQLStandin() as standin:
+        standin.seed(5, content_length=20)
+        original_config = dict(MYSQL_CONFIG)
+        MYSQL_CONFIG.update(standin.config)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                # The database matches these regardless of case; only the unknown one is missing
+                references = ["HTTPS://KJCN.OR.KR/journal/view.php?number=1001",
+                              "https://kjcn.or.kr/JOURNAL/view.php?number=1002",
+                              "https://kjcn.or.kr/journal/view.php?number=9999"]
+                stats = delete_rows_in_chunks("reference", references, chunk_size=2)
+        finally:
+            MYSQL_CONFIG.clear()
+            MYSQL_CONFIG.update(original_config)
+            close_pools()
+        remaining = standin.db.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+
+    assert stats["matched"] == 2 and stats["deleted"] == 2 and remaining == 3
+    assert stats["missing"] == ["https://kjcn.or.kr/journal/view.php?number=9999"]
+    print("✅ Missing references are decided by the database's collation")
+
+def test_failed_delete_all_exits_with_an_error(monkeypatch):
+    from mysql.connector import Error
+
+    @contextlib.contextmanager
+    def unreachable_database(config=None):
+        raise Error(msg="Can't connect to MySQL server", errno=2003)
+        yield
+
+    monkeypatch.setattr(delete_db_rows, "db_connection", unreachable_database)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        assert run_batch(["--all", "--yes"]) == 1
+    assert "Error deleting rows" in output.getvalue() and "Deleted 0" not in output.getvalue()
+    print("✅ A failed --all run reports the error and exits 1")
+
+if __name__ == "__main__":
+    test_read_values_and_progress_bar()
+    test_chunked_deletes_share_one_connection()
+    test_missing_references_follow_the_column_collation()
+    with pytest.MonkeyPatch.context() as patch:
+        test_failed_delete_all_exits_with_an_error(patch)
@@ -0,0 +1,183 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import threading
+import time
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.services.issue_cache import IssueReadCache, MemoryBackend, etag_matches, render_entry
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+def test_versioned_entries_ttl_and_lru():
+    cache = IssueReadCache(MemoryBackend(max_entries=2), ttl=0.1)
+    entry = render_entry({"id": 1, "title": "비빔밥"})
+    assert entry["body"] == '{"id":1,"title":"비빔밥"}'.encode("utf-8")
+    assert etag_matches(entry["etag"], entry["etag"])
+    assert etag_matches(f'"other", W/{entry["etag"]}', entry["etag"])
+    assert not etag_matches('"other"', entry["etag"])
+    # Headers are part of the ETag (X-Total-Count changes with the table)
+    assert render_entry([], {"X-Total-Count": "1"})["etag"] != render_entry([], {"X-Total-Count": "2"})["etag"]
+
+    version = cache.version()
+    cache.set("issue:1", entry, version)
+    assert cache.get("issue:1") == (True, entry)
+
+    # A response loaded before a write is not stored after it
+    stale_version = cache.version()
+    cache.invalidate_issue(1)
+    cache.set("issue:1", entry, stale_version)
+    assert cache.get("issue:1") == (False, None)
+
+    # Page keys move with the version, so every page goes stale at once
+    assert cache.page_key(None, 50, ["id"], version) != cache.page_key(None, 50, ["id"], cache.version())
+
+    counted = []
+    cache.add_listener(lambda: counted.append(1))
+    cache.invalidate_lists()
+    assert counted == [1]
+
+    for issue_id in (1, 2, 3):
+        cache.set(f"issue:{issue_id}", entry, cache.version())
+    assert cache.get("issue:1") == (False, None)
+    time.sleep(0.15)
+    assert cache.get("issue:3") == (False, None)
+    print(f"✅ Read cache versioning / TTL / LRU: {cache.stats()}")
+
+class SlowBackend(MemoryBackend):
+    """A MemoryBackend with a network round trip per call, like RedisBackend"""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def counter(self, name: str) -> int:
+        self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return super().counter(name)
+
+    def get(self, key: str):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return super().get(key)
+
+def test_blocking_backend_stays_off_the_event_loop():
+    backend = SlowBackend()
+    cache = IssueReadCache(backend, ttl=60)
+    entry = render_entry({"id": 1})
+
+    async def read_and_write():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.ensure_future(tick())
+        await cache.set_async("issue:1", entry, await cache.version_async())
+        found = await cache.get_async("issue:1")
+        ticker.cancel()
+        return found, ticks
+
+    found, ticks = asyncio.run(read_and_write())
+    assert found == (True, entry)
+    assert threading.get_ident() not in backend.threads
+    # The loop kept running while the backend was waited on
+    assert ticks >= 5, ticks
+    print(f"✅ Blocking cache backend called from worker threads ({ticks} loop ticks meanwhile)")
+
+def test_reads_served_from_cache_until_a_write():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    import httpx
+    from config.database import MYSQL_CONFIG
+    from fastapi import FastAPI
+    from issues.crud_routes import router as crud_router
+    from issues.services import issue_repository
+    from issues.services.database import close_pools, get_pool, run_db, write_issue_batch
+    from issues.services.issue_cache import issue_read_cache
+    # The crawler modules build an OpenAI client at import time; no request is made here
+    os.environ.setdefault("OPENAI_API_KEY", "unused")
+    from issues.services.scheduled_crawler import ScheduledCrawler
+
+    app = FastAPI()
+    app.include_router(crud_router, prefix="/issues")
+    admin = {"Authorization": "admin@haru.test"}
+
+    async def check(standin):
+        pool = get_pool(issue_repository.MYSQL_CONFIG)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/issues/3")
+            assert first.status_code == 200
+            etag = first.headers["ETag"]
+            checkouts = pool.stats()["checkouts"]
+
+            # Repeat reads (plain or conditional) never touch MySQL
+            again = await client.get("/issues/3")
+            assert again.content == first.content and again.headers["ETag"] == etag
+            not_modified = await client.get("/issues/3", headers={"If-None-Match": etag})
+            assert not_modified.status_code == 304 and not_modified.content == b""
+            page = await client.get("/issues/", params={"limit": 10})
+            page_etag = page.headers["ETag"]
+            assert (await client.get("/issues/", params={"limit": 10})).json() == page.json()
+            assert pool.stats()["checkouts"] == checkouts + 2  # page + count, once
+
+            # update_issue: the issue and every list page are reloaded
+            response = await client.put("/issues/3", json={"title": "수정된 제목"}, headers=admin)
+            assert response.status_code == 200
+            updated = await client.get("/issues/3", headers={"If-None-Match": etag})
+            assert updated.status_code == 200 and updated.json()["title"] == "수정된 제목"
+            assert updated.headers["ETag"] != etag
+            response = await client.get("/issues/", params={"limit": 10}, headers={"If-None-Match": page_etag})
+            assert response.status_code == 200
+
+            # create_issue and crawler inserts (write_issue_batch / save_content_to_db)
+            page_etag = response.headers["ETag"]
+            await client.post("/issues/", json={"title": "새 글", "content": "본문", "writer": "관리자"}, headers=admin)
+            response = await client.get("/issues/", params={"limit": 10}, headers={"If-None-Match": page_etag})
+            assert response.status_code == 200 and response.headers["X-Total-Count"] == "11"
+
+            page_etag = response.headers["ETag"]
+            await run_db(write_issue_batch, [("크롤링", "본문", "https://kjcn.or.kr/journal/view.php?number=9001", "ADMIN")])
+            response = await client.get("/issues/", params={"limit": 10}, headers={"If-None-Match": page_etag})
+            assert response.status_code == 200 and response.headers["X-Total-Count"] == "12"
+
+            # delete_issue
+            await client.get("/issues/4")
+            assert (await client.delete("/issues/4", headers=admin)).status_code == 200
+            assert (await client.get("/issues/4")).status_code == 404
+
+            # cleanup_oldest_articles drops the deleted issues (the oldest seeded ones)
+            assert (await client.get("/issues/1")).status_code == 200
+            cleanup = await ScheduledCrawler(config_file=os.devnull).cleanup_oldest_articles(2)
+            assert cleanup["status"] == "completed"
+            assert (await client.get("/issues/1")).status_code == 404
+
+    with MySQLStandin() as standin:
+        standin.seed(10)
+        original_configs = [(config, dict(config)) for config in (issue_repository.MYSQL_CONFIG, MYSQL_CONFIG)]
+        for config, _ in original_configs:
+            config.update(standin.config)
+        issue_read_cache.invalidate()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(check(standin))
+        finally:
+            for config, original in original_configs:
+                config.clear()
+                config.update(original)
+            issue_read_cache.invalidate()
+            close_pools()
+    print(f"✅ Issue reads served from cache, invalidated by every write: {issue_read_cache.stats()}")
+
+if __name__ == "__main__":
+    test_versioned_entries_ttl_and_lru()
+    test_blocking_backend_stays_off_the_event_loop()
+    test_reads_served_from_cache_until_a_write()
@@ -0,0 +1,135 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import json
+import subprocess
+import time
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+from replay.server import find_free_port
+
+# Overridable for quick local runs; the acceptance check is 1M rows
+EXPORT_TEST_ROWS = int(os.getenv("EXPORT_TEST_ROWS", 1_000_000))
+# Peak RSS allowed for the API process while it streams every row
+EXPORT_RSS_CEILING_MB = 128
+
+def create_test_app():
+    from fastapi import FastAPI
+    from issues.crud_routes import router as crud_router
+
+    app = FastAPI()
+    app.include_router(crud_router, prefix="/issues")
+    return app
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not reported")
+
+def test_export_formats():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    import httpx
+    from issues.services import issue_repository
+    from issues.services.database import close_pools
+
+    async def check():
+        app = create_test_app()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/issues/export")
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            rows = [json.loads(line) for line in response.text.splitlines()]
+            assert [row["id"] for row in rows] == list(range(25, 0, -1))
+            assert rows[0]["writer"] == "관리자"
+
+            response = await client.get("/issues/export", params={"format": "json", "fields": "title"})
+            assert response.status_code == 200, response.text
+            rows = response.json()
+            assert len(rows) == 25
+            assert set(rows[0]) == {"id", "title"}
+
+            # httpx decodes Content-Encoding: gzip transparently
+            response = await client.get("/issues/export", params={"format": "json", "gzip": "true"})
+            assert response.status_code == 200, response.text
+            assert response.headers["content-encoding"] == "gzip"
+            assert len(response.json()) == 25
+
+    with MySQLStandin() as standin:
+        standin.seed(25)
+        original_config = dict(issue_repository.MYSQL_CONFIG)
+        issue_repository.MYSQL_CONFIG.update(standin.config)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(check())
+        finally:
+            issue_repository.MYSQL_CONFIG.clear()
+            issue_repository.MYSQL_CONFIG.update(original_config)
+            close_pools()
+    print("✅ NDJSON, JSON array and gzip exports match the table")
+
+def test_export_memory_is_flat():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    import httpx
+
+    with MySQLStandin() as standin:
+        standin.seed(EXPORT_TEST_ROWS, content_length=120)
+
+        # The API runs in its own process so its RSS is not mixed with the stand-in's data
+        port = find_free_port()
+        env = dict(os.environ, **standin.env())
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", str(port)],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    httpx.get(f"{base_url}/docs")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("Export test server did not start")
+                    time.sleep(0.1)
+            baseline_mb = peak_rss_mb(server.pid)
+
+            rows = 0
+            started = time.perf_counter()
+            with httpx.stream("GET", f"{base_url}/issues/export", timeout=None) as response:
+                assert response.status_code == 200
+                for line in response.iter_lines():
+                    if line:
+                        rows += 1
+            elapsed = time.perf_counter() - started
+            peak_mb = peak_rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print(f"✅ Exported {rows:,} rows in {elapsed:.1f}s; API peak RSS {peak_mb:.0f} MB "
+          f"(idle {baseline_mb:.0f} MB, ceiling {EXPORT_RSS_CEILING_MB} MB)")
+    assert rows == EXPORT_TEST_ROWS
+    assert peak_mb < EXPORT_RSS_CEILING_MB
+
+def serve(port: int):
+    """Child process for test_export_memory_is_flat (MYSQL_* env points at the stand-in)"""
+    import uvicorn
+    uvicorn.run(create_test_app(), host="127.0.0.1", port=port, log_level="warning")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--serve":
+        serve(int(sys.argv[2]))
+    else:
+        test_export_formats()
+        test_export_memory_is_flat()
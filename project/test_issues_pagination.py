@@ -0,0 +1,116 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from issues.crud_routes import router as crud_router
+from issues.services import issue_repository
+from issues.services.database import close_pools
+from issues.services.issue_cache import issue_read_cache
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+def run_against_standin(check, issue_count: int = 20):
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    import httpx
+
+    app = FastAPI()
+    app.include_router(crud_router, prefix="/issues")
+
+    async def run(standin):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await check(client, standin)
+
+    with MySQLStandin() as standin:
+        standin.seed(issue_count)
+        original_config = dict(issue_repository.MYSQL_CONFIG)
+        issue_repository.MYSQL_CONFIG.update(standin.config)
+        issue_read_cache.invalidate()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(run(standin))
+        finally:
+            issue_repository.MYSQL_CONFIG.clear()
+            issue_repository.MYSQL_CONFIG.update(original_config)
+            issue_read_cache.invalidate()
+            close_pools()
+
+def test_keyset_pages_cover_all_issues_once():
+    async def check(client, standin):
+        seen = []
+        after_id = None
+        pages = 0
+        while True:
+            params = {"limit": 7}
+            if after_id is not None:
+                params["after_id"] = after_id
+            response = await client.get("/issues/", params=params)
+            assert response.status_code == 200
+            assert response.headers["X-Total-Count"] == "20"
+            seen.extend(issue["id"] for issue in response.json())
+            pages += 1
+            after_id = response.headers.get("X-Next-After-Id")
+            if after_id is None:
+                break
+
+        assert pages == 3
+        assert seen == list(range(20, 0, -1))
+    run_against_standin(check)
+    print("✅ Keyset pages cover every issue exactly once, newest first")
+
+def test_unpaged_request_returns_every_issue():
+    async def check(client, standin):
+        # Clients from before paging call GET /issues/ bare and expect the whole list
+        response = await client.get("/issues/")
+        assert response.status_code == 200
+        assert [issue["id"] for issue in response.json()] == list(range(60, 0, -1))
+        assert "X-Next-After-Id" not in response.headers
+
+        # A cursor without a limit pages by the default size
+        page = (await client.get("/issues/", params={"after_id": 60})).json()
+        assert [issue["id"] for issue in page] == list(range(59, 9, -1))
+    run_against_standin(check, issue_count=60)
+    print("✅ GET /issues/ without limit or after_id still returns every issue")
+
+def test_fields_projection_leaves_out_content():
+    async def check(client, standin):
+        response = await client.get("/issues/", params={"fields": "title,date", "limit": 3})
+        assert response.status_code == 200
+        for issue in response.json():
+            assert set(issue) == {"id", "title", "date"}
+
+        full = (await client.get("/issues/", params={"limit": 1})).json()[0]
+        assert set(full) == {"id", "title", "content", "writer", "reference", "date"}
+        assert full["writer"] == "관리자"
+
+        response = await client.get("/issues/", params={"fields": "title,password"})
+        assert response.status_code == 400
+    run_against_standin(check)
+    print("✅ fields= projection drops content; unknown fields are rejected")
+
+def test_total_count_is_cached_until_invalidated():
+    async def check(client, standin):
+        assert (await client.get("/issues/")).headers["X-Total-Count"] == "5"
+
+        # Rows written behind the API's back are not counted until the TTL or a CRUD write
+        standin.db.execute("DELETE FROM issues WHERE id = 1")
+        standin.db.commit()
+        assert (await client.get("/issues/")).headers["X-Total-Count"] == "5"
+        assert (await client.get("/issues/", params={"limit": 10})).headers["X-Total-Count"] == "5"
+
+        response = await client.delete("/issues/2", headers={"Authorization": "admin@haru.test"})
+        assert response.status_code == 200
+        assert (await client.get("/issues/")).headers["X-Total-Count"] == "3"
+    run_against_standin(check, issue_count=5)
+    print("✅ X-Total-Count served from the cached counter, refreshed by CRUD writes")
+
+if __name__ == "__main__":
+    test_keyset_pages_cover_all_issues_once()
+    test_unpaged_request_returns_every_issue()
+    test_fields_projection_leaves_out_content()
+    test_total_count_is_cached_until_invalidated()
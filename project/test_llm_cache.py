@@ -0,0 +1,91 @@
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.utils.llm_cache import LLMCache, make_cache_key
+
+def make_cache(tmp_dir: str, **kwargs) -> LLMCache:
+    return LLMCache(Path(tmp_dir) / "llm_cache.sqlite3", **kwargs)
+
+def test_hit_miss_and_persistence():
+    print("=== Testing LLM Cache ===")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir)
+        assert cache.get("gpt-3.5-turbo", "summarize_text:v1", ("본문",)) is None
+        cache.set("gpt-3.5-turbo", "summarize_text:v1", ("본문",), "요약")
+        assert cache.get("gpt-3.5-turbo", "summarize_text:v1", ("본문",)) == "요약"
+        
+        # Model and template version are part of the key
+        assert cache.get("gpt-4", "summarize_text:v1", ("본문",)) is None
+        assert cache.get("gpt-3.5-turbo", "summarize_text:v2", ("본문",)) is None
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 3 and stats["entries"] == 1
+        print(f"✅ Stats: {stats}")
+        
+        # A new process sees the same entries
+        reopened = make_cache(tmp_dir)
+        assert reopened.get("gpt-3.5-turbo", "summarize_text:v1", ("본문",)) == "요약"
+
+def test_ttl_expiry():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir, ttl_seconds=0.05)
+        cache.set("m", "t:v1", ("a",), "value")
+        time.sleep(0.1)
+        assert cache.get("m", "t:v1", ("a",)) is None
+        assert cache.stats()["entries"] == 0
+        print("✅ Expired entries are dropped")
+
+def test_size_eviction_keeps_recent():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir, max_entries=3)
+        for i in range(5):
+            cache.set("m", "t:v1", (i,), f"value {i}")
+            time.sleep(0.01)
+        cache.get("m", "t:v1", (0,))  # Touch the oldest entry
+        
+        assert cache.evict() == 2
+        assert cache.get("m", "t:v1", (0,)) == "value 0"
+        assert cache.get("m", "t:v1", (1,)) is None
+        assert cache.get("m", "t:v1", (4,)) == "value 4"
+        print("✅ Least recently used entries evicted")
+
+def test_hits_do_not_write():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir)
+        asyncio.run(cache.set_async("m", "t:v1", ("a",), "value"))
+        path = Path(tmp_dir) / "llm_cache.sqlite3"
+        changes = cache._get_connection().total_changes
+        
+        async def read_many():
+            return [await cache.get_async("m", "t:v1", ("a",)) for _ in range(10)]
+        
+        assert asyncio.run(read_many()) == ["value"] * 10
+        # Recency is held in memory until the next write
+        assert cache._get_connection().total_changes == changes
+        cache.set("m", "t:v1", ("b",), "other")
+        last_access = sqlite3.connect(path).execute("SELECT last_access, created_at FROM llm_cache WHERE key = ?",
+                                                     (make_cache_key("m", "t:v1", "a"),)).fetchone()
+        assert last_access[0] > last_access[1]
+        print("✅ Cache hits only read; last_access is written with the next write")
+
+def test_disabled_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir, enabled=False)
+        cache.set("m", "t:v1", ("a",), "value")
+        assert cache.get("m", "t:v1", ("a",)) is None
+        assert not (Path(tmp_dir) / "llm_cache.sqlite3").exists()
+        assert make_cache_key("m", "t:v1", "a") != make_cache_key("m", "t:v1", "a", "")
+
+if __name__ == "__main__":
+    test_hit_miss_and_persistence()
+    test_ttl_expiry()
+    test_size_eviction_keeps_recent()
+    test_hits_do_not_write()
+    test_disabled_cache()
+    print("\n🎉 All LLM cache tests passed!")
@@ -0,0 +1,105 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from PIL import Image, ImageDraw
+
+from meals.services.batch import estimate_image_tokens, pack_images, split_sections
+from meals.services.nutrition import parse_nutrition_text, sum_nutrition
+
+LATENCY = 0.5
+
+def make_photo(seed: int, size=(1600, 1200)) -> bytes:
+    """A plate-like scene that differs per seed, so no two photos share a cache entry"""
+    rng = np.random.default_rng(seed)
+    image = Image.new("RGB", size, (230, 225, 215))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.integers(0, size[0]), rng.integers(0, size[1])
+        radius = int(rng.integers(size[1] // 10, size[1] // 3))
+        draw.ellipse([x - radius, y - radius, x + radius, y + radius],
+                     fill=tuple(int(c) for c in rng.integers(0, 255, 3)))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+def test_packing_splitting_and_parsing():
+    assert estimate_image_tokens(1024, 768) == 765
+    assert estimate_image_tokens(512, 512) == 255
+    # 765 tokens each: five fit a 4000 budget, the rest spill over
+    assert pack_images([(1024, 768)] * 7, token_budget=4000, max_images=8) == [[0, 1, 2, 3, 4], [5, 6]]
+    assert pack_images([(1024, 768)] * 5, token_budget=8000, max_images=2) == [[0, 1], [2, 3], [4]]
+
+    answer = "사진별 분석입니다.\n\n### 사진 2\n- 요리명: 김치찌개\n\n**사진 1**\n- 요리명: 비빔밥"
+    assert split_sections(answer, 3) == ["- 요리명: 비빔밥", "- 요리명: 김치찌개", None]
+    assert split_sections("- 요리명: 라면", 1) == ["- 요리명: 라면"]
+
+    record = parse_nutrition_text(
+        "- **요리명**: 김치찌개\n- 칼로리: 약 1,250 kcal\n- 탄수화물: 30g\n- 단백질: 25.5g\n"
+        "- 지방: 알 수 없음\n- 나트륨: 1800mg\n- 식이섬유: 4g\n- 총량: 2인분, 총 800g"
+    )
+    assert record.model_dump() == {"dish": "김치찌개", "kcal": 1250.0, "carbs": 30.0, "protein": 25.5, "fat": None,
+                      "sodium": 1.8, "fiber": 4.0, "grams": 800.0}
+    totals = sum_nutrition([record, parse_nutrition_text("- 칼로리: 250\n- 지방: 10g")])
+    assert totals["kcal"] == 1500.0 and totals["fat"] == 10.0
+    print("✅ Token-budget packing, per-photo answer splitting and nutrient parsing")
+
+def test_batch_endpoint_uses_one_model_call():
+    from meals import routes as meals_routes
+    from meals.services.image_cache import ImageResultCache
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    photos = [make_photo(seed) for seed in range(6)]
+    files = [("files", (f"meal{i}.jpg", photo, "image/jpeg")) for i, photo in enumerate(photos)]
+    files.append(("files", ("notes.txt", b"not a photo", "text/plain")))
+
+    async def post_batch():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                     timeout=30) as client:
+            started = time.perf_counter()
+            response = await client.post("/meals/analyze-batch", files=files)
+            return response, time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp_dir, BackgroundServer(create_fake_openai_app(latency=LATENCY)) as fake_openai, \
+            openai_env(f"{fake_openai.url}/v1"):
+        original_cache = meals_routes.meal_analyzer.cache
+        meals_routes.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                first, first_seconds = asyncio.run(post_batch())
+                repeat, _ = asyncio.run(post_batch())
+            calls = httpx.get(f"{fake_openai.url}/stats").json()["calls"]
+        finally:
+            meals_routes.meal_analyzer.cache = original_cache
+
+    assert first.status_code == 200, first.text
+    body = first.json()
+    assert body["model_requests"] == 1 and body["analyzed"] == 6
+    assert [image["filename"] for image in body["images"]] == [f"meal{i}.jpg" for i in range(6)] + ["notes.txt"]
+    assert "error" in body["images"][-1]
+    assert all(image["nutrition"]["dish"] == "비빔밥" for image in body["images"][:6])
+    assert body["totals"]["kcal"] == 6 * 550 and body["totals"]["sodium"] == 7.2
+    # One round trip plus preprocessing, not six
+    assert first_seconds < 3 * LATENCY, f"batch took {first_seconds:.2f}s"
+
+    again = repeat.json()
+    assert again["model_requests"] == 0 and all(image["cache"]["hit"] for image in again["images"][:6])
+    assert again["totals"] == body["totals"]
+    assert calls == 1
+    print(f"✅ 6 photos analysed in {first_seconds:.2f}s with {calls} model call "
+          f"({body['totals']['kcal']:.0f} kcal total); repeat served from cache")
+
+if __name__ == "__main__":
+    test_packing_splitting_and_parsing()
+    test_batch_endpoint_uses_one_model_call()
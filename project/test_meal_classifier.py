@@ -0,0 +1,121 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+from bench_meal_classifier import dish_photo
+from meals.services.classifier import GalleryClassifier, embed_bytes
+
+def test_gallery_recognises_known_dishes_only():
+    embedding = embed_bytes(dish_photo(0, 0))
+    assert embedding.dtype == np.float32 and abs(np.linalg.norm(embedding) - 1) < 1e-5
+    try:
+        embed_bytes(b"not a photo")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "gallery.sqlite3")
+        classifier = GalleryClassifier(path=path, min_similarity=0.7)
+        for dish in range(4):
+            for shot in range(3):
+                classifier.learn(embed_bytes(dish_photo(dish, shot)), f"dish-{dish}",
+                                 {"nutrition": {"dish": f"dish-{dish}"}})
+
+        started = time.perf_counter()
+        prediction = classifier.predict(embed_bytes(dish_photo(2, 10)))
+        elapsed = time.perf_counter() - started
+        assert prediction["label"] == "dish-2" and prediction["confidence"] >= 0.8
+        assert prediction["entry"] == {"nutrition": {"dish": "dish-2"}}
+        # A dish the gallery has never seen goes to the vision model
+        assert classifier.predict(embed_bytes(dish_photo(7, 0))) is None
+        assert classifier.stats()["answered"] == 1 and classifier.stats()["passed"] == 1
+        print(f"✅ New shot of a known dish recognised in {elapsed * 1000:.1f} ms, unknown dish passed on")
+
+        # Reloaded from SQLite, capped at max_entries (oldest dropped)
+        reopened = GalleryClassifier(path=path, min_similarity=0.7, max_entries=6)
+        assert len(reopened) == 6 and reopened.stats()["dishes"] == 2
+        assert reopened.predict(embed_bytes(dish_photo(3, 11)))["label"] == "dish-3"
+        reopened.learn(embed_bytes(dish_photo(5, 0)), "dish-5", {})
+        assert len(GalleryClassifier(path=path, max_entries=100)) == 6
+        print("✅ Gallery persists across restarts and keeps the newest photos")
+
+def test_learning_reuses_the_embeddings_buffer():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "gallery.sqlite3")
+        classifier = GalleryClassifier(path=path, min_similarity=0.9, neighbours=1, max_entries=300)
+        photos = np.eye(400, dtype=np.float32)
+        for index in range(256):
+            classifier.learn(photos[index], f"dish-{index}", {})
+        buffer = classifier._embeddings
+        classifier.learn(photos[256], "dish-256", {})
+        # Grown once by doubling (capped at max_entries), not re-stacked per photo
+        grown = classifier._embeddings
+        assert grown is not buffer and grown.shape == (300, 400)
+        for index in range(257, 400):
+            classifier.learn(photos[index], f"dish-{index}", {})
+        assert classifier._embeddings is grown
+
+        # Full: the oldest photos were replaced in place
+        assert len(classifier) == 300
+        assert classifier.predict(photos[99]) is None
+        assert classifier.predict(photos[100])["label"] == "dish-100"
+        assert classifier.predict(photos[399])["label"] == "dish-399"
+        reopened = GalleryClassifier(path=path, min_similarity=0.9, neighbours=1, max_entries=300)
+        assert len(reopened) == 300 and reopened.predict(photos[99]) is None
+        assert reopened.predict(photos[100])["label"] == "dish-100"
+        print("✅ Gallery embeddings grow by doubling and the oldest rows are reused once full")
+
+def test_endpoint_answers_known_dish_without_the_model():
+    from meals import routes as meals_routes
+    from meals.services import classifier as classifier_module
+    from meals.services.image_cache import ImageResultCache
+    from replay.fake_openai import FAKE_MEAL_RECORD, create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    fake_app = create_fake_openai_app(latency=0.1)
+
+    async def analyze(photo: bytes) -> dict:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                     timeout=30) as client:
+            response = await client.post("/meals/analyze", files={"file": ("meal.jpg", photo, "image/jpeg")})
+            assert response.status_code == 200
+            return response.json()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, BackgroundServer(fake_app) as fake_openai, \
+            openai_env(f"{fake_openai.url}/v1"):
+        original_cache = meals_routes.meal_analyzer.cache
+        meals_routes.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        classifier = GalleryClassifier(path=os.path.join(tmp_dir, "gallery.sqlite3"), min_similarity=0.7)
+        classifier_module.set_food_classifier(classifier)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                first = asyncio.run(analyze(dish_photo(1, 0)))
+                second = asyncio.run(analyze(dish_photo(1, 8)))
+        finally:
+            meals_routes.meal_analyzer.cache = original_cache
+            classifier_module.set_food_classifier(None)
+
+    # The first photo is analysed by the model and learnt; a new shot of the dish is answered locally
+    assert first["source"] == "model" and fake_app.state.calls == 1
+    assert first["nutrition"]["dish"] == FAKE_MEAL_RECORD["dish"]
+    assert second["source"] == "classifier" and second["classifier"]["label"] == FAKE_MEAL_RECORD["dish"]
+    assert second["nutrition"] == first["nutrition"] and second["cache"] == {"hit": False}
+    assert len(classifier) == 1 and classifier.stats()["answered"] == 1
+    print("✅ /meals/analyze answers a recognised dish on-box with no vision call")
+
+if __name__ == "__main__":
+    test_gallery_recognises_known_dishes_only()
+    test_learning_reuses_the_embeddings_buffer()
+    test_endpoint_answers_known_dish_without_the_model()
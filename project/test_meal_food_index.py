@@ -0,0 +1,140 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from meals.services import food_index as food_index_module
+from meals.services.food_index import FoodIndex, load_food_index, normalize_name
+from meals.services.nutrition import combine_estimates
+
+# Headers as in the Korean food composition database export (per serving, sodium in mg)
+FOOD_TABLE = pd.DataFrame({
+    "식품명": ["비빔밥", "김치찌개", "된장찌개", "돌솥비빔밥", "공기밥", "배추김치", "라면"],
+    "1회제공량(g)": [400, 500, 500, 450, 210, 40, 550],
+    "에너지(kcal)": [600, 300, 250, 650, 300, 10, 500],
+    "탄수화물(g)": [90, 15, 20, 95, 65, 2, 80],
+    "단백질(g)": [20, 20, 15, 21, 5, 1, 10],
+    "지방(g)": [15, 18, 10, 18, 1, 0.2, 16],
+    "나트륨(mg)": [1200, 2000, 1900, 1300, 5, 300, 1800],
+    "총 식이섬유(g)": [6, 3, 4, 6, 1, 1, 2],
+})
+
+def write_tables(tmp_dir: str) -> list:
+    food_path = os.path.join(tmp_dir, "food.csv")
+    FOOD_TABLE.to_csv(food_path, index=False, encoding="cp949")
+    exercise_path = os.path.join(tmp_dir, "exercise.csv")
+    pd.DataFrame({"Activity": ["Running"], "130 lb": [600]}).to_csv(exercise_path, index=False)
+    return [food_path, exercise_path]
+
+def test_exact_and_fuzzy_matching():
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        index = load_food_index([Path(path) for path in write_tables(tmp_dir)])
+    # The exercise table is skipped, the cp949 food table read
+    assert len(index) == 7
+
+    assert normalize_name(" 김치 찌개 (돼지고기) ") == "김치찌개"
+    assert index.match("김치 찌개")["name"] == "김치찌개"
+    assert index.match("김치찌개(돼지)")["score"] == 1.0
+    fuzzy = index.match("전주비빔밥")
+    assert fuzzy["name"] == "비빔밥" and 0.6 <= fuzzy["score"] < 1.0
+    assert index.match("피자") is None and index.match("") is None
+    print("✅ Exact, normalised and fuzzy Korean food-name matches")
+
+def test_portions_are_scaled_from_the_table():
+    index = FoodIndex.from_frame(FOOD_TABLE)
+    estimates = index.estimate([
+        {"dish": "비빔밥", "grams": 200},    # half a serving
+        {"dish": "라면", "grams": None},     # one table serving
+        {"dish": "피자", "grams": 300},      # not in the table
+    ])
+    bibimbap, ramen, pizza = estimates
+    assert (bibimbap["kcal"], bibimbap["carbs"], bibimbap["sodium"]) == (300.0, 45.0, 0.6)
+    assert ramen["grams"] == 550.0 and ramen["kcal"] == 500.0
+    assert pizza["match"] is None and pizza["kcal"] is None and pizza["grams"] == 300
+
+    record = combine_estimates(estimates)
+    assert record.dish == "비빔밥, 라면, 피자" and record.kcal == 800.0 and record.grams == 1050.0
+
+    # Per 100 g when the table has no serving column
+    per_100g = FoodIndex.from_frame(pd.DataFrame({"name": ["rice"], "kcal": [130], "sodium": [0.001]}))
+    assert per_100g.estimate([{"dish": "Rice", "grams": 250}])[0]["kcal"] == 325.0
+
+    rng = np.random.default_rng(0)
+    syllables = list("김치찌개된장국밥비빔볶음면탕전구이조림나물무침")
+    names = ["".join(rng.choice(syllables, size=rng.integers(2, 6))) for _ in range(20000)]
+    big = FoodIndex.from_frame(pd.DataFrame({"식품명": names, "에너지(kcal)": rng.uniform(50, 900, len(names))}))
+    queries = [{"dish": name + "정식", "grams": 300} for name in names[:500]]
+    started = time.perf_counter()
+    big.estimate(queries)
+    per_item_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    assert per_item_ms < 5
+    print(f"✅ Portions scaled from the table ({per_item_ms:.2f} ms per fuzzy item over {len(names):,} foods)")
+
+def test_local_mode_endpoints():
+    import httpx
+    from fastapi import FastAPI
+    from PIL import Image, ImageDraw
+    from meals import routes as meals_routes
+    from meals.services.image_cache import ImageResultCache
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+
+    def photo(color) -> bytes:
+        image = Image.new("RGB", (1200, 900), (235, 230, 220))
+        ImageDraw.Draw(image).rectangle([200 + color[0], 150, 900, 750], fill=color)
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=90)
+        return output.getvalue()
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            single = await client.post("/meals/analyze", files={"file": ("lunch.jpg", photo((200, 60, 40)), "image/jpeg")})
+            batch = await client.post("/meals/analyze-batch", files=[
+                ("files", ("breakfast.jpg", photo((20, 160, 40)), "image/jpeg")),
+                ("files", ("dinner.jpg", photo((90, 40, 200)), "image/jpeg")),
+            ])
+            return single.json(), batch.json()
+
+    saved = (food_index_module.MEALS_NUTRITION_SOURCE, food_index_module._food_index,
+             food_index_module._food_index_loaded)
+    with tempfile.TemporaryDirectory() as tmp_dir, BackgroundServer(create_fake_openai_app(latency=0.0)) as fake_openai, \
+            openai_env(f"{fake_openai.url}/v1"):
+        original_cache = meals_routes.meal_analyzer.cache
+        meals_routes.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        food_index_module.MEALS_NUTRITION_SOURCE = "local"
+        food_index_module.set_food_index(FoodIndex.from_frame(FOOD_TABLE))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                single, batch = asyncio.run(run())
+        finally:
+            meals_routes.meal_analyzer.cache = original_cache
+            (food_index_module.MEALS_NUTRITION_SOURCE, food_index_module._food_index,
+             food_index_module._food_index_loaded) = saved
+
+    # The fake model names 비빔밥 400 g and 배추김치 40 g: exactly one table serving each
+    assert single["source"] == "local"
+    assert single["nutrition"]["kcal"] == 610.0 and single["nutrition"]["sodium"] == 1.5
+    assert [item["match"]["name"] for item in single["items"]] == ["비빔밥", "배추김치"]
+    assert single["result"].startswith("- 요리명: 비빔밥, 배추김치\n- 칼로리: 610 kcal")
+
+    # Every photo gets the same numbers for the same dishes
+    assert batch["model_requests"] == 1
+    assert all(image["nutrition"] == single["nutrition"] for image in batch["images"])
+    assert batch["totals"]["kcal"] == 1220.0
+    print("✅ Local-nutrition mode: the model names dishes, the table supplies consistent nutrients")
+
+if __name__ == "__main__":
+    test_exact_and_fuzzy_matching()
+    test_portions_are_scaled_from_the_table()
+    test_local_mode_endpoints()
@@ -0,0 +1,144 @@
+import sys
+import os
+import contextlib
+import io
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from meals.services.image_cache import ImageResultCache, hamming_distance, image_fingerprint
+
+def make_meal_photo(seed: int, size=(2000, 1500)) -> Image.Image:
+    """Plates and food as coloured discs on a table, with sensor noise"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    image = Image.new("RGB", size, (230, 225, 215))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        radius = int(rng.integers(height // 10, height // 3))
+        draw.ellipse([x - radius, y - radius, x + radius, y + radius],
+                     fill=tuple(int(c) for c in rng.integers(0, 255, 3)))
+    pixels = np.asarray(image, dtype=np.float32) + rng.normal(0, 12, (height, width, 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+def to_jpeg(image: Image.Image, quality: int = 92) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+def test_fingerprint_matches_near_duplicates_only():
+    photo = make_meal_photo(1)
+    original = image_fingerprint(to_jpeg(photo))
+    # Re-shared through a messenger: half the size, heavier compression, edges trimmed
+    resized = image_fingerprint(to_jpeg(photo.resize((1000, 750)), quality=60))
+    cropped = image_fingerprint(to_jpeg(photo.crop((20, 15, 1980, 1485)), quality=75))
+    other = image_fingerprint(to_jpeg(make_meal_photo(2)))
+
+    for near in (resized, cropped):
+        assert max(hamming_distance(a, b) for a, b in zip(original, near)) <= 6
+    assert min(hamming_distance(a, b) for a, b in zip(original, other)) > 12
+
+    try:
+        image_fingerprint(b"not an image")
+        assert False, "invalid image accepted"
+    except ValueError:
+        pass
+    print("✅ Resized/cropped copies stay within the threshold, other meals do not")
+
+def test_cache_lru_persistence_and_stats():
+    originals = [image_fingerprint(to_jpeg(make_meal_photo(seed))) for seed in range(3)]
+    near = image_fingerprint(to_jpeg(make_meal_photo(0).resize((1000, 750)), quality=60))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cache.sqlite3")
+        cache = ImageResultCache(path=path, max_entries=2)
+        for seed, fingerprint in enumerate(originals[:2]):
+            cache.set(*fingerprint, {"result": f"meal {seed}"})
+
+        assert cache.get(*originals[0]) == {"result": "meal 0", "distance": 0}
+        near_hit = cache.get(*near)
+        assert near_hit["result"] == "meal 0" and 0 < near_hit["distance"] <= 6
+        assert cache.get(*originals[2]) is None
+
+        # meal 1 is least recently used and makes room for meal 2
+        cache.set(*originals[2], {"result": "meal 2"})
+        assert cache.get(*originals[1]) is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["near_hits"], stats["misses"], stats["entries"]) == (1, 1, 2, 2)
+
+        # Hits only touch memory; their recency reaches the database with the next write
+        changes = cache._get_connection().total_changes
+        for _ in range(5):
+            cache.get(*originals[0])
+        assert cache._get_connection().total_changes == changes
+        cache.set(*originals[2], {"result": "meal 2"})
+        created_at, last_access = cache._get_connection().execute(
+            "SELECT created_at, last_access FROM meal_image_cache WHERE phash = ?", (f"{originals[0][0]:016x}",)
+        ).fetchone()
+        assert last_access > created_at
+
+        reopened = ImageResultCache(path=path, max_entries=2)
+        assert reopened.get(*originals[2])["result"] == "meal 2"
+        assert reopened.get(*originals[0])["result"] == "meal 0"
+
+        other_version = ImageResultCache(path=path, namespace="analyze:v0")
+        assert other_version.get(*originals[0]) is None
+
+        expired = ImageResultCache(path=path, ttl_seconds=0)
+        assert expired.get(*originals[0]) is None
+    print("✅ LRU eviction, restart persistence, result-format namespaces and TTL")
+
+def test_repeat_upload_skips_the_model():
+    import asyncio
+    import httpx
+    from fastapi import FastAPI
+    from meals import routes as meals_routes
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    photo = make_meal_photo(7, size=(4032, 3024))
+    uploads = [to_jpeg(photo), to_jpeg(photo), to_jpeg(photo.resize((2016, 1512)), quality=70)]
+
+    async def analyze_all():
+        responses = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for data in uploads:
+                started = time.perf_counter()
+                response = await client.post("/meals/analyze", files={"file": ("meal.jpg", data, "image/jpeg")})
+                responses.append((response, (time.perf_counter() - started) * 1000))
+            stats = (await client.get("/meals/stats")).json()
+        return responses, stats
+
+    with tempfile.TemporaryDirectory() as tmp_dir, BackgroundServer(create_fake_openai_app(latency=0.2)) as fake_openai, \
+            openai_env(f"{fake_openai.url}/v1"):
+        original_cache = meals_routes.meal_analyzer.cache
+        meals_routes.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                responses, stats = asyncio.run(analyze_all())
+            calls = httpx.get(f"{fake_openai.url}/stats").json()["calls"]
+        finally:
+            meals_routes.meal_analyzer.cache = original_cache
+
+    (first, first_ms), (repeat, repeat_ms), (near, near_ms) = responses
+    assert first.status_code == 200 and first.json()["cache"] == {"hit": False}
+    # Same answer as the first upload, minus the preprocessing that was skipped
+    expected = {key: value for key, value in first.json().items() if key != "preprocess"}
+    assert repeat.json() == dict(expected, cache={"hit": True, "distance": 0})
+    assert near.json()["result"] == first.json()["result"] and near.json()["cache"]["hit"]
+    assert calls == 1
+    assert repeat_ms < first_ms and near_ms < first_ms
+    assert stats["cache"]["hits"] + stats["cache"]["near_hits"] == 2 and stats["cache"]["misses"] == 1
+    print(f"✅ First upload {first_ms:.0f} ms, repeat {repeat_ms:.0f} ms, near-repeat {near_ms:.0f} ms, "
+          f"{calls} model call")
+
+if __name__ == "__main__":
+    test_fingerprint_matches_near_duplicates_only()
+    test_cache_lru_persistence_and_stats()
+    test_repeat_upload_skips_the_model()
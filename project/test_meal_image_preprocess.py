@@ -0,0 +1,105 @@
+import sys
+import os
+import contextlib
+import io
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image
+
+from meals.services.image_preprocess import preprocess_image
+
+ORIENTATION_TAG = 0x0112
+MAKE_TAG = 0x010F
+
+def make_phone_photo(width: int = 4032, height: int = 3024, orientation: int = 6) -> bytes:
+    """Noisy gradient saved like a phone camera: large high-quality JPEG with EXIF"""
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    pixels = gradient * np.array([1.0, 0.6, 0.3], dtype=np.float32) + rng.normal(0, 40, (height, width, 3))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = orientation
+    exif[MAKE_TAG] = "HaruPhone"
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=95, exif=exif.tobytes())
+    return output.getvalue()
+
+def test_phone_photo_is_rotated_stripped_and_shrunk():
+    photo = make_phone_photo()
+    started = time.perf_counter()
+    result = preprocess_image(photo, max_side=1024, output_format="JPEG", quality=82)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    # Orientation 6 (rotate 90) is applied: portrait output, longest side capped
+    assert result["original_size"] == (4032, 3024)
+    assert result["size"] == (768, 1024)
+    assert result["mime_type"] == "image/jpeg"
+    assert result["bytes"] < result["original_bytes"] / 10
+    assert result["bytes_saved"] == result["original_bytes"] - result["bytes"]
+
+    processed = Image.open(io.BytesIO(result["data"]))
+    assert processed.format == "JPEG"
+    assert not processed.getexif(), "EXIF must not be forwarded"
+
+    webp = preprocess_image(photo, max_side=512, output_format="WEBP", quality=75)
+    assert webp["mime_type"] == "image/webp" and max(webp["size"]) == 512
+    print(f"✅ {result['original_bytes']:,} B -> {result['bytes']:,} B JPEG / {webp['bytes']:,} B WebP "
+          f"in {elapsed_ms:.0f} ms")
+
+def test_small_transparent_and_invalid_images():
+    png = io.BytesIO()
+    Image.new("RGBA", (300, 200), (255, 0, 0, 0)).save(png, format="PNG")
+    result = preprocess_image(png.getvalue())
+    # Never upscaled; transparency flattened onto white
+    assert result["size"] == (300, 200)
+    assert Image.open(io.BytesIO(result["data"])).getpixel((10, 10)) > (240, 240, 240)
+
+    for data in (b"not an image", b""):
+        try:
+            preprocess_image(data)
+            assert False, "invalid image accepted"
+        except ValueError:
+            pass
+    print("✅ Small images kept, alpha flattened, invalid uploads rejected")
+
+def test_analyze_sends_preprocessed_image():
+    import asyncio
+    import httpx
+    from fastapi import FastAPI
+    from meals import routes as meals_routes
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    photo = make_phone_photo()
+
+    async def analyze(files):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/meals/analyze", files=files)
+
+    with BackgroundServer(create_fake_openai_app(latency=0.0)) as fake_openai, openai_env(f"{fake_openai.url}/v1"):
+        # A cached answer from an earlier run would skip the request measured here
+        meals_routes.meal_analyzer.cache.enabled = False
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = asyncio.run(analyze({"file": ("meal.jpg", photo, "image/jpeg")}))
+                rejected = asyncio.run(analyze({"file": ("notes.txt", b"hello", "text/plain")}))
+            sent = httpx.get(f"{fake_openai.url}/stats").json()
+        finally:
+            meals_routes.meal_analyzer.cache.enabled = True
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert "result" in body and body["preprocess"]["size"] == [768, 1024]
+    # The whole request to the model is a fraction of the photo, not 1.33x of it
+    assert sent["max_request_bytes"] < len(photo) / 5
+    assert rejected.status_code == 400
+    print(f"✅ /meals/analyze sent {sent['max_request_bytes']:,} B for a {len(photo):,} B photo")
+
+if __name__ == "__main__":
+    test_phone_photo_is_rotated_stripped_and_shrunk()
+    test_small_transparent_and_invalid_images()
+    test_analyze_sends_preprocessed_image()
@@ -0,0 +1,59 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from PIL import Image, ImageDraw
+
+def make_photo() -> bytes:
+    image = Image.new("RGB", (1200, 900), (230, 225, 215))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse([200, 150, 1000, 750], fill=(245, 245, 240))
+    draw.ellipse([400, 300, 800, 600], fill=(200, 80, 40))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+def test_standalone_app_shares_the_meals_pipeline():
+    from meals import imagetest
+    from meals.services import analysis, vision
+    from meals.services.image_cache import ImageResultCache
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    fake_app = create_fake_openai_app(latency=0.05)
+    photo = make_photo()
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=imagetest.app), base_url="http://test",
+                                     timeout=30) as client:
+            await analysis.meal_analyzer.warm_up()
+            warmed_client = vision.get_vision_client()
+            legacy = await client.post("/api/food/analyze", files={"file": ("meal.jpg", photo, "image/jpeg")})
+            routed = await client.post("/meals/analyze", files={"file": ("meal.jpg", photo, "image/jpeg")})
+            stats = await client.get("/meals/stats")
+            return legacy, routed, stats, warmed_client is vision.get_vision_client()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, BackgroundServer(fake_app) as fake_openai, \
+            openai_env(f"{fake_openai.url}/v1"):
+        original_cache = analysis.meal_analyzer.cache
+        analysis.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                legacy, routed, stats, same_client = asyncio.run(run())
+        finally:
+            analysis.meal_analyzer.cache = original_cache
+
+    # The old path keeps its response field; both paths go through one cache and one client
+    assert legacy.status_code == 200 and "result" in legacy.json() and legacy.json()["cache"] == {"hit": False}
+    assert routed.json()["cache"]["hit"] is True and routed.json()["nutrition"] == legacy.json()["nutrition"]
+    assert fake_app.state.calls == 1 and same_client
+    assert stats.json()["cache"]["hits"] == 1
+    print("✅ imagetest app serves /api/food/analyze and /meals from the shared analyzer, cache and client")
+
+if __name__ == "__main__":
+    test_standalone_app_shares_the_meals_pipeline()
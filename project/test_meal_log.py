@@ -0,0 +1,123 @@
+import sys
+import os
+import asyncio
+import contextlib
+import datetime
+import io
+import sqlite3
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import FastAPI
+from PIL import Image, ImageDraw
+
+from meals.services.meal_log import MealLog, week_start
+from meals.services.nutrition import NutritionRecord
+
+def test_totals_are_kept_incrementally():
+    today = datetime.date.today()
+    monday = week_start(today)
+    other_day = monday if today != monday else monday + datetime.timedelta(days=1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "log.sqlite3")
+        log = MealLog(path=path)
+        log.add("u1", {"dish": "비빔밥", "kcal": 550, "sodium": 1.2, "grams": 450})
+        log.add("u1", NutritionRecord(dish="라면", kcal=500, fat=16, sodium=1.8))
+        log.add("u1", {"dish": "김밥", "kcal": 320, "sodium": None}, day=other_day)
+        log.add("u1", {"dish": "피자", "kcal": 900}, day=monday - datetime.timedelta(days=1))  # last week
+        log.add("u2", {"dish": "샐러드", "kcal": 150})
+
+        # Today's summary comes from memory, kept current by each add
+        queries = log.queries
+        summary = log.summary("u1")
+        assert log.queries == queries
+        assert summary["day"] == today.isoformat() and summary["week_start"] == monday.isoformat()
+        assert summary["today"]["meals"] == 2 and summary["today"]["kcal"] == 1050.0
+        assert summary["today"]["sodium"] == 3.0 and summary["today"]["fat"] == 16.0
+        assert summary["week"]["meals"] == 3 and summary["week"]["days"] == 2 and summary["week"]["kcal"] == 1370.0
+        assert log.summary("u2")["today"]["kcal"] == 150.0
+        assert log.summary("u3")["today"] == {"meals": 0, "kcal": 0.0, "carbs": 0.0, "protein": 0.0, "fat": 0.0,
+                                              "sodium": 0.0, "fiber": 0.0, "grams": 0.0}
+        print("✅ Daily and weekly totals updated on insert; today's read needs no query")
+
+        # After a restart the totals are one row each and agree with the raw meals
+        reopened = MealLog(path=path)
+        assert reopened.summary("u1") == summary and reopened.queries == 2
+        connection = sqlite3.connect(path)
+        raw_kcal = connection.execute(
+            "SELECT SUM(json_extract(nutrition, '$.kcal')) FROM meal_log WHERE user_id = 'u1' AND day >= ?",
+            (monday.isoformat(),)
+        ).fetchone()[0]
+        connection.close()
+        assert raw_kcal == summary["week"]["kcal"]
+        print("✅ Stored totals match the logged meals after a restart")
+
+def make_photo() -> bytes:
+    image = Image.new("RGB", (1000, 750), (230, 225, 215))
+    ImageDraw.Draw(image).ellipse([250, 150, 750, 600], fill=(120, 160, 60))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+class ThreadRecordingLog(MealLog):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def add(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().add(*args, **kwargs)
+
+def test_analyze_logs_meals_for_the_user():
+    from meals import routes as meals_routes
+    from meals.services import meal_log as meal_log_module
+    from meals.services.image_cache import ImageResultCache
+    from replay.fake_openai import FAKE_MEAL_RECORD, create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    photo = make_photo()
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                     timeout=30) as client:
+            first = await client.post("/meals/analyze", files={"file": ("a.jpg", photo, "image/jpeg")},
+                                      data={"user_id": "u1"})
+            # The same meal again (a cache hit) is still a meal eaten
+            second = await client.post("/meals/analyze", files={"file": ("a.jpg", photo, "image/jpeg")},
+                                       data={"user_id": "u1"})
+            anonymous = await client.post("/meals/analyze", files={"file": ("a.jpg", photo, "image/jpeg")})
+            bad_day = await client.post("/meals/analyze", files={"file": ("a.jpg", photo, "image/jpeg")},
+                                        data={"user_id": "u1", "day": "yesterday"})
+            summary = await client.get("/meals/log/u1")
+            return first, second, anonymous, bad_day, summary
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            BackgroundServer(create_fake_openai_app(latency=0.05)) as fake_openai, openai_env(f"{fake_openai.url}/v1"):
+        original_cache = meals_routes.meal_analyzer.cache
+        meals_routes.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        meal_log = ThreadRecordingLog(path=os.path.join(tmp_dir, "log.sqlite3"))
+        meal_log_module.set_meal_log(meal_log)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                first, second, anonymous, bad_day, summary = asyncio.run(run())
+        finally:
+            meals_routes.meal_analyzer.cache = original_cache
+            meal_log_module.set_meal_log(None)
+
+    assert first.json()["meal_log"]["today"]["meals"] == 1
+    assert second.json()["cache"]["hit"] is True
+    assert second.json()["meal_log"]["today"]["kcal"] == 2 * FAKE_MEAL_RECORD["kcal"]
+    assert "meal_log" not in anonymous.json() and bad_day.status_code == 400
+    assert summary.json() == second.json()["meal_log"]
+    # Meal log writes ran in worker threads, not on the event loop (the main thread here)
+    assert meal_log.threads and threading.get_ident() not in meal_log.threads
+    print("✅ /meals/analyze logs the user's meals and /meals/log returns the running totals")
+
+if __name__ == "__main__":
+    test_totals_are_kept_incrementally()
+    test_analyze_logs_meals_for_the_user()
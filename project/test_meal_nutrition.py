@@ -0,0 +1,107 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from meals.services.nutrition import (NutritionRecord, parse_analysis, parse_batch_analysis, parse_nutrition_text,
+                                      render_nutrition_text, response_format)
+
+BULLETS = """분석 결과입니다.
+
+- 요리명: 김치찌개
+- 칼로리: 약 450 kcal
+- 탄수화물: 20g
+- 단백질: 25g
+- 지방: 28g
+- 나트륨: 2,100mg
+- 식이섬유: 5g
+- 총량: 1인분, 500g"""
+
+def test_schemas_are_strict():
+    def check(schema):
+        assert schema["additionalProperties"] is False
+        assert sorted(schema["required"]) == sorted(schema["properties"])
+
+    single = response_format()["json_schema"]
+    assert single["strict"] and single["name"] == "meal_nutrition"
+    check(single["schema"])
+    assert set(single["schema"]["properties"]) == set(NutritionRecord.model_fields)
+
+    batch = response_format(batch=True)["json_schema"]["schema"]
+    check(batch)
+    check(batch["properties"]["meals"]["items"])
+    assert "photo" in batch["properties"]["meals"]["items"]["properties"]
+    print("✅ json_schema response formats list every field as required")
+
+def test_structured_and_fallback_parsing():
+    record = {"dish": "비빔밥", "kcal": 550, "carbs": 80, "protein": 20, "fat": 15,
+              "sodium": 1.2, "fiber": 6, "grams": 450}
+    assert parse_analysis(json.dumps(record, ensure_ascii=False)).model_dump() == record
+    assert parse_analysis("```json\n" + json.dumps(record) + "\n```").kcal == 550
+
+    from_bullets = parse_analysis(BULLETS)
+    assert from_bullets.dish == "김치찌개" and from_bullets.kcal == 450 and from_bullets.sodium == 2.1
+    assert parse_analysis("사진을 분석할 수 없습니다.") == NutritionRecord()
+    # Rendering back to bullets loses nothing
+    assert parse_nutrition_text(render_nutrition_text(from_bullets)) == from_bullets
+
+    meals = {"meals": [dict(record, photo=2), dict(record, photo=1, dish="라면"), {"photo": 1, "kcal": "many"}]}
+    records = parse_batch_analysis(json.dumps(meals, ensure_ascii=False), 3)
+    assert [r.dish if r else None for r in records] == ["라면", "비빔밥", None]
+    assert parse_batch_analysis(BULLETS, 3) is None
+
+    started = time.perf_counter()
+    for _ in range(5000):
+        parse_analysis(BULLETS)
+    per_parse_us = (time.perf_counter() - started) / 5000 * 1e6
+    assert per_parse_us < 500
+    print(f"✅ JSON and bullet answers parsed into records ({per_parse_us:.0f} µs per bullet fallback)")
+
+def test_analyze_returns_typed_record():
+    import httpx
+    from fastapi import FastAPI
+    from meals import routes as meals_routes
+    from meals.services.image_cache import ImageResultCache
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    from PIL import Image, ImageDraw
+    image = Image.new("RGB", (1200, 900), (235, 230, 220))
+    ImageDraw.Draw(image).ellipse([300, 150, 900, 750], fill=(200, 60, 40))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    photo = output.getvalue()
+
+    async def analyze_twice():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            files = {"file": ("meal.jpg", photo, "image/jpeg")}
+            return [(await client.post("/meals/analyze", files=files)).json() for _ in range(2)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir, BackgroundServer(create_fake_openai_app(latency=0.0)) as fake_openai, \
+            openai_env(f"{fake_openai.url}/v1"):
+        original_cache = meals_routes.meal_analyzer.cache
+        meals_routes.meal_analyzer.cache = ImageResultCache(path=os.path.join(tmp_dir, "cache.sqlite3"))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                first, cached = asyncio.run(analyze_twice())
+        finally:
+            meals_routes.meal_analyzer.cache = original_cache
+
+    assert first["nutrition"] == {"dish": "비빔밥", "kcal": 550.0, "carbs": 80.0, "protein": 20.0, "fat": 15.0,
+                                  "sodium": 1.2, "fiber": 6.0, "grams": 450.0}
+    assert first["result"].startswith("- 요리명: 비빔밥\n- 칼로리: 550 kcal")
+    # The parsed record is what the cache keeps and serves
+    assert cached["cache"]["hit"] and cached["nutrition"] == first["nutrition"]
+    print("✅ /meals/analyze answers with a typed record, also from the cache")
+
+if __name__ == "__main__":
+    test_schemas_are_strict()
+    test_structured_and_fallback_parsing()
+    test_analyze_returns_typed_record()
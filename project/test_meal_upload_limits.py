@@ -0,0 +1,148 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import FastAPI
+from PIL import Image, ImageDraw
+
+from meals import routes as meals_routes
+from meals.services import uploads
+from meals.services.image_preprocess import preprocess_image
+
+CONCURRENT_UPLOADS = 50
+UPLOAD_BYTES = 20 * 1024 * 1024 - 4096
+MEMORY_BUDGET = 64 * 1024 * 1024
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    return app
+
+def padded_photo(size: int) -> bytes:
+    """A small JPEG followed by filler up to size bytes (decoders stop at the end-of-image marker)"""
+    image = Image.new("RGB", (1200, 900), (230, 225, 215))
+    ImageDraw.Draw(image).ellipse([300, 200, 900, 700], fill=(200, 80, 40))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue().ljust(size, b"\0")
+
+async def send_raw(app: FastAPI, headers: list, chunks) -> tuple:
+    """POST /meals/analyze straight through ASGI; returns (status, body bytes the app pulled)"""
+    pulled = {"bytes": 0, "calls": 0}
+    chunks = iter(chunks)
+    status = {}
+
+    async def receive():
+        pulled["calls"] += 1
+        chunk = next(chunks, None)
+        if chunk is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        pulled["bytes"] += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": "/meals/analyze", "raw_path": b"/meals/analyze", "root_path": "",
+             "query_string": b"", "headers": headers, "client": ("test", 1), "server": ("test", 80)}
+    await app(scope, receive, send)
+    return status["code"], pulled
+
+def test_oversized_bodies_are_rejected_before_parsing():
+    app = make_app()
+    content_type = (b"content-type", b"multipart/form-data; boundary=x")
+
+    def endless_file_part():
+        yield b'--x\r\nContent-Disposition: form-data; name="file"; filename="big.jpg"\r\n' \
+              b'Content-Type: image/jpeg\r\n\r\n'
+        while True:
+            yield b"\xff" * (1024 * 1024)
+
+    # Declared too large: 413 without pulling a byte of the body
+    status, pulled = asyncio.run(send_raw(app, [content_type, (b"content-length", str(10 ** 9).encode())],
+                                          endless_file_part()))
+    assert status == 413 and pulled["calls"] == 0
+
+    # Chunked, no length: cut off right after the cap instead of spooling a gigabyte
+    status, pulled = asyncio.run(send_raw(app, [content_type, (b"transfer-encoding", b"chunked")],
+                                          endless_file_part()))
+    assert status == 413
+    assert pulled["bytes"] <= uploads.max_body_bytes(1) + 1024 * 1024
+    print(f"✅ Oversized requests rejected early (streamed one stopped after {pulled['bytes']:,} bytes)")
+
+def test_decoding_is_bounded():
+    huge = io.BytesIO()
+    Image.new("RGB", (9000, 9000)).save(huge, format="PNG")
+    try:
+        preprocess_image(huge.getvalue())
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "pixels" in str(e)
+    # A 9000x9000 JPEG decodes at a reduced draft scale, within the pixel bound
+    photo = io.BytesIO()
+    Image.new("RGB", (9000, 9000), (200, 80, 40)).save(photo, format="JPEG")
+    assert max(preprocess_image(photo.getvalue())["size"]) == 1024
+    print("✅ Decompression-bomb sized images refused before decoding, large JPEGs drafted")
+
+def test_concurrent_large_uploads_stay_within_the_memory_budget():
+    from replay.fake_openai import create_fake_openai_app, openai_env
+    from replay.server import BackgroundServer
+
+    app = make_app()
+
+    async def upload_all(path: str):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                     timeout=120) as client:
+            handles = [open(path, "rb") for _ in range(CONCURRENT_UPLOADS)]
+            try:
+                return await asyncio.gather(*(
+                    client.post("/meals/analyze", files={"file": (f"meal{i}.jpg", handle, "image/jpeg")})
+                    for i, handle in enumerate(handles)
+                ))
+            finally:
+                for handle in handles:
+                    handle.close()
+
+    original_budget = uploads.MEALS_UPLOAD_MEMORY_BYTES
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            BackgroundServer(create_fake_openai_app(latency=0.05)) as fake_openai, openai_env(f"{fake_openai.url}/v1"):
+        path = os.path.join(tmp_dir, "meal.jpg")
+        with open(path, "wb") as output:
+            output.write(padded_photo(UPLOAD_BYTES))
+
+        uploads.MEALS_UPLOAD_MEMORY_BYTES = MEMORY_BUDGET
+        meals_routes.meal_analyzer.cache.enabled = False
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                responses = asyncio.run(upload_all(path))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            uploads.MEALS_UPLOAD_MEMORY_BYTES = original_budget
+            meals_routes.meal_analyzer.cache.enabled = True
+        elapsed = time.perf_counter() - started
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_UPLOADS
+    assert all("nutrition" in response.json() for response in responses)
+    stats = uploads.upload_stats()
+    assert stats["max_bytes_in_memory"] <= MEMORY_BUDGET and stats["waited"] > 0
+    # Held all at once this would be 50 x 20 MB = 1 GB of upload bytes alone
+    assert peak < 3 * MEMORY_BUDGET, f"peak {peak / 2 ** 20:.0f} MB"
+    print(f"✅ {CONCURRENT_UPLOADS} concurrent {UPLOAD_BYTES / 2 ** 20:.0f} MB uploads in {elapsed:.1f}s, "
+          f"Python heap peak {peak / 2 ** 20:.0f} MB (budget {MEMORY_BUDGET / 2 ** 20:.0f} MB)")
+
+if __name__ == "__main__":
+    test_oversized_bodies_are_rejected_before_parsing()
+    test_decoding_is_bounded()
+    test_concurrent_large_uploads_stay_within_the_memory_budget()
@@ -0,0 +1,106 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from PIL import Image, ImageDraw
+
+from meals import routes as meals_routes
+from meals.services import uploads, vision
+from replay.fake_openai import create_fake_openai_app, openai_env
+from replay.server import BackgroundServer
+
+LATENCY = 0.3
+REQUESTS = 16
+
+def make_photo(seed: int) -> bytes:
+    """A plate-like scene per seed; cheap to preprocess, so the timing is about the model calls"""
+    rng = np.random.default_rng(seed)
+    image = Image.new("RGB", (800, 600), (230, 225, 215))
+    draw = ImageDraw.Draw(image)
+    for _ in range(5):
+        x, y, radius = int(rng.integers(0, 800)), int(rng.integers(0, 600)), int(rng.integers(60, 200))
+        draw.ellipse([x - radius, y - radius, x + radius, y + radius],
+                     fill=tuple(int(c) for c in rng.integers(0, 255, 3)))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+async def run_load(app: FastAPI, photos: list) -> dict:
+    """Fire all analyses at once while a probe measures how late the event loop wakes it"""
+    lag = {"max_ms": 0.0}
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag["max_ms"] = max(lag["max_ms"], (time.perf_counter() - started - 0.01) * 1000)
+
+    # Client, executor and food table are set up once per worker, not per measured request
+    await meals_routes.meal_analyzer.warm_up()
+    probe_task = asyncio.create_task(probe())
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/meals/analyze", files={"file": (f"meal{i}.jpg", photo, "image/jpeg")})
+            for i, photo in enumerate(photos)
+        ))
+        elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return {"responses": responses, "elapsed": elapsed, "lag_ms": lag["max_ms"]}
+
+def test_concurrent_analyses_overlap():
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+    photos = [make_photo(seed) for seed in range(REQUESTS)]
+
+    original_limit = vision.MEALS_MAX_CONCURRENT_ANALYSES
+    with BackgroundServer(create_fake_openai_app(latency=LATENCY)) as fake_openai, openai_env(f"{fake_openai.url}/v1"):
+        vision.MEALS_MAX_CONCURRENT_ANALYSES = 8
+        meals_routes.meal_analyzer.cache.enabled = False
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                load = asyncio.run(run_load(app, photos))
+        finally:
+            vision.MEALS_MAX_CONCURRENT_ANALYSES = original_limit
+            meals_routes.meal_analyzer.cache.enabled = True
+        served = httpx.get(f"{fake_openai.url}/stats").json()
+
+    assert all(response.status_code == 200 for response in load["responses"])
+    assert served["calls"] == REQUESTS
+    # Overlapping up to the limiter, never beyond it
+    assert served["max_in_flight"] == 8
+    assert load["elapsed"] < REQUESTS * LATENCY / 3, f"{load['elapsed']:.2f}s looks serialized"
+    # A synchronous model call would stall the loop for at least one full LATENCY
+    assert load["lag_ms"] < LATENCY * 1000, f"event loop blocked for {load['lag_ms']:.0f} ms"
+    print(f"✅ {REQUESTS} analyses in {load['elapsed']:.2f}s (serial: {REQUESTS * LATENCY:.1f}s), "
+          f"max {served['max_in_flight']} in flight, worst loop lag {load['lag_ms']:.0f} ms")
+
+def test_upload_size_cap():
+    app = FastAPI()
+    app.include_router(meals_routes.router, prefix="/meals")
+
+    async def upload(data: bytes):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/meals/analyze", files={"file": ("big.jpg", data, "image/jpeg")})
+
+    original_cap = uploads.MEALS_MAX_UPLOAD_BYTES
+    uploads.MEALS_MAX_UPLOAD_BYTES = 4 * 1024
+    try:
+        response = asyncio.run(upload(make_photo(0)))
+    finally:
+        uploads.MEALS_MAX_UPLOAD_BYTES = original_cap
+    assert response.status_code == 413
+    print(f"✅ Oversized upload rejected: {response.json()['detail']}")
+
+if __name__ == "__main__":
+    test_concurrent_analyses_overlap()
+    test_upload_size_cap()
@@ -0,0 +1,80 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.services.database import close_pools
+from issues.services.migrations import HOT_QUERIES, MIGRATIONS, find_full_scans, migrate, migration_status
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+# Stored generated columns (migration 2) are MySQL-only; the SQLite-backed stand-in runs the rest
+STANDIN_MIGRATIONS = [m for m in MIGRATIONS if m["version"] != 2]
+
+def sqlite_full_scans(db) -> list:
+    """SQLite counterpart of check_query_plans: hot queries whose plan scans a table without an index"""
+    import sqlglot
+
+    scans = []
+    for name, (query, params) in HOT_QUERIES.items():
+        sql = sqlglot.transpile(query.replace("%s", "?"), read="mysql", write="sqlite")[0]
+        for row in db.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall():
+            detail = row[3]
+            if detail.startswith("SCAN") and "INDEX" not in detail:
+                scans.append(f"{name}: {detail}")
+    return scans
+
+def test_find_full_scans_on_mysql_plans():
+    # EXPLAIN rows as returned by MySQL 8 before and after the migrations
+    before = [{"id": 1, "select_type": "SIMPLE", "table": "issues", "type": "ALL",
+               "possible_keys": None, "key": None, "rows": 48210}]
+    after = [{"id": 1, "select_type": "SIMPLE", "table": "issues", "type": "ref",
+              "possible_keys": "idx_issues_reference", "key": "idx_issues_reference", "rows": 1}]
+    union = [
+        {"id": 1, "select_type": "PRIMARY", "table": "member", "type": "ref", "key": "idx_member_email"},
+        {"id": 2, "select_type": "UNION", "table": "member", "type": "const", "key": "PRIMARY"},
+        {"id": None, "select_type": "UNION RESULT", "table": "<union1,2>", "type": "ALL", "key": None},
+    ]
+    assert len(find_full_scans(before)) == 1
+    assert find_full_scans(after) == []
+    assert find_full_scans(union) == []
+    print("✅ EXPLAIN full-scan detection")
+
+def test_migrations_apply_once_and_index_hot_queries():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    with MySQLStandin() as standin:
+        standin.seed(50)
+        try:
+            before = sqlite_full_scans(standin.db)
+            assert any(scan.startswith("is_duplicate") for scan in before)
+
+            result = migrate(standin.config, STANDIN_MIGRATIONS)
+            assert result["status"] == "completed"
+            assert result["applied"] == [1, 3, 4]
+
+            # Second run is a no-op
+            assert migrate(standin.config, STANDIN_MIGRATIONS)["applied"] == []
+            assert migration_status(standin.config, STANDIN_MIGRATIONS)["pending"] == []
+
+            after = sqlite_full_scans(standin.db)
+            assert after == [], after
+
+            # A migration whose precheck finds rows is not applied
+            blocked = {
+                "version": 5,
+                "name": "blocked by precheck",
+                "precheck": "SELECT id FROM issues LIMIT 1",
+                "precheck_message": "issues must be empty",
+                "statements": ["CREATE INDEX idx_never ON issues (title)"],
+            }
+            result = migrate(standin.config, STANDIN_MIGRATIONS + [blocked])
+            assert result["status"] == "blocked"
+            assert migration_status(standin.config, STANDIN_MIGRATIONS + [blocked])["pending"] == [5]
+        finally:
+            close_pools()
+    print(f"✅ Migrations applied once; full scans before: {len(before)}, after: 0")
+
+if __name__ == "__main__":
+    test_find_full_scans_on_mysql_plans()
+    test_migrations_apply_once_and_index_hot_queries()
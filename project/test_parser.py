@@ -0,0 +1,47 @@
+import sys
+import os
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.services.parser import PARSER_BACKENDS, parse_kjcn_article, format_sections
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "kjcn"
+
+def test_backends_agree():
+    """All parser backends must extract the same title and sections"""
+    print("=== Testing Parser Backends Against Fixtures ===")
+    
+    for path in sorted(FIXTURES_DIR.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        results = {backend: parse_kjcn_article(html, backend) for backend in PARSER_BACKENDS}
+        
+        baseline = results["html.parser"]
+        for backend, result in results.items():
+            assert result == baseline, f"{path.name}: {backend} differs from html.parser"
+        
+        sections = baseline["sections"]
+        print(f"✅ {path.name}: title={baseline['title']!r}, sections={len(sections) if sections is not None else None}")
+
+def test_korean_title_priority():
+    """The Korean title (.tit_ko) wins over the English one (.tit)"""
+    html = (FIXTURES_DIR / "1669.html").read_text(encoding="utf-8")
+    result = parse_kjcn_article(html)
+    assert result["title"].startswith("한국 미취학 아동")
+    assert "[Abstract]" in format_sections(result["sections"])
+    
+    # 1670 has no Korean title, so the English title is used
+    html = (FIXTURES_DIR / "1670.html").read_text(encoding="utf-8")
+    assert parse_kjcn_article(html)["title"].startswith("Association between")
+
+def test_missing_article():
+    html = (FIXTURES_DIR / "9999.html").read_text(encoding="utf-8")
+    result = parse_kjcn_article(html)
+    assert result["title"] is None
+    assert result["sections"] is None
+    assert parse_kjcn_article("") == {"title": None, "sections": None}
+
+if __name__ == "__main__":
+    test_backends_agree()
+    test_korean_title_priority()
+    test_missing_article()
+    print("\n🎉 All parser tests passed!")
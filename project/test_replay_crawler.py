@@ -0,0 +1,127 @@
+import asyncio
+import contextlib
+import sys
+import os
+import types
+import httpx
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay.fake_openai import create_fake_openai_app
+from replay.kjcn_site import create_kjcn_app
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+from replay.server import BackgroundServer
+
+# translation_utils builds its sync OpenAI client at import, which needs some key
+with pytest.MonkeyPatch.context() as patch:
+    patch.setenv("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY") or "replay")
+    from issues.services import crawler
+    from issues.services.batch_crawler import crawl_article_range
+    from issues.services.scheduled_crawler import ScheduledCrawler
+    from issues.services.summarizer import summarize_article_content
+    from issues.utils.chunk_utils import chunk_text
+    from issues.utils.translation_utils import get_short_korean_title_async, parse_short_title_response
+    from issues.utils.llm_cache import llm_cache
+    from issues.services.database import close_pools
+    from config.database import MYSQL_CONFIG
+
+@contextlib.contextmanager
+def replay_environment():
+    """
+    Replay KJCN site and fake OpenAI server, with the environment and module
+    settings pointed at them; everything is restored on exit
+    """
+    with BackgroundServer(create_kjcn_app(max_number=1674)) as site, \
+            BackgroundServer(create_fake_openai_app(latency=0.0)) as fake_openai, \
+            pytest.MonkeyPatch.context() as patch:
+        patch.setenv("KJCN_BASE_URL", site.url)
+        patch.setenv("OPENAI_BASE_URL", f"{fake_openai.url}/v1")
+        patch.setenv("OPENAI_API_KEY", "replay")
+        patch.setenv("MYSQL_HOST", "127.0.0.1")
+        patch.setenv("LLM_CACHE_ENABLED", "0")
+        # Read at import, so patched on the modules as well
+        patch.setattr(crawler, "KJCN_BASE_URL", site.url)
+        patch.setattr(llm_cache, "enabled", False)  # Tests count real calls to the fake server
+        patch.setitem(MYSQL_CONFIG, "host", "127.0.0.1")
+        yield types.SimpleNamespace(site=site, fake_openai=fake_openai)
+
+@pytest.fixture(scope="module")
+def replay():
+    with replay_environment() as servers:
+        yield servers
+
+def test_crawl_range_offline(replay):
+    print("=== Testing crawl_article_range Against Replay ===")
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+    
+    original_config = dict(MYSQL_CONFIG)
+    with MySQLStandin() as standin:
+        MYSQL_CONFIG.update(standin.config)
+        try:
+            results = asyncio.run(crawl_article_range(1669, 1674, delay=0, concurrency=3, batch_size=4))
+            assert [r["article_number"] for r in results] == list(range(1669, 1675))
+            assert all(r["status"] == "success" for r in results), results
+            stored = standin.db.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+            assert stored == 6
+            
+            # Second pass: every article is reported as a duplicate, nothing new is written
+            results = asyncio.run(crawl_article_range(1669, 1674, delay=0, concurrency=3, batch_size=4))
+            assert all(r["status"] == "duplicate" for r in results), results
+            assert standin.db.execute("SELECT COUNT(*) FROM issues").fetchone()[0] == stored
+        finally:
+            MYSQL_CONFIG.clear()
+            MYSQL_CONFIG.update(original_config)
+            close_pools()
+    print(f"✅ {len(results)} articles crawled offline and stored, then reported as duplicates")
+
+def test_find_new_articles_stops_at_missing(replay, tmp_path):
+    scheduled = ScheduledCrawler(os.path.join(str(tmp_path), "replay_crawler_config.json"))
+    scheduled.config["probe_delay"] = 0
+    new_articles = asyncio.run(scheduled.find_new_articles(1670, 10))
+
+    assert new_articles == [1671, 1672, 1673, 1674]
+    print(f"✅ Found new articles: {new_articles}")
+
+def test_map_reduce_summary(replay):
+    """Long text: one call per chunk, all in flight together, plus one reduce call"""
+    long_text = "\n\n".join(f"[섹션 {i}]\n" + "영양 섭취 분석 결과 유의한 차이가 있었다. " * 120 for i in range(4))
+    chunks = chunk_text(long_text)
+    assert len(chunks) > 1
+    
+    httpx.post(f"{replay.fake_openai.url}/stats/reset")
+    summary = asyncio.run(summarize_article_content(long_text, max_parallel=len(chunks)))
+    stats = httpx.get(f"{replay.fake_openai.url}/stats").json()
+    
+    assert summary.startswith("요약:")
+    assert stats["calls"] == len(chunks) + 1
+    print(f"✅ {len(chunks)} chunks summarized with {stats['calls']} calls")
+    
+    # Short text stays a single call
+    httpx.post(f"{replay.fake_openai.url}/stats/reset")
+    asyncio.run(summarize_article_content("짧은 본문입니다."))
+    assert httpx.get(f"{replay.fake_openai.url}/stats").json()["calls"] == 1
+    
+    # Over the budget but a single chunk: its summary is the answer, no reduce call
+    httpx.post(f"{replay.fake_openai.url}/stats/reset")
+    asyncio.run(summarize_article_content("짧은 본문입니다. " * 50, token_budget=100))
+    assert httpx.get(f"{replay.fake_openai.url}/stats").json()["calls"] == 1
+
+def test_combined_title_single_call(replay):
+    """English titles are translated and shortened in one round trip"""
+    httpx.post(f"{replay.fake_openai.url}/stats/reset")
+    title = asyncio.run(get_short_korean_title_async("Association between ultra-processed food consumption and metabolic syndrome"))
+    
+    assert title
+    assert httpx.get(f"{replay.fake_openai.url}/stats").json()["calls"] == 1
+    assert parse_short_title_response('{"short_title": "초가공식품과 대사증후군"}') == "초가공식품과 대사증후군"
+    assert parse_short_title_response('{"other": 1}') == ""
+    print(f"✅ Combined title: {title}")
+
+if __name__ == "__main__":
+    import tempfile
+    with replay_environment() as servers, tempfile.TemporaryDirectory() as tmp_dir:
+        test_crawl_range_offline(servers)
+        test_find_new_articles_stops_at_missing(servers, tmp_dir)
+        test_map_reduce_summary(servers)
+        test_combined_title_single_call(servers)
@@ -0,0 +1,129 @@
+import sys
+import os
+import asyncio
+import contextlib
+import io
+from datetime import datetime, timedelta
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from issues.services import retention
+from issues.services.database import close_pools
+from issues.services.issue_cache import IssueReadCache, MemoryBackend
+from issues.services.retention import RetentionJob
+from replay.mysql_standin import MYSQL_STANDIN_AVAILABLE, MySQLStandin
+
+SEED_START = datetime(2024, 1, 1)  # MySQLStandin.seed: one issue per hour from here
+
+def remaining_ids(standin) -> list:
+    return [row[0] for row in standin.db.execute("SELECT id FROM issues ORDER BY id")]
+
+class CountingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.clears = 0
+
+    def clear(self):
+        self.clears += 1
+        super().clear()
+
+def test_row_and_age_limits_delete_oldest_in_batches():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    backend = CountingBackend()
+    with MySQLStandin() as standin, pytest.MonkeyPatch.context() as patch:
+        patch.setattr(retention, "issue_read_cache", IssueReadCache(backend))
+        standin.seed(1000, content_length=50)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Everything created before hour 300 is expired
+                max_age_days = (datetime.now() - (SEED_START + timedelta(hours=300))).total_seconds() / 86400
+                by_age = asyncio.run(RetentionJob(max_age_days=max_age_days, batch_size=128, pause=0,
+                                                  config=standin.config).run())
+                by_rows = asyncio.run(RetentionJob(max_rows=100, batch_size=64, pause=0,
+                                                   config=standin.config).run())
+                nothing_to_do = asyncio.run(RetentionJob(max_rows=100, config=standin.config).run())
+        finally:
+            close_pools()
+        ids = remaining_ids(standin)
+
+    assert by_age["status"] == "completed"
+    assert by_age["planned"] == by_age["deleted"] == 300
+    assert by_age["batches"] == 3  # 128 + 128 + 44
+
+    assert by_rows["planned"] == by_rows["deleted"] == 600
+    assert by_rows["batches"] == 10  # 9 x 64 + 24
+    assert ids == list(range(901, 1001)), "the newest 100 issues are kept"
+
+    assert nothing_to_do["deleted"] == 0 and nothing_to_do["batches"] == 0
+    # Pages go stale per batch (version bump); the full clear happens once per job that deleted rows
+    assert backend.clears == 2
+    assert backend.counter("version") == by_age["batches"] + by_rows["batches"] + backend.clears
+    print(f"✅ Retention: {by_age['deleted']} expired + {by_rows['deleted']} excess rows, "
+          f"longest batch {max(by_age['max_batch_ms'], by_rows['max_batch_ms'])} ms")
+
+def test_background_job_and_cleanup_oldest():
+    if not MYSQL_STANDIN_AVAILABLE:
+        pytest.skip("mysql-mimic is not installed (pip install -r requirements-dev.txt)")
+
+    import httpx
+    from config.database import MYSQL_CONFIG
+    from fastapi import FastAPI
+    from issues.services import issue_repository
+    # The crawler modules build an OpenAI client at import time; no request is made here
+    os.environ.setdefault("OPENAI_API_KEY", "unused")
+    from issues.routes import router as issues_router
+    from issues.services.scheduled_crawler import ScheduledCrawler
+
+    app = FastAPI()
+    app.include_router(issues_router, prefix="/issues")
+    admin = {"Authorization": "admin@haru.test"}
+
+    async def check():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/issues/retention", headers=admin)).json()["status"] == "idle"
+            assert (await client.post("/issues/retention", headers=admin)).status_code == 400
+
+            response = await client.post("/issues/retention", params={"max_rows": 150, "batch_size": 20}, headers=admin)
+            assert response.status_code == 200
+            # One job at a time
+            assert (await client.post("/issues/retention", params={"max_rows": 10}, headers=admin)).status_code == 409
+
+            # The request returns at once; progress is polled
+            seen_running = False
+            while True:
+                progress = (await client.get("/issues/retention", headers=admin)).json()
+                if progress["status"] not in ("pending", "running"):
+                    break
+                seen_running = seen_running or progress["status"] == "running"
+                assert progress["deleted"] <= progress["planned"]
+                await asyncio.sleep(0.02)
+            assert seen_running
+            assert progress["status"] == "completed" and progress["planned"] == progress["deleted"] == 250
+            assert progress["batches"] == 13 and progress["rows_per_second"] > 0
+
+        return await ScheduledCrawler(config_file=os.devnull).cleanup_oldest_articles(30)
+
+    with MySQLStandin() as standin:
+        standin.seed(400, content_length=50)
+        original_configs = [(config, dict(config)) for config in (issue_repository.MYSQL_CONFIG, MYSQL_CONFIG)]
+        for config, _ in original_configs:
+            config.update(standin.config)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                cleanup = asyncio.run(check())
+        finally:
+            for config, original in original_configs:
+                config.clear()
+                config.update(original)
+            close_pools()
+        ids = remaining_ids(standin)
+
+    assert cleanup["status"] == "completed" and cleanup["articles_deleted"] == 30
+    assert ids == list(range(281, 401))
+    print(f"✅ Background retention job with progress; cleanup_oldest_articles: {cleanup['message']}")
+
+if __name__ == "__main__":
+    test_row_and_age_limits_delete_oldest_in_batches()
+    test_background_job_and_cleanup_oldest()